@@ -0,0 +1,4 @@
+"""Piezas internas del sistema de voz (caché, análisis y reproducción de audio).
+
+La interfaz pública sigue siendo ``voice`` (``hablar``, ``escuchar``, ``stop_speaking``).
+"""
@@ -0,0 +1,326 @@
+"""Motores de síntesis de voz intercambiables, registrados por nombre.
+
+Cada motor convierte un texto en PCM s16le (:meth:`TTSBackend.synthesize`); la
+envolvente, la caché y la reproducción son comunes y viven fuera. Las librerías
+de cada motor se importan la primera vez que se usa, así que gTTS y pydub no se
+cargan si el motor elegido es otro.
+"""
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import threading
+import wave
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional
+
+from . import http_pool, offline_tts, pitch
+from .pcm import SAMPLE_WIDTH, decode_wav
+
+# Parámetros que cambian el audio de gTTS; forman parte de la clave de la caché.
+GTTS_PARAMS = {"lang": "es", "tld": "com", "slow": False}
+PIPER_TIMEOUT_S = 30.0
+GTTS_PROBE_HOST = ("translate.google.com", 443)
+PROBE_TIMEOUT_S = 3.0
+
+
+class VoiceOptions(NamedTuple):
+    """Voz pedida al motor; cada uno usa solo los campos que entiende."""
+
+    gender: str = "female"
+    profile: pitch.VoiceProfile = pitch.VoiceProfile()
+    voice_id: Optional[str] = None  # voz de pyttsx3
+    rate: int = 150
+    volume: float = 1.0
+    language: str = "es"
+    model: Optional[str] = None  # modelo .onnx de Piper
+
+
+class PCMAudio(NamedTuple):
+    pcm: bytes
+    sample_rate: int
+    channels: int
+
+
+class TTSBackend:
+    """Interfaz de un motor de voz. ``synthesize`` se llama desde el hilo de síntesis."""
+
+    name = ""
+    offline = True  # False si necesita conexión
+
+    def is_available(self, voice: VoiceOptions) -> bool:
+        return True
+
+    def cache_params(self, voice: VoiceOptions) -> dict[str, Any]:
+        """Lo que cambia el audio generado, además del texto y el género."""
+        return {}
+
+    def synthesize(self, text: str, voice: VoiceOptions) -> PCMAudio:
+        raise NotImplementedError
+
+    def probe(self) -> bool:
+        """Comprobación barata de que el motor vuelve a responder (solo motores en línea)."""
+        return True
+
+    def stop(self) -> None:
+        """Corta una síntesis o locución en curso, si el motor lo permite."""
+
+
+def is_network_error(error: BaseException) -> bool:
+    """True si ``error`` (o lo que lo causó) es un fallo de red o de tiempo de espera.
+
+    Solo estos cuentan para el cortacircuitos del motor en línea; un fallo local
+    (falta ffmpeg, mp3 corrupto, texto vacío) no dice nada de la conexión.
+    Los errores de gTTS (``gTTSError``) envuelven el de ``requests`` en ``__cause__``.
+    """
+    network: tuple[type[BaseException], ...] = (ConnectionError, TimeoutError, socket.gaierror, ssl.SSLError)
+    if http_pool.requests is not None:
+        network += (http_pool.requests.RequestException,)
+    seen: set[int] = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, network):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def decode_audio(data: bytes) -> PCMAudio:
+    """PCM de un fichero de audio: WAV directamente, cualquier otro formato con pydub."""
+    try:
+        return PCMAudio(*decode_wav(data))
+    except (wave.Error, ValueError, EOFError):
+        from pydub import AudioSegment
+        sound = AudioSegment.from_file(io.BytesIO(data)).set_sample_width(SAMPLE_WIDTH)
+        return PCMAudio(sound.raw_data, sound.frame_rate, sound.channels)
+
+
+class GTTSBackend(TTSBackend):
+    """Google TTS: voz natural, necesita conexión. La voz masculina se obtiene bajando el tono."""
+
+    name = "gtts"
+    offline = False
+
+    def cache_params(self, voice: VoiceOptions) -> dict[str, Any]:
+        params: dict[str, Any] = dict(GTTS_PARAMS)
+        if not voice.profile.is_identity:
+            params.update(voice.profile._asdict())
+        return params
+
+    def synthesize(self, text: str, voice: VoiceOptions) -> PCMAudio:
+        from gtts import gTTS
+        from pydub import AudioSegment
+
+        # gTTS en memoria: el mp3 se decodifica una sola vez a PCM (siempre femenina base)
+        mp3_buffer = io.BytesIO(fetch_gtts_mp3(gTTS(text=text, **GTTS_PARAMS)))
+        sound = AudioSegment.from_file(mp3_buffer, format="mp3")
+
+        # Voz masculina u otro perfil: cambiar tono/tempo
+        profile = voice.profile
+        if not profile.is_identity and (profile.method == "pydub" or not pitch.available()):
+            sound = _apply_profile_pydub(sound, profile)
+        sound = sound.set_sample_width(SAMPLE_WIDTH)
+        pcm = sound.raw_data
+        if pcm and not profile.is_identity and profile.method == "wsola" and pitch.available():
+            pcm = pitch.shift_pcm(pcm, sound.frame_rate, sound.channels, profile.semitones, profile.tempo)
+        return PCMAudio(pcm, sound.frame_rate, sound.channels)
+
+    def probe(self) -> bool:
+        # Basta con abrir la conexión TCP: no gasta una petición de síntesis
+        try:
+            with socket.create_connection(GTTS_PROBE_HOST, timeout=PROBE_TIMEOUT_S):
+                return True
+        except OSError:
+            return False
+
+
+def fetch_gtts_mp3(tts, pool: Optional[http_pool.HTTPPool] = None) -> bytes:
+    """Descarga el mp3 de un objeto ``gTTS`` con sus peticiones por el pool HTTP compartido.
+
+    gTTS abre una ``requests.Session`` nueva (y un handshake TLS) por petición;
+    :func:`http_pool.route_requests` hace que esas sesiones sean la del pool, sin
+    tocar cómo habla gTTS con Google. Sin ``requests`` queda el camino propio de gTTS.
+    """
+    module = sys.modules.get(type(tts).__module__)
+    if module is not None:
+        http_pool.route_requests(module, "gtts", pool)
+    buffer = io.BytesIO()
+    tts.write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def _apply_profile_pydub(sound, profile: pitch.VoiceProfile):
+    """Camino original con pydub: remuestrear para cambiar el tono y acelerar con speedup."""
+    # Reducir pitch para voz más grave (masculina)
+    new_sample_rate = int(sound.frame_rate * (2.0 ** (profile.semitones / 12.0)))
+    sound_pitched = sound._spawn(sound.raw_data, overrides={'frame_rate': new_sample_rate})
+    sound_pitched = sound_pitched.set_frame_rate(sound.frame_rate)
+
+    # Acelerar para mantener velocidad natural
+    playback_speed = (2.0 ** (-profile.semitones / 12.0)) * profile.tempo
+    if playback_speed > 1.0:
+        sound_pitched = sound_pitched.speedup(playback_speed=playback_speed)
+    return sound_pitched
+
+
+class Pyttsx3Backend(TTSBackend):
+    """Voces del sistema con pyttsx3 (SAPI5, NSSpeechSynthesizer o espeak), generadas a un buffer."""
+
+    name = "pyttsx3"
+
+    def __init__(self) -> None:
+        self._engine = None
+        self._applied: Optional[tuple[Any, ...]] = None
+        # El motor de pyttsx3 no admite dos llamadas a la vez
+        self._lock = threading.Lock()
+
+    def cache_params(self, voice: VoiceOptions) -> dict[str, Any]:
+        return {"voice_id": voice.voice_id, "rate": voice.rate, "volume": voice.volume}
+
+    def _get_engine(self, voice: VoiceOptions):
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+        properties = (voice.rate, voice.volume, voice.voice_id)
+        if properties != self._applied:
+            self._engine.setProperty("rate", voice.rate)
+            self._engine.setProperty("volume", voice.volume)
+            if voice.voice_id:
+                self._engine.setProperty("voice", voice.voice_id)
+            self._applied = properties
+        return self._engine
+
+    def reset(self) -> None:
+        """Descarta el motor para que la próxima frase lo cree con la voz nueva."""
+        with self._lock:
+            self._engine = None
+            self._applied = None
+
+    def synthesize(self, text: str, voice: VoiceOptions) -> PCMAudio:
+        data = b""
+        with self._lock:
+            try:
+                data = offline_tts.render_with_pyttsx3(self._get_engine(voice), text)
+            except Exception as e:
+                print(f"pyttsx3 no pudo generar el audio: {e}")
+        if not data:
+            if offline_tts.espeak_command() is None:
+                raise RuntimeError("pyttsx3 no generó audio y espeak-ng no está instalado")
+            data = offline_tts.render_with_espeak(text, rate=voice.rate, volume=voice.volume)
+        return decode_audio(data)
+
+    def stop(self) -> None:
+        engine = self._engine
+        if engine is not None:
+            try:
+                engine.stop()
+            except Exception:
+                pass
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng en un subproceso: sin red ni dependencias de Python y muy rápido en CPU."""
+
+    name = "espeak"
+
+    def is_available(self, voice: VoiceOptions) -> bool:
+        return offline_tts.espeak_command() is not None
+
+    def _voice_name(self, voice: VoiceOptions) -> str:
+        # La voz base de espeak es masculina; "+f3" es su variante femenina
+        return voice.language + ("+f3" if voice.gender == "female" else "")
+
+    def cache_params(self, voice: VoiceOptions) -> dict[str, Any]:
+        return {"voice": self._voice_name(voice), "rate": voice.rate, "volume": voice.volume}
+
+    def synthesize(self, text: str, voice: VoiceOptions) -> PCMAudio:
+        data = offline_tts.render_with_espeak(text, voice=self._voice_name(voice),
+                                              rate=voice.rate, volume=voice.volume)
+        return PCMAudio(*decode_wav(data))
+
+
+class PiperBackend(TTSBackend):
+    """Piper (voz neuronal local en CPU) mediante su ejecutable y un modelo ``.onnx``.
+
+    El modelo se indica con ``"piper_model"`` en la configuración; la frecuencia de
+    muestreo se lee del ``.onnx.json`` que lo acompaña.
+    """
+
+    name = "piper"
+
+    def __init__(self) -> None:
+        self._sample_rates: dict[str, int] = {}
+
+    def is_available(self, voice: VoiceOptions) -> bool:
+        return shutil.which("piper") is not None and bool(voice.model) and Path(voice.model).exists()
+
+    def cache_params(self, voice: VoiceOptions) -> dict[str, Any]:
+        return {"model": voice.model, "rate": voice.rate}
+
+    def _sample_rate(self, model: str) -> int:
+        rate = self._sample_rates.get(model)
+        if rate is None:
+            try:
+                config = json.loads(Path(model + ".json").read_text(encoding="utf-8"))
+                rate = int(config["audio"]["sample_rate"])
+            except (OSError, ValueError, KeyError, TypeError):
+                rate = 22050  # la de casi todos los modelos de Piper
+            self._sample_rates[model] = rate
+        return rate
+
+    def synthesize(self, text: str, voice: VoiceOptions) -> PCMAudio:
+        command = shutil.which("piper")
+        if command is None or not voice.model:
+            raise RuntimeError("Piper no está instalado o falta 'piper_model' en la configuración")
+        # length_scale > 1 habla más despacio; 150 es la velocidad normal de la configuración
+        length_scale = 150.0 / max(50, int(voice.rate))
+        result = subprocess.run(
+            [command, "--model", voice.model, "--output-raw", "--length_scale", f"{length_scale:.3f}"],
+            input=text.encode("utf-8"), capture_output=True, timeout=PIPER_TIMEOUT_S, check=True,
+        )
+        return PCMAudio(result.stdout, self._sample_rate(voice.model), 1)
+
+
+_factories: dict[str, Callable[[], TTSBackend]] = {}
+_instances: dict[str, TTSBackend] = {}
+_registry_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[[], TTSBackend]) -> None:
+    """Registra (o sustituye) un motor; se instancia la primera vez que se pide."""
+    with _registry_lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def backend_names() -> tuple[str, ...]:
+    with _registry_lock:
+        return tuple(_factories)
+
+
+def get_backend(name: str) -> TTSBackend:
+    with _registry_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            factory = _factories.get(name)
+            if factory is None:
+                raise KeyError(f"Motor de voz desconocido: {name}")
+            backend = _instances[name] = factory()
+        return backend
+
+
+def loaded_backends() -> list[TTSBackend]:
+    """Motores ya instanciados (los demás no tienen nada que detener)."""
+    with _registry_lock:
+        return list(_instances.values())
+
+
+register_backend(GTTSBackend.name, GTTSBackend)
+register_backend(Pyttsx3Backend.name, Pyttsx3Backend)
+register_backend(EspeakBackend.name, EspeakBackend)
+register_backend(PiperBackend.name, PiperBackend)
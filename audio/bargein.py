@@ -0,0 +1,141 @@
+"""Interrupción por voz: detectar que el usuario empieza a hablar mientras suena el asistente.
+
+El micrófono también capta la voz del propio asistente por los altavoces, así
+que un detector de voz normal se dispararía solo. :class:`EchoGate` compara cada
+trama del micrófono con el nivel de lo que está sonando (que se conoce de
+antemano): aprende cuánto de la salida llega al micrófono y solo considera voz
+del usuario lo que supera claramente ese eco esperado. No cancela el eco de la
+señal (no es un AEC); solo decide si hay alguien hablando por encima.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from .capture import CaptureService
+from .levels import block_levels
+from .vad import FRAME_MS, EnergyVAD
+
+ECHO_WINDOW_S = 0.3  # retraso máximo entre lo que suena y lo que capta el micrófono
+ECHO_MARGIN = 2.0  # la voz del usuario debe superar el eco esperado por este factor (6 dB)
+MIN_REFERENCE = 0.005  # por debajo, la salida se considera silencio
+MIN_BARGE_IN_MS = 210  # voz seguida necesaria para interrumpir (toses y golpes no cuentan)
+PRE_ROLL_MS = 300
+IDLE_POLL_S = 0.05
+READ_BYTES = 4096
+
+
+class EchoGate:
+    """Decide si una trama del micrófono lleva voz del usuario y no solo eco.
+
+    ``coupling`` es la relación estimada entre el nivel en el micrófono y el de la
+    salida. Baja deprisa y sube despacio, para que la voz del usuario que todavía
+    no se haya reconocido como tal no la infle.
+    """
+
+    def __init__(self, energy_threshold: Optional[float] = None, coupling: float = 1.0,
+                 margin: float = ECHO_MARGIN):
+        self.vad = EnergyVAD(energy_threshold)
+        self.coupling = coupling
+        self.margin = margin
+
+    def is_user_speech(self, frame: bytes, reference: float) -> bool:
+        speech = self.vad.is_speech(frame)
+        if reference < MIN_REFERENCE:
+            return speech
+        level = block_levels(frame).rms
+        user = speech and level > self.coupling * reference * self.margin
+        if not user:
+            ratio = min(4.0, max(0.01, level / reference))
+            self.coupling += (ratio - self.coupling) * (0.2 if ratio < self.coupling else 0.02)
+        return user
+
+
+class BargeInMonitor:
+    """Hilo que, mientras ``is_playing()``, escucha el micrófono y llama a ``on_barge_in(posición)``.
+
+    La posición es la de la captura donde empezó a hablar el usuario (con un margen
+    previo), para que el reconocimiento lea la frase desde su principio.
+    ``reference_level(ventana)`` da el nivel de lo que está sonando.
+    """
+
+    def __init__(self, service: CaptureService, is_playing: Callable[[], bool],
+                 reference_level: Callable[[float], float], on_barge_in: Callable[[int], None],
+                 is_blocked: Callable[[], bool] = lambda: False, energy_threshold: Optional[float] = None):
+        self.service = service
+        self._is_playing = is_playing
+        self._reference_level = reference_level
+        self._on_barge_in = on_barge_in
+        self._is_blocked = is_blocked
+        self._gate = EchoGate(energy_threshold)
+        self._frame_bytes = service.rate * FRAME_MS // 1000 * 2
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.interruptions = 0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="neno-interrupcion", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(2.0)
+
+    def _run(self) -> None:
+        while self._running:
+            if not self._is_playing() or self._is_blocked():
+                time.sleep(IDLE_POLL_S)
+                continue
+            try:
+                self._watch_playback()
+            except RuntimeError as e:
+                print(f"La interrupción por voz no puede abrir el micrófono: {e}")
+                self._running = False
+
+    def _watch_playback(self) -> None:
+        """Escucha mientras suena la voz; el micrófono solo se suscribe durante la locución."""
+        min_frames = max(1, MIN_BARGE_IN_MS // FRAME_MS)
+        pre_roll_frames = PRE_ROLL_MS // FRAME_MS
+        starts: deque[int] = deque(maxlen=min_frames + pre_roll_frames)
+        voiced_run = 0
+        with self.service.subscribe("interrupcion") as reader:
+            pending = bytearray()
+            pending_position = reader.position
+            while self._running and self._is_playing() and not self._is_blocked():
+                chunk = reader.read(READ_BYTES, timeout=IDLE_POLL_S)
+                if not chunk:
+                    if not self.service.running:
+                        return
+                    continue
+                chunk_start = reader.position - len(chunk)
+                if chunk_start != pending_position + len(pending):
+                    pending.clear()
+                    pending_position = chunk_start
+                pending += chunk
+                reference = self._reference_level(ECHO_WINDOW_S)
+                offset = 0
+                while len(pending) - offset >= self._frame_bytes:
+                    frame = bytes(pending[offset:offset + self._frame_bytes])
+                    starts.append(pending_position + offset)
+                    offset += self._frame_bytes
+                    voiced_run = voiced_run + 1 if self._gate.is_user_speech(frame, reference) else 0
+                    if voiced_run >= min_frames:
+                        self.interruptions += 1
+                        try:
+                            self._on_barge_in(starts[0])
+                        except Exception as e:
+                            print(f"Error atendiendo la interrupción por voz: {e}")
+                        return
+                del pending[:offset]
+                pending_position += offset
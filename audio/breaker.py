@@ -0,0 +1,99 @@
+"""Cortacircuitos para el motor de voz en línea.
+
+Tras varios fallos seguidos el circuito se abre y las frases van directas a la
+voz offline, sin esperar a que venza el tiempo de espera de la red. Mientras está
+abierto, un hilo prueba la conexión cada cierto tiempo y lo cierra cuando vuelve.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+FAILURE_THRESHOLD = 2
+PROBE_INTERVAL_S = 30.0
+
+
+class CircuitBreaker:
+    """Estado de salud de un servicio: ``closed`` (se usa) u ``open`` (se evita)."""
+
+    def __init__(self, name: str, probe: Callable[[], bool], failure_threshold: int = FAILURE_THRESHOLD,
+                 probe_interval: float = PROBE_INTERVAL_S):
+        self.name = name
+        self._probe = probe
+        self.failure_threshold = max(1, failure_threshold)
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._prober: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stats = {"opened": 0, "short_circuited": 0, "probes": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return "open" if self._opened_at is not None else "closed"
+
+    def allow(self) -> bool:
+        """True si conviene intentar el servicio; con el circuito abierto cuenta el atajo."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            self._stats["short_circuited"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            was_open = self._opened_at is not None
+            self._opened_at = None
+        if was_open:
+            self._wake.set()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures < self.failure_threshold:
+                return
+            self._opened_at = time.monotonic()
+            self._stats["opened"] += 1
+            if self._prober is None:
+                self._prober = threading.Thread(target=self._probe_loop, name=f"neno-sonda-{self.name}",
+                                                daemon=True)
+                self._prober.start()
+        print(f"'{self.name}' no responde: se usará la voz offline hasta que vuelva")
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            stats: dict[str, object] = dict(self._stats)
+            stats["state"] = "open" if self._opened_at is not None else "closed"
+            stats["consecutive_failures"] = self._failures
+            stats["open_for_s"] = (time.monotonic() - self._opened_at) if self._opened_at is not None else 0.0
+        return stats
+
+    def _probe_loop(self) -> None:
+        while True:
+            # Se despierta antes si una síntesis real ya cerró el circuito
+            self._wake.wait(self.probe_interval)
+            self._wake.clear()
+            with self._lock:
+                if self._opened_at is None:
+                    self._prober = None
+                    return
+                self._stats["probes"] += 1
+            try:
+                healthy = bool(self._probe())
+            except Exception:
+                healthy = False
+            if not healthy:
+                continue
+            with self._lock:
+                self._prober = None
+                if self._opened_at is None:
+                    return
+                # Medio abierto: un solo fallo más lo vuelve a abrir
+                self._opened_at = None
+                self._failures = self.failure_threshold - 1
+            print(f"'{self.name}' vuelve a responder")
+            return
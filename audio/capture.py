@@ -0,0 +1,266 @@
+"""Captura de micrófono compartida: un único stream de entrada por dispositivo.
+
+Un hilo lee el micrófono y escribe en un búfer circular; cada consumidor (medidor
+de nivel, prueba de ruido, reconocedor, palabra de activación) se suscribe con un
+:class:`CaptureReader` que lleva su propia posición. El escritor nunca espera a
+los lectores: solo avanza un contador, y los lectores reciben ``memoryview`` del
+búfer sin copiarlo. El stream se abre con el primer suscriptor y se cierra al
+irse el último.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+CAPTURE_RATE = 16000
+CAPTURE_CHANNELS = 1
+SAMPLE_WIDTH = 2
+BLOCK_FRAMES = 512  # 32 ms a 16 kHz
+RING_SECONDS = 10
+
+
+class RingBuffer:
+    """Búfer circular de un escritor y varios lectores, sin bloqueo en la escritura.
+
+    Las posiciones son bytes escritos desde el principio (crecen sin dar la vuelta),
+    así que cada lector sabe cuánto tiene pendiente y si el escritor lo adelantó.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self.written = 0
+
+    def write(self, data: bytes) -> None:
+        size = len(data)
+        if size > self.capacity:
+            data = data[-self.capacity:]
+            self.written += size - self.capacity
+            size = self.capacity
+        start = self.written % self.capacity
+        first = min(size, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < size:
+            self._view[:size - first] = data[first:]
+        # Publicar después de copiar: un lector nunca ve bytes a medio escribir
+        self.written += size
+
+    def view(self, position: int, max_bytes: int) -> memoryview:
+        """Tramo contiguo desde ``position`` (se corta al llegar al final físico del búfer)."""
+        start = position % self.capacity
+        size = min(max_bytes, self.written - position, self.capacity - start)
+        return self._view[start:start + max(0, size)]
+
+
+class CaptureReader:
+    """Consumidor suscrito a un :class:`CaptureService`, con su propia posición de lectura.
+
+    Las vistas devueltas por :meth:`read` apuntan al búfer circular: son válidas
+    hasta que el escritor da la vuelta completa (``RING_SECONDS``), así que hay
+    que procesarlas o copiarlas enseguida.
+    """
+
+    def __init__(self, service: "CaptureService", name: str, position: Optional[int] = None):
+        self.service = service
+        self.name = name
+        written = service.ring.written
+        # Empezar en el pasado solo dentro de lo que aún guarda el búfer
+        if position is None or position > written:
+            position = written
+        self.position = max(position, written - service.ring.capacity, 0)
+        self.dropped = 0  # bytes perdidos por leer más despacio de lo que se escribe
+
+    @property
+    def available(self) -> int:
+        return self.service.ring.written - self.position
+
+    def _catch_up(self) -> None:
+        ring = self.service.ring
+        oldest = ring.written - ring.capacity
+        if self.position < oldest:
+            self.dropped += oldest - self.position
+            self.position = oldest
+
+    def read(self, max_bytes: int = 1 << 30, timeout: Optional[float] = None) -> memoryview:
+        """Devuelve lo pendiente (hasta ``max_bytes``) sin copiar; vacío si no llega nada a tiempo."""
+        if not self.service.wait_for(self, timeout):
+            return memoryview(b"")
+        self._catch_up()
+        chunk = self.service.ring.view(self.position, max_bytes)
+        self.position += len(chunk)
+        return chunk
+
+    def read_exact(self, size: int, timeout: Optional[float] = None) -> bytes:
+        """Copia exactamente ``size`` bytes (menos si el servicio se para o vence ``timeout``)."""
+        out = bytearray()
+        while len(out) < size:
+            chunk = self.read(size - len(out), timeout)
+            if not chunk:
+                break
+            out += chunk
+        return bytes(out)
+
+    def latest(self, size: int) -> bytes:
+        """Los ``size`` bytes más recientes, descartando lo anterior (para medidores)."""
+        ring = self.service.ring
+        size -= size % SAMPLE_WIDTH
+        self.position = max(self.position, ring.written - min(size, ring.capacity))
+        return self.read_exact(min(size, self.available), timeout=0)
+
+    def close(self) -> None:
+        self.service.unsubscribe(self)
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CaptureService:
+    """Dueño del stream de entrada de un dispositivo; reparte el audio a sus suscriptores."""
+
+    def __init__(self, device_index: Optional[int] = None, rate: int = CAPTURE_RATE,
+                 block_frames: int = BLOCK_FRAMES, ring_seconds: float = RING_SECONDS):
+        self.device_index = device_index
+        self.rate = rate
+        self.channels = CAPTURE_CHANNELS
+        self.block_frames = block_frames
+        block_bytes = block_frames * SAMPLE_WIDTH * self.channels
+        # Capacidad múltiplo del bloque: ninguna muestra queda partida al dar la vuelta
+        blocks = max(2, int(ring_seconds * rate / block_frames))
+        self.ring = RingBuffer(blocks * block_bytes)
+        self._cond = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._readers: list[CaptureReader] = []
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.error: Optional[Exception] = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def subscribe(self, name: str, position: Optional[int] = None) -> CaptureReader:
+        """Nuevo lector; abre el micrófono si es el primero.
+
+        Empieza en este instante o, con ``position`` (un ``written`` o ``position``
+        anterior), en el audio ya capturado desde ahí, para no perder lo que se dijo
+        mientras otro consumidor decidía abrir el lector.
+        """
+        with self._start_lock:
+            while True:
+                with self._cond:
+                    if self._running:
+                        reader = CaptureReader(self, name, position)
+                        self._readers.append(reader)
+                        return reader
+                self._start()
+
+    def unsubscribe(self, reader: CaptureReader) -> None:
+        with self._cond:
+            if reader not in self._readers:
+                return
+            self._readers.remove(reader)
+            if not self._readers:
+                # Sin consumidores se libera el dispositivo
+                self._running = False
+                self._cond.notify_all()
+
+    def subscribers(self) -> list[str]:
+        with self._cond:
+            return [reader.name for reader in self._readers]
+
+    def wait_for(self, reader: CaptureReader, timeout: Optional[float]) -> bool:
+        """Espera a que ``reader`` tenga datos. False si vence ``timeout`` o se paró la captura."""
+        if reader.available > 0:
+            return True
+        with self._cond:
+            self._cond.wait_for(lambda: reader.available > 0 or not self._running, timeout)
+        return reader.available > 0
+
+    def _start(self) -> None:
+        if pyaudio is None:
+            raise RuntimeError("pyaudio no está instalado")
+        # El hilo anterior (si el último suscriptor acaba de irse) debe soltar el dispositivo
+        previous = self._thread
+        if previous is not None:
+            previous.join(1.0)
+        ready = threading.Event()
+        with self._cond:
+            self.error = None
+            self._running = True
+            self._thread = threading.Thread(target=self._run, args=(ready,), name="neno-microfono", daemon=True)
+            self._thread.start()
+        # Esperar a que el stream esté abierto (o falle) antes de dar lectores
+        ready.wait(5.0)
+        if self.error is not None:
+            raise RuntimeError(f"No se pudo abrir el micrófono: {self.error}")
+
+    def _run(self, ready: threading.Event) -> None:
+        stream = None
+        try:
+            stream = _get_pyaudio().open(format=pyaudio.paInt16, channels=self.channels, rate=self.rate,
+                                         input=True, frames_per_buffer=self.block_frames,
+                                         input_device_index=self.device_index)
+        except Exception as exc:
+            with self._cond:
+                self.error = exc
+                self._running = False
+                self._cond.notify_all()
+            ready.set()
+            return
+        ready.set()
+        current = threading.current_thread()
+        try:
+            while self._running and self._thread is current:
+                data = stream.read(self.block_frames, exception_on_overflow=False)
+                self.ring.write(data)
+                with self._cond:
+                    self._cond.notify_all()
+        except Exception as exc:
+            self.error = exc
+            print(f"Error leyendo el micrófono: {exc}")
+        finally:
+            with self._cond:
+                if self._thread is current:
+                    self._running = False
+                self._cond.notify_all()
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception:
+                pass
+
+
+_pyaudio_instance = None
+_services: dict[Optional[int], CaptureService] = {}
+_services_lock = threading.Lock()
+
+
+def _get_pyaudio():
+    """Una sola instancia de PyAudio por proceso (iniciarla enumera todos los dispositivos)."""
+    global _pyaudio_instance
+    with _services_lock:
+        if _pyaudio_instance is None:
+            _pyaudio_instance = pyaudio.PyAudio()
+        return _pyaudio_instance
+
+
+def available() -> bool:
+    return pyaudio is not None
+
+
+def get_capture_service(device_index: Optional[int] = None) -> CaptureService:
+    """Servicio de captura del dispositivo (``None`` = el predeterminado), compartido por todos."""
+    with _services_lock:
+        service = _services.get(device_index)
+        if service is None:
+            service = _services[device_index] = CaptureService(device_index)
+        return service
@@ -0,0 +1,109 @@
+"""Envolvente de amplitud del habla convertida en estados de boca (0-5) para el avatar."""
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa el cálculo por tramos
+    np = None
+
+try:
+    import audioop
+except ImportError:  # Eliminado en Python 3.13
+    audioop = None
+
+from .pcm import SAMPLE_WIDTH
+
+ENVELOPE_FRAME_MS = 50  # más fluido (~20 fps)
+# Fracciones del pico (ya suavizado) que separan los 6 estados de boca.
+THRESHOLDS = (0.10, 0.22, 0.40, 0.60, 0.80)
+
+_ARRAY_CODES = {2: "h", 4: "i"}
+
+
+def mouth_envelope(pcm: bytes, sample_rate: int, channels: int = 1, sample_width: int = SAMPLE_WIDTH,
+                   frame_interval_ms: int = ENVELOPE_FRAME_MS) -> list[int]:
+    """Un estado de boca por cada ``frame_interval_ms`` de PCM entero con signo."""
+    frame_samples = max(1, int(sample_rate * frame_interval_ms / 1000)) * max(1, channels)
+    if np is not None and sample_width in _ARRAY_CODES:
+        return _numpy_envelope(pcm, sample_width, frame_samples)
+    return _python_envelope(pcm, sample_width, frame_samples)
+
+
+def _numpy_envelope(pcm: bytes, sample_width: int, frame_samples: int) -> list[int]:
+    samples = np.frombuffer(pcm, dtype=f"<i{sample_width}", count=len(pcm) // sample_width)
+    if not samples.size:
+        return []
+    full = samples.size // frame_samples
+    body = samples[:full * frame_samples].reshape(full, frame_samples)
+    # Suma de cuadrados por tramo sin copiar las muestras a otro tipo
+    mean_squares = np.einsum("ij,ij->i", body, body, dtype=np.float64) / frame_samples
+    tail = samples[full * frame_samples:]
+    if tail.size:
+        mean_squares = np.append(mean_squares, np.einsum("i,i->", tail, tail, dtype=np.float64) / tail.size)
+    # Igual que audioop.rms: raíz truncada de la media de cuadrados de cada tramo
+    rms = np.floor(np.sqrt(mean_squares))
+    frames = rms.size
+    # Media móvil de ventana 3 (en los extremos solo hay 2 vecinos). Con "valid" sobre
+    # la serie rellenada la salida tiene siempre ``frames`` valores; "same" daría 3
+    # con menos de 3 tramos. Se rellena con ceros y se divide por los vecinos reales.
+    kernel = np.ones(3)
+    sums = np.convolve(np.pad(rms, 1), kernel, "valid")
+    counts = np.convolve(np.pad(np.ones(frames), 1), kernel, "valid")
+    smoothed = sums / counts
+    peak = smoothed.max()
+    if peak <= 0:
+        return [0] * frames
+    return np.digitize(smoothed, peak * np.asarray(THRESHOLDS)).tolist()
+
+
+def _frame_rms(chunk: bytes, sample_width: int) -> int:
+    if audioop is not None:
+        return audioop.rms(chunk, sample_width)
+    samples = array(_ARRAY_CODES.get(sample_width, "h"))
+    samples.frombytes(chunk)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return 0
+    return int(math.sqrt(sum(s * s for s in samples) / len(samples)))
+
+
+def _python_envelope(pcm: bytes, sample_width: int, frame_samples: int) -> list[int]:
+    """Cálculo original tramo a tramo, para cuando NumPy no está instalado."""
+    frame_bytes = frame_samples * sample_width
+    usable = len(pcm) - len(pcm) % sample_width
+    rms_values = [_frame_rms(pcm[start:min(start + frame_bytes, usable)], sample_width)
+                  for start in range(0, usable, frame_bytes)]
+    # Suavizado: media móvil ventana 3
+    smoothed = []
+    for i in range(len(rms_values)):
+        vals = [rms_values[i]]
+        if i > 0:
+            vals.append(rms_values[i-1])
+        if i < len(rms_values)-1:
+            vals.append(rms_values[i+1])
+        smoothed.append(sum(vals)/len(vals))
+    max_rms = max(smoothed) if smoothed else 0
+    if max_rms <= 0:
+        return [0] * len(smoothed)
+    # Umbrales para 6 estados (0-5)
+    t1, t2, t3, t4, t5 = (max_rms * fraction for fraction in THRESHOLDS)
+    envelope_states = []
+    for v in smoothed:
+        if v < t1:
+            envelope_states.append(0)
+        elif v < t2:
+            envelope_states.append(1)
+        elif v < t3:
+            envelope_states.append(2)
+        elif v < t4:
+            envelope_states.append(3)
+        elif v < t5:
+            envelope_states.append(4)
+        else:
+            envelope_states.append(5)
+    return envelope_states
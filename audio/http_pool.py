@@ -0,0 +1,250 @@
+"""Conexiones HTTP compartidas para todo lo que la voz pide a la red (gTTS y reconocimiento).
+
+Una única ``requests.Session`` mantiene las conexiones abiertas (keep-alive), así
+que cada frase reutiliza la conexión TLS en vez de negociar una nueva, y la
+resolución DNS solo se hace al abrir una conexión. Un semáforo limita cuántas
+peticiones salen a la vez y cada llamada guarda su latencia por nombre.
+
+gTTS y ``speech_recognition`` no dejan pasarles una sesión: :func:`route_requests`
+y :func:`route_urlopen` cambian, solo dentro de su módulo, el ``requests`` o el
+``urlopen`` que usan por equivalentes que van por el pool. Su protocolo (URL,
+parámetros, formato de la respuesta) sigue siendo el de la librería.
+"""
+from __future__ import annotations
+
+import io
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Optional
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # Llega con gTTS; sin él se usan las llamadas propias de cada librería
+    requests = None
+    HTTPAdapter = None
+
+DEFAULT_TIMEOUT_S = 10.0
+CONNECT_TIMEOUT_S = 3.05
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class HTTPPool:
+    """Sesión HTTP con conexiones persistentes, concurrencia acotada y métricas por llamada."""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT_S, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 connect_timeout: float = CONNECT_TIMEOUT_S):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats: dict[str, dict[str, float]] = {}
+
+    @property
+    def available(self) -> bool:
+        return requests is not None
+
+    def _get_session(self):
+        with self._session_lock:
+            if self._session is None:
+                if requests is None:
+                    raise RuntimeError("requests no está instalado")
+                session = requests.Session()
+                # Tantas conexiones guardadas por servidor como peticiones simultáneas
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_concurrency, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def request(self, name: str, method: str, url: str, **kwargs: Any):
+        """Hace la petición por la sesión compartida y devuelve la respuesta ya leída.
+
+        ``name`` agrupa las métricas (``"gtts"``, ``"recognize"``...). Lanza las
+        excepciones de ``requests``, también para respuestas 4xx/5xx.
+        """
+        return self._timed(name, lambda session, **options: session.request(method, url, **options),
+                           kwargs, raise_for_status=True)
+
+    def post(self, name: str, url: str, **kwargs: Any):
+        return self.request(name, "POST", url, **kwargs)
+
+    def send(self, name: str, prepared, **kwargs: Any):
+        """Envía un ``requests.PreparedRequest`` ya montado por una librería.
+
+        No lanza por respuestas 4xx/5xx (eso lo comprueba la librería), pero
+        cuentan como error en las métricas.
+        """
+        return self._timed(name, lambda session, **options: session.send(prepared, **options), kwargs)
+
+    def _timed(self, name: str, call: Callable[..., Any], kwargs: dict[str, Any],
+               raise_for_status: bool = False):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = (self.connect_timeout, self.timeout)
+        session = self._get_session()
+        with self._slots:
+            start = time.perf_counter()
+            try:
+                response = call(session, **kwargs)
+                if raise_for_status:
+                    response.raise_for_status()
+            except Exception:
+                self._record(name, time.perf_counter() - start, failed=True)
+                raise
+            self._record(name, time.perf_counter() - start, failed=response.status_code >= 400)
+        return response
+
+    def _record(self, name: str, elapsed: float, failed: bool) -> None:
+        elapsed_ms = elapsed * 1000
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                  "last_ms": 0.0})
+            stats["calls"] += 1
+            stats["errors"] += int(failed)
+            stats["total_ms"] += elapsed_ms
+            stats["last_ms"] = elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Llamadas, errores y latencia (última, media y máxima, en ms) por nombre."""
+        with self._stats_lock:
+            result = {name: dict(values) for name, values in self._stats.items()}
+        for values in result.values():
+            values["avg_ms"] = values.pop("total_ms") / values["calls"] if values["calls"] else 0.0
+        return result
+
+    def configure(self, timeout: Optional[float] = None, max_concurrency: Optional[int] = None) -> None:
+        """Ajusta el tiempo de espera o la concurrencia.
+
+        Cambiar la concurrencia recrea la sesión (las conexiones abiertas se cierran).
+        """
+        if timeout is not None:
+            self.timeout = float(timeout)
+        if max_concurrency is not None and max(1, int(max_concurrency)) != self.max_concurrency:
+            self.close()
+            self.max_concurrency = max(1, int(max_concurrency))
+            self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    def close(self) -> None:
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+
+class _SharedSession:
+    """Lo que recibe una librería al crear su ``requests.Session``: la sesión del pool.
+
+    Cerrarla (o salir del ``with``) no cierra las conexiones compartidas.
+    """
+
+    def __init__(self, pool: HTTPPool, name: str):
+        self._pool = pool
+        self._name = name
+
+    def __enter__(self) -> "_SharedSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def send(self, request, **kwargs: Any):
+        return self._pool.send(self._name, request, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        return self._pool._timed(self._name, lambda session, **options: session.request(method, url, **options),
+                                 kwargs)
+
+    def get(self, url: str, **kwargs: Any):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any):
+        return self.request("POST", url, **kwargs)
+
+
+class _PooledRequests:
+    """``requests`` tal cual salvo ``Session()``, que devuelve la sesión del pool."""
+
+    def __init__(self, pool: HTTPPool, name: str):
+        self._pool = pool
+        self._name = name
+
+    def Session(self) -> _SharedSession:  # noqa: N802 (mismo nombre que requests.Session)
+        return _SharedSession(self._pool, self._name)
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(requests, attribute)
+
+
+def route_requests(module: Any, name: str, pool: Optional[HTTPPool] = None) -> bool:
+    """Hace que las ``requests.Session()`` que crea ``module`` usen el pool (``name`` en las métricas).
+
+    False si no hay ``requests`` o el módulo no lo usa como se espera (se queda como estaba).
+    """
+    pool = pool or get_pool()
+    current = getattr(module, "requests", None)
+    if isinstance(current, _PooledRequests):
+        return True
+    if not pool.available or current is not requests:
+        return False
+    module.requests = _PooledRequests(pool, name)
+    return True
+
+
+def route_urlopen(module: Any, name: str, pool: Optional[HTTPPool] = None) -> bool:
+    """Hace que el ``urlopen`` de ``module`` (urllib) vaya por el pool.
+
+    Los fallos se lanzan como los de urllib (``HTTPError``, ``URLError``), que es
+    lo que la librería espera. False si no se pudo (se queda como estaba).
+    """
+    pool = pool or get_pool()
+    current = getattr(module, "urlopen", None)
+    if getattr(current, "_pooled", False):
+        return True
+    if not pool.available or current is not urllib.request.urlopen:
+        return False
+
+    def urlopen(url, data=None, timeout=None, **_ignored: Any):
+        request = url if isinstance(url, urllib.request.Request) else urllib.request.Request(url, data)
+        body = request.data if data is None else data
+        timeout = (pool.connect_timeout, timeout) if timeout is not None else None
+        try:
+            response = pool.request(name, request.get_method(), request.full_url, data=body,
+                                    headers=dict(request.header_items()), timeout=timeout)
+        except requests.HTTPError as e:
+            raise urllib.error.HTTPError(request.full_url, e.response.status_code, e.response.reason,
+                                         e.response.headers, None) from e
+        except requests.RequestException as e:
+            raise urllib.error.URLError(e) from e
+        return io.BytesIO(response.content)
+
+    urlopen._pooled = True  # type: ignore[attr-defined]
+    module.urlopen = urlopen
+    return True
+
+
+_pool: Optional[HTTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> HTTPPool:
+    """Pool compartido por todo el proceso."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HTTPPool()
+        return _pool
+
+
+def configure(timeout: Optional[float] = None, max_concurrency: Optional[int] = None) -> HTTPPool:
+    pool = get_pool()
+    pool.configure(timeout, max_concurrency)
+    return pool
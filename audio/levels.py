@@ -0,0 +1,108 @@
+"""Nivel de un bloque de micrófono (RMS, pico, dBFS) y medidor con retención de pico.
+
+Lo usan el medidor de la ventana principal y la prueba de ruido. Con NumPy el
+bloque se lee con ``frombuffer`` sin copiarlo; sin él se usa ``audioop`` o, en
+Python 3.13+, ``array``.
+"""
+from __future__ import annotations
+
+import math
+import sys
+import time
+from array import array
+from typing import NamedTuple, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import audioop
+except ImportError:  # Eliminado en Python 3.13
+    audioop = None
+
+FULL_SCALE = 32768.0
+SILENCE_DBFS = -90.0
+
+
+class Levels(NamedTuple):
+    """Nivel de un bloque, normalizado a 0-1 sobre el fondo de escala de 16 bits."""
+
+    rms: float
+    peak: float
+
+    @property
+    def dbfs(self) -> float:
+        return to_dbfs(self.rms)
+
+
+def to_dbfs(level: float) -> float:
+    return SILENCE_DBFS if level <= 1e-6 else max(SILENCE_DBFS, 20.0 * math.log10(level))
+
+
+def block_levels(pcm) -> Levels:
+    """RMS y pico de PCM s16le (``bytes`` o ``memoryview``)."""
+    count = len(pcm) // 2
+    if not count:
+        return Levels(0.0, 0.0)
+    if np is not None:
+        samples = np.frombuffer(pcm, dtype="<i2", count=count)
+        mean_square = float(np.einsum("i,i->", samples, samples, dtype=np.float64)) / count
+        # Sin np.abs: abs(-32768) desborda en int16
+        peak = max(int(samples.max()), -int(samples.min()))
+        return Levels(math.sqrt(mean_square) / FULL_SCALE, peak / FULL_SCALE)
+    data = bytes(pcm[:count * 2])
+    if audioop is not None:
+        return Levels(audioop.rms(data, 2) / FULL_SCALE, audioop.max(data, 2) / FULL_SCALE)
+    samples = array("h")
+    samples.frombytes(data)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    mean_square = sum(s * s for s in samples) / count
+    return Levels(math.sqrt(mean_square) / FULL_SCALE, max(abs(s) for s in samples) / FULL_SCALE)
+
+
+class MeterReading(NamedTuple):
+    rms: float  # RMS suavizado, 0-1
+    peak: float  # pico del último bloque, 0-1
+    peak_hold: float  # pico máximo retenido, 0-1
+    dbfs: float  # RMS suavizado en dBFS
+
+
+class LevelMeter:
+    """Medidor de nivel: RMS suavizado (subida rápida, caída lenta) y pico retenido.
+
+    ``attack`` y ``release`` son la fracción de la distancia al nuevo valor que se
+    recorre en cada bloque al subir y al bajar. El pico se mantiene ``hold_s``
+    segundos y después cae ``peak_decay`` por segundo.
+    """
+
+    def __init__(self, attack: float = 0.6, release: float = 0.15, hold_s: float = 1.0,
+                 peak_decay: float = 0.5):
+        self.attack = attack
+        self.release = release
+        self.hold_s = hold_s
+        self.peak_decay = peak_decay
+        self._rms = 0.0
+        self._peak_hold = 0.0
+        self._peak_at = 0.0
+        self._last: Optional[float] = None
+
+    def update(self, pcm, now: Optional[float] = None) -> MeterReading:
+        now = time.monotonic() if now is None else now
+        levels = block_levels(pcm)
+        coefficient = self.attack if levels.rms > self._rms else self.release
+        self._rms += (levels.rms - self._rms) * coefficient
+        elapsed = 0.0 if self._last is None else now - self._last
+        self._last = now
+        if levels.peak >= self._peak_hold:
+            self._peak_hold = levels.peak
+            self._peak_at = now
+        elif now - self._peak_at > self.hold_s:
+            self._peak_hold = max(levels.peak, self._peak_hold - self.peak_decay * elapsed)
+        return MeterReading(self._rms, levels.peak, self._peak_hold, to_dbfs(self._rms))
+
+    def reset(self) -> None:
+        self._rms = self._peak_hold = self._peak_at = 0.0
+        self._last = None
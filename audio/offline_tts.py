@@ -0,0 +1,58 @@
+"""Voz offline generada en un buffer WAV en lugar de sonar directamente por el altavoz.
+
+Así la voz de pyttsx3 pasa por la misma caché, envolvente de boca y salida de
+audio que la de Google TTS.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Any, Optional
+
+ESPEAK_COMMANDS = ("espeak-ng", "espeak")
+ESPEAK_TIMEOUT_S = 30.0
+
+
+def render_with_pyttsx3(engine: Any, text: str) -> bytes:
+    """Genera ``text`` con ``engine.save_to_file`` y devuelve el contenido del fichero.
+
+    pyttsx3 solo sabe escribir en disco, así que se usa un temporal que se borra
+    enseguida. Según la plataforma el resultado es WAV (SAPI5, espeak) o AIFF (macOS).
+    """
+    fd, path = tempfile.mkstemp(prefix="neno-tts-", suffix=".wav")
+    os.close(fd)
+    try:
+        engine.save_to_file(text, path)
+        engine.runAndWait()
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def espeak_command() -> Optional[str]:
+    """Ruta de espeak-ng (o espeak) si está instalado."""
+    for name in ESPEAK_COMMANDS:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def render_with_espeak(text: str, voice: str = "es", rate: int = 150, volume: float = 1.0) -> bytes:
+    """Genera ``text`` con espeak-ng en un subproceso y devuelve el WAV de su salida estándar."""
+    command = espeak_command()
+    if command is None:
+        raise RuntimeError("espeak-ng no está instalado")
+    # Amplitud de espeak: 0-200, 100 es el volumen normal
+    amplitude = max(0, min(200, int(round(float(volume) * 100))))
+    result = subprocess.run(
+        [command, "--stdout", "--stdin", "-v", voice, "-s", str(int(rate)), "-a", str(amplitude)],
+        input=text.encode("utf-8"), capture_output=True, timeout=ESPEAK_TIMEOUT_S, check=True,
+    )
+    return result.stdout
@@ -0,0 +1,224 @@
+"""Salida de audio persistente: se abre una vez, reproduce buffers PCM y avisa al terminar.
+
+Un único hilo vigila el canal de voz. Como se conoce la duración exacta de cada
+buffer, espera hasta el instante en que debe acabar (o hasta que llegue algo
+nuevo) en lugar de preguntar al mezclador varias veces por segundo.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+from .levels import block_levels
+from .pcm import SAMPLE_WIDTH, SpeechAudio, convert_pcm
+
+DEFAULT_SAMPLE_RATE = 24000  # gTTS entrega mp3 mono a 24 kHz
+DEFAULT_CHANNELS = 1
+DEFAULT_BUFFER_SAMPLES = 512  # ~21 ms a 24 kHz
+# Margen para que el dispositivo vacíe su buffer tras la hora prevista de fin.
+_DRAIN_GRACE_S = 0.25
+
+
+class Playback:
+    """Un buffer enviado a la salida. ``done`` se activa al terminar o al cortarse."""
+
+    def __init__(self, speech: SpeechAudio, sound, start_time: float):
+        self.speech = speech
+        self.duration = speech.duration
+        self.start_time = start_time  # posición en la línea de tiempo de la salida
+        self.stopped = False
+        self.done = threading.Event()
+        self._sound = sound
+        self._queued = False
+        self._started_at: Optional[float] = None  # reloj monotónico
+        self._callbacks: list[Callable[["Playback"], None]] = []
+
+    @property
+    def position(self) -> float:
+        """Segundos reproducidos de este buffer."""
+        if self._started_at is None:
+            return 0.0
+        return min(self.duration, max(0.0, time.monotonic() - self._started_at))
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def add_done_callback(self, callback: Callable[["Playback"], None]) -> None:
+        if self.done.is_set():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _finish(self, stopped: bool) -> None:
+        if self.done.is_set():
+            return
+        self.stopped = stopped
+        self.done.set()
+        for callback in self._callbacks:
+            try:
+                callback(self)
+            except Exception as exc:
+                print(f"Error en aviso de fin de audio: {exc}")
+
+
+class AudioOutput:
+    """Dispositivo de salida abierto una sola vez con un buffer pequeño.
+
+    :meth:`play` encola buffers que suenan seguidos sin huecos; :meth:`clock` da la
+    posición en una línea de tiempo continua (no avanza mientras no suena nada),
+    útil para sincronizar la animación de la boca.
+    """
+
+    def __init__(self, sample_rate: int = DEFAULT_SAMPLE_RATE, channels: int = DEFAULT_CHANNELS,
+                 buffer_samples: int = DEFAULT_BUFFER_SAMPLES):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.buffer_samples = buffer_samples
+        self._cond = threading.Condition()
+        self._pending: deque[Playback] = deque()
+        self._channel = None
+        self._thread: Optional[threading.Thread] = None
+        self._timeline_end = 0.0  # fin de lo último encolado en la línea de tiempo
+
+    @property
+    def is_open(self) -> bool:
+        return self._channel is not None
+
+    def open(self) -> bool:
+        """Abre el dispositivo (idempotente). Devuelve False si no hay salida de audio."""
+        with self._cond:
+            if self._channel is not None:
+                return True
+            if pygame is None:
+                print("pygame no está instalado: no hay salida de audio")
+                return False
+            try:
+                # allowedchanges=0: SDL convierte al formato real del dispositivo
+                pygame.mixer.init(frequency=self.sample_rate, size=-8 * SAMPLE_WIDTH,
+                                  channels=self.channels, buffer=self.buffer_samples, allowedchanges=0)
+                pygame.mixer.set_reserved(1)
+                self._channel = pygame.mixer.Channel(0)
+            except Exception as exc:
+                print(f"No se pudo abrir la salida de audio: {exc}")
+                return False
+            self._thread = threading.Thread(target=self._monitor, name="neno-audio", daemon=True)
+            self._thread.start()
+            return True
+
+    def play(self, speech: SpeechAudio, on_done: Optional[Callable[[Playback], None]] = None) -> Playback:
+        """Encola ``speech`` detrás de lo que esté sonando y devuelve su :class:`Playback`."""
+        if not self.open():
+            raise RuntimeError("Salida de audio no disponible")
+        pcm = speech.pcm
+        if (speech.sample_rate, speech.channels) != (self.sample_rate, self.channels):
+            pcm = convert_pcm(pcm, speech.sample_rate, speech.channels, self.sample_rate, self.channels)
+        sound = pygame.mixer.Sound(buffer=pcm)
+        with self._cond:
+            # Sin nada sonando la línea de tiempo está parada y se continúa desde su final
+            playback = Playback(speech, sound, self._timeline_end)
+            self._timeline_end += playback.duration
+            if on_done is not None:
+                playback.add_done_callback(on_done)
+            self._pending.append(playback)
+            self._feed_locked()
+            self._cond.notify()
+        return playback
+
+    def stop(self) -> None:
+        """Corta lo que suena y descarta lo encolado."""
+        with self._cond:
+            self._timeline_end = self._clock_locked()
+            pending = list(self._pending)
+            self._pending.clear()
+            if self._channel is not None:
+                try:
+                    self._channel.stop()
+                except Exception:
+                    pass
+            self._cond.notify()
+        for playback in pending:
+            playback._finish(stopped=True)
+
+    def clock(self) -> float:
+        """Segundos de audio reproducidos desde que se abrió la salida."""
+        with self._cond:
+            return self._clock_locked()
+
+    def current(self) -> Optional[Playback]:
+        with self._cond:
+            return self._pending[0] if self._pending else None
+
+    def recent_level(self, window_s: float, frame_s: float = 0.03) -> float:
+        """RMS (0-1) más alto de las tramas de ``frame_s`` que sonaron en los últimos ``window_s``.
+
+        Es la referencia para distinguir el eco de la voz de quien habla: lo que
+        capta el micrófono llega con retraso, así que se mira una ventana y no solo
+        el instante actual. 0 si no suena nada.
+        """
+        playback = self.current()
+        if playback is None or playback._started_at is None:
+            return 0.0
+        speech = playback.speech
+        frame_bytes = SAMPLE_WIDTH * max(1, speech.channels)
+        position = playback.position
+        start = int(max(0.0, position - window_s) * speech.sample_rate) * frame_bytes
+        end = int(min(playback.duration, position + frame_s) * speech.sample_rate) * frame_bytes
+        step = max(frame_bytes, int(frame_s * speech.sample_rate) * frame_bytes)
+        pcm = memoryview(speech.pcm)
+        return max((block_levels(pcm[offset:min(end, offset + step)]).rms for offset in range(start, end, step)),
+                   default=0.0)
+
+    def _clock_locked(self) -> float:
+        if self._pending:
+            head = self._pending[0]
+            return head.start_time + head.position
+        return self._timeline_end
+
+    def _feed_locked(self) -> None:
+        """Mantiene en el canal el buffer actual y, como mucho, el siguiente en cola."""
+        channel = self._channel
+        if channel is None or not self._pending:
+            return
+        head = self._pending[0]
+        if head._started_at is None:
+            channel.play(head._sound)
+            head._started_at = time.monotonic()
+        if len(self._pending) > 1:
+            following = self._pending[1]
+            if not following._queued:
+                channel.queue(following._sound)
+                following._queued = True
+
+    def _monitor(self) -> None:
+        while True:
+            finished: Optional[Playback] = None
+            with self._cond:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                head = self._pending[0]
+                started = head._started_at or time.monotonic()
+                remaining = started + head.duration - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                following = self._pending[1] if len(self._pending) > 1 else None
+                if following is None and self._channel is not None and self._channel.get_busy() \
+                        and remaining > -_DRAIN_GRACE_S:
+                    # Aún sale audio del buffer del dispositivo
+                    self._cond.wait(0.01)
+                    continue
+                finished = self._pending.popleft()
+                if following is not None:
+                    # Si estaba en la cola del canal empezó justo al acabar el anterior
+                    following._started_at = (started + head.duration) if following._queued else None
+                self._feed_locked()
+            if finished is not None:
+                finished._finish(stopped=False)
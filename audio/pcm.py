@@ -0,0 +1,73 @@
+"""Audio ya decodificado que circula entre síntesis, caché y reproducción."""
+from __future__ import annotations
+
+import io
+import wave
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import audioop
+except ImportError:  # Eliminado en Python 3.13
+    audioop = None
+
+# Todo el audio interno es PCM con signo de 16 bits, little-endian.
+SAMPLE_WIDTH = 2
+
+
+class SpeechAudio(NamedTuple):
+    """PCM s16le listo para ``pygame.mixer.Sound`` junto con su envolvente de boca."""
+
+    pcm: bytes
+    sample_rate: int
+    channels: int
+    envelope: list[int]
+    frame_interval_ms: int
+
+    @property
+    def duration(self) -> float:
+        frame_bytes = SAMPLE_WIDTH * max(1, self.channels)
+        return len(self.pcm) / frame_bytes / float(self.sample_rate or 1)
+
+
+def decode_wav(data: bytes) -> tuple[bytes, int, int]:
+    """Extrae ``(pcm, sample_rate, channels)`` de un WAV PCM de 16 bits.
+
+    Lanza ``wave.Error`` o ``ValueError`` si no es un WAV de ese tipo (por ejemplo
+    el AIFF que genera pyttsx3 en macOS); el llamador decide cómo decodificarlo.
+    """
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        if wav.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError(f"WAV de {wav.getsampwidth() * 8} bits no soportado")
+        return wav.readframes(wav.getnframes()), wav.getframerate(), wav.getnchannels()
+
+
+def convert_pcm(pcm: bytes, sample_rate: int, channels: int, target_rate: int, target_channels: int) -> bytes:
+    """Cambia frecuencia de muestreo y número de canales de PCM s16le."""
+    if (sample_rate, channels) == (target_rate, target_channels):
+        return pcm
+    if np is not None:
+        frames = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // SAMPLE_WIDTH // channels * channels)
+        frames = frames.reshape(-1, channels).astype(np.float64)
+        if channels != target_channels:
+            mono = frames.mean(axis=1, keepdims=True)
+            frames = np.repeat(mono, target_channels, axis=1)
+        if sample_rate != target_rate and frames.shape[0]:
+            length = max(1, int(round(frames.shape[0] * target_rate / sample_rate)))
+            positions = np.arange(length) * (sample_rate / target_rate)
+            source = np.arange(frames.shape[0])
+            frames = np.stack([np.interp(positions, source, column) for column in frames.T], axis=1)
+        return np.clip(np.rint(frames), -32768, 32767).astype("<i2").tobytes()
+    if audioop is None:
+        raise RuntimeError("No se puede convertir el audio sin NumPy ni audioop")
+    if channels == 2 and target_channels == 1:
+        pcm = audioop.tomono(pcm, SAMPLE_WIDTH, 0.5, 0.5)
+    if sample_rate != target_rate:
+        pcm, _ = audioop.ratecv(pcm, SAMPLE_WIDTH, min(channels, target_channels), sample_rate, target_rate, None)
+    if channels == 1 and target_channels == 2:
+        pcm = audioop.tostereo(pcm, SAMPLE_WIDTH, 1, 1)
+    return pcm
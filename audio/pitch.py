@@ -0,0 +1,131 @@
+"""Cambio de tono y de tempo sobre PCM con NumPy (remuestreo + WSOLA).
+
+El tono se baja o sube remuestreando, lo que también cambia la duración; después
+WSOLA (superposición y suma con búsqueda de la mejor similitud) devuelve la
+duración deseada sin tocar el tono. Cada frase se procesa por separado, así que
+funciona fragmento a fragmento mientras suena la anterior.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, NamedTuple, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy, voice.py usa el camino de pydub
+    np = None
+
+from .pcm import SAMPLE_WIDTH
+
+PITCH_METHODS = ("wsola", "pydub")
+FRAME_MS = 30
+TOLERANCE_MS = 8
+
+
+class VoiceProfile(NamedTuple):
+    """Transformación aplicada a la voz base de gTTS."""
+
+    semitones: float = 0.0
+    tempo: float = 1.0  # >1 más rápido
+    method: str = "wsola"
+
+    @property
+    def is_identity(self) -> bool:
+        return self.semitones == 0 and self.tempo == 1.0
+
+
+DEFAULT_PROFILES = {
+    "female": VoiceProfile(),
+    # Unos 3 semitonos más grave, a la velocidad natural
+    "male": VoiceProfile(semitones=-3.0, tempo=1.0),
+}
+
+
+def resolve_profile(gender: str, overrides: Optional[dict[str, Any]] = None) -> VoiceProfile:
+    """Perfil para ``gender`` con los valores de ``settings['voice_profiles']`` aplicados encima."""
+    profile = DEFAULT_PROFILES.get(gender, VoiceProfile())
+    custom = (overrides or {}).get(gender)
+    if not isinstance(custom, dict):
+        return profile
+    try:
+        profile = profile._replace(
+            semitones=float(custom.get("semitones", profile.semitones)),
+            tempo=float(custom.get("tempo", profile.tempo)),
+            method=str(custom.get("method", profile.method)),
+        )
+    except (TypeError, ValueError):
+        print(f"Perfil de voz '{gender}' inválido en la configuración; se usa el predeterminado")
+        return DEFAULT_PROFILES.get(gender, VoiceProfile())
+    if profile.method not in PITCH_METHODS or profile.tempo <= 0:
+        print(f"Perfil de voz '{gender}' inválido en la configuración; se usa el predeterminado")
+        return DEFAULT_PROFILES.get(gender, VoiceProfile())
+    return profile
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _hann(size: int):
+    # Ventana periódica: con salto de media ventana la suma es constante
+    return 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(size) / size)
+
+
+def _resample(samples, factor: float):
+    """Estira la señal ``factor`` veces por interpolación lineal (al reproducirla, el tono baja)."""
+    length = max(1, int(round(samples.size * factor)))
+    positions = np.arange(length) / factor
+    return np.interp(positions, np.arange(samples.size), samples)
+
+
+def wsola(samples, stretch: float, sample_rate: int,
+          frame_ms: int = FRAME_MS, tolerance_ms: int = TOLERANCE_MS):
+    """Cambia la duración ``stretch`` veces conservando el tono."""
+    if samples.size == 0 or stretch == 1.0:
+        return samples.astype(np.float64, copy=False)
+    frame = max(4, int(sample_rate * frame_ms / 1000) // 2 * 2)
+    hop = frame // 2
+    tolerance = max(1, int(sample_rate * tolerance_ms / 1000))
+    out_len = int(round(samples.size * stretch))
+    frames = out_len // hop + 1
+    window = _hann(frame)
+    pad_end = 2 * frame + 2 * tolerance + int(math.ceil(hop / stretch))
+    padded = np.pad(samples.astype(np.float64, copy=False), (tolerance, pad_end))
+    out = np.zeros(frames * hop + frame)
+    previous = 0
+    for k in range(frames):
+        nominal = min(int(k * hop / stretch), samples.size)
+        if k == 0:
+            position = nominal
+        else:
+            # Continuación natural del fragmento anterior: se busca el desplazamiento
+            # (dentro de la tolerancia) que más se le parece para no romper la onda
+            natural = padded[previous + hop + tolerance:previous + hop + tolerance + frame]
+            region = padded[nominal:nominal + frame + 2 * tolerance]
+            offset = int(np.argmax(np.correlate(region, natural, "valid")))
+            position = nominal - tolerance + offset
+        out[k * hop:k * hop + frame] += padded[position + tolerance:position + tolerance + frame] * window
+        previous = position
+    return out[:out_len]
+
+
+def shift_pcm(pcm: bytes, sample_rate: int, channels: int, semitones: float, tempo: float = 1.0) -> bytes:
+    """Devuelve ``pcm`` (s16le) con el tono movido ``semitones`` y la velocidad por ``tempo``."""
+    if np is None:
+        raise RuntimeError("NumPy no está instalado")
+    count = len(pcm) // SAMPLE_WIDTH
+    samples = np.frombuffer(pcm, dtype="<i2", count=count - count % max(1, channels))
+    if not samples.size:
+        # Sin muestras (mp3 vacío o cortado) no hay nada que mover: np.interp fallaría
+        return pcm
+    samples = samples.reshape(-1, max(1, channels)).astype(np.float64)
+    ratio = 2.0 ** (semitones / 12.0)
+    processed = []
+    for channel in samples.T:
+        if ratio != 1.0:
+            channel = _resample(channel, 1.0 / ratio)
+        # Tras remuestrear dura 1/ratio veces; se deja en 1/tempo veces el original
+        processed.append(wsola(channel, ratio / tempo, sample_rate))
+    length = min(channel.size for channel in processed)
+    mixed = np.stack([channel[:length] for channel in processed], axis=1)
+    return np.clip(np.rint(mixed), -32768, 32767).astype("<i2").tobytes()
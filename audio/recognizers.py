@@ -0,0 +1,146 @@
+"""Motores de reconocimiento de voz locales, registrados por nombre.
+
+A diferencia del reconocimiento de Google (que recibe la frase entera cuando el
+usuario ya ha terminado), estos motores reciben el audio por bloques mientras se
+habla: :class:`RecognitionSession` va dando resultados parciales y la
+transcripción final está lista casi en cuanto el usuario se calla. El modelo se
+carga una vez y queda en memoria; cada escucha solo crea una sesión nueva.
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import threading
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+
+class RecognizerOptions(NamedTuple):
+    language: str = "es"
+    model: Optional[str] = None  # carpeta del modelo de Vosk
+
+
+class RecognitionSession:
+    """Una frase en curso: recibe PCM s16le mono y devuelve texto."""
+
+    def accept(self, pcm: bytes) -> bool:
+        """Procesa un bloque. True si el motor da por terminada una frase con texto."""
+        raise NotImplementedError
+
+    def partial(self) -> str:
+        """Lo reconocido hasta ahora (puede cambiar con los bloques siguientes)."""
+        return ""
+
+    def result(self) -> str:
+        """Transcripción final con todo lo recibido."""
+        raise NotImplementedError
+
+
+class SpeechRecognizer:
+    """Interfaz de un motor de reconocimiento local."""
+
+    name = ""
+
+    def is_available(self, options: RecognizerOptions) -> bool:
+        return True
+
+    def load(self, options: RecognizerOptions) -> None:
+        """Carga el modelo por adelantado, para que la primera escucha no lo espere."""
+
+    def start(self, options: RecognizerOptions, sample_rate: int,
+              grammar: Optional[list[str]] = None) -> RecognitionSession:
+        """Nueva frase. ``grammar`` limita el vocabulario (por ejemplo, a la palabra de activación)."""
+        raise NotImplementedError
+
+
+class _VoskSession(RecognitionSession):
+    def __init__(self, recognizer) -> None:
+        self._recognizer = recognizer
+        self._phrases: list[str] = []
+
+    def accept(self, pcm: bytes) -> bool:
+        if not self._recognizer.AcceptWaveform(pcm):
+            return False
+        # Vosk también cierra tramos de puro silencio: esos no cuentan como frase
+        text = json.loads(self._recognizer.Result()).get("text", "")
+        if text:
+            self._phrases.append(text)
+        return bool(text)
+
+    def partial(self) -> str:
+        current = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._phrases + ([current] if current else []))
+
+    def result(self) -> str:
+        last = json.loads(self._recognizer.FinalResult()).get("text", "")
+        return " ".join(self._phrases + ([last] if last else []))
+
+
+class VoskRecognizer(SpeechRecognizer):
+    """Vosk (Kaldi en CPU). El modelo se indica con ``"vosk_model"`` en la configuración."""
+
+    name = "vosk"
+
+    def __init__(self) -> None:
+        self._models: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def is_available(self, options: RecognizerOptions) -> bool:
+        # Sin importar vosk: el proceso de la interfaz no lo necesita si reconoce el proceso de audio
+        return bool(options.model) and Path(options.model).is_dir() and importlib.util.find_spec("vosk") is not None
+
+    def _get_model(self, path: str):
+        with self._lock:
+            model = self._models.get(path)
+            if model is None:
+                import vosk
+                vosk.SetLogLevel(-1)
+                model = self._models[path] = vosk.Model(path)
+            return model
+
+    def load(self, options: RecognizerOptions) -> None:
+        if not options.model:
+            raise RuntimeError("Falta 'vosk_model' en la configuración")
+        self._get_model(options.model)
+
+    def start(self, options: RecognizerOptions, sample_rate: int,
+              grammar: Optional[list[str]] = None) -> RecognitionSession:
+        import vosk
+        if not options.model:
+            raise RuntimeError("Falta 'vosk_model' en la configuración")
+        model = self._get_model(options.model)
+        if grammar:
+            # Con pocas palabras posibles la búsqueda es mucho más barata
+            return _VoskSession(vosk.KaldiRecognizer(model, float(sample_rate), json.dumps(grammar)))
+        return _VoskSession(vosk.KaldiRecognizer(model, float(sample_rate)))
+
+
+_factories: dict[str, Callable[[], SpeechRecognizer]] = {}
+_instances: dict[str, SpeechRecognizer] = {}
+_registry_lock = threading.Lock()
+
+
+def register_recognizer(name: str, factory: Callable[[], SpeechRecognizer]) -> None:
+    """Registra (o sustituye) un motor; se instancia la primera vez que se pide."""
+    with _registry_lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def recognizer_names() -> tuple[str, ...]:
+    with _registry_lock:
+        return tuple(_factories)
+
+
+def get_recognizer(name: str) -> SpeechRecognizer:
+    with _registry_lock:
+        recognizer = _instances.get(name)
+        if recognizer is None:
+            factory = _factories.get(name)
+            if factory is None:
+                raise KeyError(f"Motor de reconocimiento desconocido: {name}")
+            recognizer = _instances[name] = factory()
+        return recognizer
+
+
+register_recognizer(VoskRecognizer.name, VoskRecognizer)
@@ -0,0 +1,152 @@
+"""Cola única de voz: un solo hilo habla, por prioridad, sin repetir frases ya en cola."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+# Menor número = se dice antes.
+PRIORITY_REMINDER = 0
+PRIORITY_REPLY = 10
+PRIORITY_CONFIRMATION = 20
+
+
+class SpeechRequest:
+    """Una frase pendiente. ``future`` se resuelve a True si sonó entera y a False si se cortó."""
+
+    def __init__(self, text: str, priority: int):
+        self.text = text
+        self.kind = priority  # prioridad con la que se pidió (la de la cola puede subir)
+        self.priority = priority
+        self.future: Future[bool] = Future()
+        self.taken = False
+        self.interrupted = False
+        self.stop_event = threading.Event()  # la consulta ``speak`` para cortar a mitad
+
+
+class SpeechService:
+    """Reproduce las frases de una en una con ``speak(texto, stop_event)`` (bloqueante).
+
+    - Los recordatorios pasan por delante de las respuestas, y estas de las confirmaciones.
+    - Una frase idéntica a otra que ya espera en cola no se añade: se devuelve su futuro.
+    - Una respuesta nueva cancela las respuestas anteriores, tanto en cola como sonando
+      (para cortar la que suena se activa su ``stop_event`` y se llama a ``interrupt``).
+
+    ``interrupt`` (parar la salida de audio, los motores, el proceso de audio) se llama
+    sin el cerrojo, para no bloquear ``submit`` mientras tanto; la frase siguiente no
+    empieza hasta que termina.
+    """
+
+    def __init__(self, speak: Callable[[str, threading.Event], None], interrupt: Callable[[], None]):
+        self._speak = speak
+        self._interrupt = interrupt
+        self._cond = threading.Condition()
+        self._heap: list[tuple[int, int, SpeechRequest]] = []
+        self._seq = itertools.count()
+        self._queued: dict[str, SpeechRequest] = {}
+        self._current: Optional[SpeechRequest] = None
+        self._interrupting = 0  # interrupciones pedidas que aún no han terminado
+        self._thread: Optional[threading.Thread] = None
+        self._counts = {"spoken": 0, "interrupted": 0, "deduplicated": 0, "cancelled": 0}
+
+    def submit(self, text: str, priority: int = PRIORITY_REPLY) -> Future[bool]:
+        interrupt = False
+        with self._cond:
+            existing = self._queued.get(text)
+            if existing is not None:
+                self._counts["deduplicated"] += 1
+                if priority < existing.priority:
+                    existing.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), existing))
+                    self._cond.notify()
+                return existing.future
+            if priority == PRIORITY_REPLY:
+                _, interrupt = self._cancel_locked(PRIORITY_REPLY)
+            request = SpeechRequest(text, priority)
+            self._queued[text] = request
+            heapq.heappush(self._heap, (priority, next(self._seq), request))
+            self._ensure_worker()
+            self._cond.notify()
+        if interrupt:
+            self._run_interrupt()
+        return request.future
+
+    def cancel(self, kind: Optional[int] = None) -> int:
+        """Cancela lo pendiente y corta lo que suena (solo de ``kind`` si se indica)."""
+        with self._cond:
+            cancelled, interrupt = self._cancel_locked(kind)
+        if interrupt:
+            self._run_interrupt()
+        return cancelled
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            stats = dict(self._counts)
+            stats["queued"] = len(self._queued)
+            return stats
+
+    def _cancel_locked(self, kind: Optional[int]) -> tuple[int, bool]:
+        """Cancela bajo el cerrojo; True si hay que llamar a :meth:`_run_interrupt` al soltarlo."""
+        cancelled = 0
+        for text, request in list(self._queued.items()):
+            if kind is None or request.kind == kind:
+                del self._queued[text]
+                if request.future.cancel():
+                    cancelled += 1
+        current = self._current
+        if current is not None and not current.interrupted and (kind is None or current.kind == kind):
+            current.interrupted = True
+            current.stop_event.set()
+            cancelled += 1
+            # La siguiente frase espera a que termine la interrupción
+            self._interrupting += 1
+            interrupt = True
+        else:
+            interrupt = False
+        self._counts["cancelled"] += cancelled
+        return cancelled, interrupt
+
+    def _run_interrupt(self) -> None:
+        try:
+            self._interrupt()
+        finally:
+            with self._cond:
+                self._interrupting -= 1
+                self._cond.notify_all()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="neno-voz", daemon=True)
+            self._thread.start()
+
+    def _next_request(self) -> SpeechRequest:
+        with self._cond:
+            while True:
+                while not self._heap or self._interrupting:
+                    self._cond.wait()
+                _, _, request = heapq.heappop(self._heap)
+                # Entradas repetidas por subir de prioridad, o ya canceladas
+                if request.taken or request.future.cancelled():
+                    continue
+                request.taken = True
+                if self._queued.get(request.text) is request:
+                    del self._queued[request.text]
+                if request.future.set_running_or_notify_cancel():
+                    self._current = request
+                    return request
+
+    def _run(self) -> None:
+        while True:
+            request = self._next_request()
+            try:
+                self._speak(request.text, request.stop_event)
+            except Exception as exc:
+                request.future.set_exception(exc)
+            else:
+                request.future.set_result(not request.interrupted)
+            finally:
+                with self._cond:
+                    self._current = None
+                    self._counts["interrupted" if request.interrupted else "spoken"] += 1
@@ -0,0 +1,155 @@
+"""Voz en streaming: el texto se trocea en frases y se sintetiza una por delante de la que suena."""
+from __future__ import annotations
+
+import queue
+import re
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+# El primer fragmento es corto para que la voz empiece cuanto antes.
+FIRST_CHUNK_CHARS = 90
+MAX_CHUNK_CHARS = 220
+# Fragmentos más cortos se unen al anterior: gTTS entona peor las frases sueltas.
+MIN_CHUNK_CHARS = 25
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…;:])\s+")
+_CLAUSE_END_RE = re.compile(r"(?<=,)\s+")
+
+
+def _pack(parts: list[str], limit: int, sep: str = " ") -> list[str]:
+    """Agrupa trozos consecutivos sin pasar de ``limit`` caracteres."""
+    packed: list[str] = []
+    for part in parts:
+        if packed and len(packed[-1]) + len(sep) + len(part) <= limit:
+            packed[-1] = f"{packed[-1]}{sep}{part}"
+        else:
+            packed.append(part)
+    return packed
+
+
+def _split_long(sentence: str, limit: int) -> list[str]:
+    if len(sentence) <= limit:
+        return [sentence]
+    pieces: list[str] = []
+    for clause in _pack(_CLAUSE_END_RE.split(sentence), limit):
+        if len(clause) <= limit:
+            pieces.append(clause)
+        else:
+            pieces.extend(_pack(clause.split(), limit))
+    return pieces
+
+
+def split_for_speech(text: str, first_chars: int = FIRST_CHUNK_CHARS,
+                     max_chars: int = MAX_CHUNK_CHARS, min_chars: int = MIN_CHUNK_CHARS) -> list[str]:
+    """Divide ``text`` en frases (o cláusulas si son largas) listas para sintetizar por separado."""
+    sentences = [s for s in _SENTENCE_END_RE.split((text or "").strip()) if s]
+    chunks: list[str] = []
+    for sentence in sentences:
+        for piece in _split_long(sentence, first_chars if not chunks else max_chars):
+            limit = first_chars if len(chunks) == 1 else max_chars
+            if chunks and len(piece) < min_chars and len(chunks[-1]) + 1 + len(piece) <= limit:
+                chunks[-1] = f"{chunks[-1]} {piece}"
+            else:
+                chunks.append(piece)
+    return chunks
+
+
+class StreamItem(NamedTuple):
+    index: int
+    text: str
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+class SpeechStream:
+    """Sintetiza los fragmentos en un hilo propio y los entrega en orden con :meth:`get`.
+
+    Solo va ``lookahead`` fragmentos por delante de lo que se reproduce, así no se
+    gasta red ni CPU en frases que quizá se cancelen. Como la salida encola y vuelve
+    enseguida, quien reproduce avisa con :meth:`mark_playing` de cuándo termina cada
+    fragmento, y el fragmento ``i`` no se sintetiza hasta que ha sonado el
+    ``i - lookahead - 1``.
+    """
+
+    _END = object()
+
+    def __init__(self, chunks: list[str], render: Callable[[str], Any], lookahead: int = 1):
+        self.chunks = list(chunks)
+        self.started = time.monotonic()
+        self.first_sound: Optional[float] = None
+        self._render = render
+        self._lookahead = max(1, lookahead)
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=self._lookahead)
+        self._playing: dict[int, threading.Event] = {}
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name="neno-tts-stream", daemon=True)
+        self._thread.start()
+
+    @property
+    def time_to_first_sound(self) -> Optional[float]:
+        if self.first_sound is None:
+            return None
+        return self.first_sound - self.started
+
+    def mark_first_sound(self) -> None:
+        if self.first_sound is None:
+            self.first_sound = time.monotonic()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[StreamItem]:
+        """Siguiente fragmento, ``None`` al terminar; lanza ``queue.Empty`` si vence ``timeout``."""
+        item = self._queue.get(timeout=timeout)
+        if item is self._END:
+            self._queue.put(self._END)  # que las siguientes llamadas también vean el final
+            return None
+        return item
+
+    def mark_playing(self, index: int, done: threading.Event) -> None:
+        """El fragmento ``index`` está en la salida; ``done`` se activa cuando acaba de sonar."""
+        self._playing[index] = done
+
+    def remaining_text(self, index: int) -> str:
+        """Texto desde el fragmento ``index`` (para terminar con otro motor)."""
+        return " ".join(self.chunks[index:])
+
+    def close(self) -> None:
+        self._closed.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _produce(self) -> None:
+        for index, chunk in enumerate(self.chunks):
+            if index > self._lookahead and not self._wait_played(index - self._lookahead - 1):
+                return
+            if self._closed.is_set():
+                return
+            try:
+                item = StreamItem(index, chunk, self._render(chunk))
+            except Exception as exc:
+                self._put(StreamItem(index, chunk, error=exc))
+                return
+            if not self._put(item):
+                return
+        self._put(self._END)
+
+    def _wait_played(self, index: int) -> bool:
+        """Espera a que acabe de sonar el fragmento ``index``; False si se cerró el flujo."""
+        while not self._closed.is_set():
+            done = self._playing.get(index)
+            if done is None:
+                self._closed.wait(0.05)
+            elif done.wait(0.1):
+                return True
+        return False
+
+    def _put(self, item: Any) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -0,0 +1,212 @@
+"""Caché en disco del audio sintetizado, direccionada por contenido y con expulsión LRU."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from .pcm import SpeechAudio
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Súbelo si cambia la forma de generar el audio: las entradas antiguas dejan de coincidir.
+_KEY_VERSION = 2
+_META_SUFFIX = ".json"
+_AUDIO_FORMAT = "s16le"
+_TMP_SUFFIX = ".tmp"
+# Restos (temporales, audio sin metadatos) más antiguos que esto se borran al
+# indexar; los recientes pueden ser de otro proceso que está escribiendo.
+_STALE_S = 60.0
+
+
+def speech_cache_key(text: str, engine: str, gender: str, params: Optional[dict[str, Any]] = None) -> str:
+    """Clave estable para un texto ya saneado y los parámetros que cambian el audio."""
+    payload = json.dumps(
+        {"v": _KEY_VERSION, "text": text, "engine": engine, "gender": gender, "params": params or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Guarda ``<clave>.s16le`` (PCM) + ``<clave>.json`` y expulsa lo menos usado al pasar del límite.
+
+    El orden LRU se reconstruye al arrancar a partir de la fecha de modificación de
+    los metadatos, que se actualiza en cada acierto. Una entrada solo es válida si
+    existen sus metadatos, que se escriben siempre después del audio.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Optional[OrderedDict[str, int]] = None
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[SpeechAudio]:
+        with self._lock:
+            entries = self._index()
+            speech = self._read_entry(key) if key in entries else None
+            if speech is None:
+                if key in entries:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(self._meta_path(key))
+        except OSError:
+            pass
+        return speech
+
+    def contains(self, key: str) -> bool:
+        """Como :meth:`get` pero sin tocar contadores ni el orden LRU."""
+        with self._lock:
+            return key in self._index()
+
+    def put(self, key: str, speech: SpeechAudio) -> bool:
+        """Guarda el audio; devuelve False si no se pudo escribir."""
+        meta = {
+            "format": _AUDIO_FORMAT,
+            "sample_rate": speech.sample_rate,
+            "channels": speech.channels,
+            "envelope": list(speech.envelope),
+            "frame_interval_ms": speech.frame_interval_ms,
+        }
+        with self._lock:
+            entries = self._index()
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                _atomic_write(self._audio_path(key), speech.pcm)
+                meta_blob = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+                _atomic_write(self._meta_path(key), meta_blob)
+            except OSError as exc:
+                print(f"No se pudo guardar el audio en caché: {exc}")
+                return False
+            if key in entries:
+                self._total_bytes -= entries[key]
+            size = len(speech.pcm) + len(meta_blob)
+            entries[key] = size
+            entries.move_to_end(key)
+            self._total_bytes += size
+            self._evict()
+        return True
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries = self._index()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._index()):
+                self._drop(key)
+
+    def _index(self) -> OrderedDict[str, int]:
+        if self._entries is not None:
+            return self._entries
+        found: list[tuple[float, str]] = []
+        sizes: dict[str, int] = {}
+        files: dict[str, list[tuple[Path, float]]] = {}
+        stale_before = time.time() - _STALE_S
+        try:
+            paths = list(self.directory.iterdir())
+        except OSError:
+            paths = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.suffix == _TMP_SUFFIX:
+                # Escritura interrumpida (``_atomic_write``): nunca llegará a ser una entrada
+                if stat.st_mtime < stale_before:
+                    _unlink(path)
+                continue
+            key = path.stem
+            sizes[key] = sizes.get(key, 0) + stat.st_size
+            files.setdefault(key, []).append((path, stat.st_mtime))
+            if path.suffix == _META_SUFFIX:
+                found.append((stat.st_mtime, key))
+        valid = {key for _, key in found}
+        for key, orphans in files.items():
+            # Audio sin metadatos: no es una entrada válida ni cuenta para el límite
+            if key not in valid and all(mtime < stale_before for _, mtime in orphans):
+                for path, _ in orphans:
+                    _unlink(path)
+        found.sort()
+        self._entries = OrderedDict((key, sizes[key]) for _, key in found)
+        self._total_bytes = sum(self._entries.values())
+        self._evict()
+        return self._entries
+
+    def _read_entry(self, key: str) -> Optional[SpeechAudio]:
+        try:
+            meta = json.loads(self._meta_path(key).read_text(encoding="utf-8"))
+            if meta.get("format") != _AUDIO_FORMAT:
+                return None
+            return SpeechAudio(
+                self._audio_path(key).read_bytes(),
+                int(meta["sample_rate"]),
+                int(meta.get("channels", 1)),
+                [int(state) for state in meta.get("envelope", [])],
+                int(meta.get("frame_interval_ms", 50)),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _evict(self) -> None:
+        # Siempre se conserva la entrada más reciente aunque supere el límite por sí sola.
+        entries = self._entries
+        if entries is None:
+            return
+        while self._total_bytes > self.max_bytes and len(entries) > 1:
+            oldest = next(iter(entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entries = self._entries
+        if entries is not None and key in entries:
+            self._total_bytes -= entries.pop(key)
+        for path in self.directory.glob(f"{key}.*"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}{_META_SUFFIX}"
+
+    def _audio_path(self, key: str) -> Path:
+        return self.directory / f"{key}.{_AUDIO_FORMAT}"
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}{_TMP_SUFFIX}")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
@@ -0,0 +1,150 @@
+"""Detección de voz (VAD) y de final de frase sobre el audio de la captura.
+
+:class:`Endpointer` recibe el PCM por bloques de cualquier tamaño, lo parte en
+tramas de 30 ms y decide con un detector de voz cuándo empieza y cuándo acaba la
+frase: la frase termina tras ``hangover_ms`` de silencio seguido, y el audio que
+devuelve ya viene sin el silencio del principio ni del final. El detector es un
+modelo de energía que sigue el ruido de fondo o, si está instalado, WebRTC VAD.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Optional
+
+from .levels import block_levels
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+FRAME_MS = 30
+DEFAULT_HANGOVER_MS = 300
+DEFAULT_PRE_ROLL_MS = 150
+DEFAULT_MIN_SPEECH_MS = 90
+TRAILING_PAD_MS = 90  # silencio que se deja tras la última trama con voz
+MIN_THRESHOLD = 0.003  # unos -50 dBFS: por debajo nunca se considera voz
+
+
+class EnergyVAD:
+    """Voz = RMS de la trama por encima del ruido de fondo multiplicado por ``ratio``.
+
+    El ruido de fondo se sigue con una media exponencial de las tramas sin voz.
+    ``threshold`` (0-1) lo inicializa, por ejemplo con la calibración guardada; sin
+    él, la primera trama se toma como ruido.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, ratio: float = 2.0, adapt: float = 0.05):
+        self.ratio = ratio
+        self.adapt = adapt
+        self.noise: Optional[float] = threshold / ratio if threshold else None
+
+    @property
+    def threshold(self) -> float:
+        return max(MIN_THRESHOLD, (self.noise or 0.0) * self.ratio)
+
+    def is_speech(self, frame: bytes) -> bool:
+        rms = block_levels(frame).rms
+        if self.noise is None:
+            self.noise = rms
+            return False
+        speech = rms > self.threshold
+        if not speech:
+            self.noise += (rms - self.noise) * self.adapt
+        return speech
+
+
+class WebRTCVAD:
+    """WebRTC VAD (``webrtcvad``); ``aggressiveness`` de 0 (permisivo) a 3 (estricto)."""
+
+    def __init__(self, sample_rate: int, aggressiveness: int = 2):
+        if webrtcvad is None:
+            raise RuntimeError("webrtcvad no está instalado")
+        self.sample_rate = sample_rate
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame: bytes) -> bool:
+        return self._vad.is_speech(frame, self.sample_rate)
+
+
+def make_vad(mode: str, sample_rate: int, threshold: Optional[float] = None):
+    """``"webrtc"``, ``"energy"`` o ``"auto"`` (WebRTC si está instalado)."""
+    if mode == "webrtc" or (mode == "auto" and webrtcvad is not None):
+        try:
+            return WebRTCVAD(sample_rate)
+        except Exception as e:
+            print(f"No se pudo usar WebRTC VAD ({e}). Se usa el detector por energía.")
+    return EnergyVAD(threshold)
+
+
+class Endpointer:
+    """Encuentra el principio y el final de una frase en un stream PCM s16le mono.
+
+    :meth:`feed` devuelve True cuando la frase ha terminado; :meth:`audio` da la
+    frase recortada. ``endpoint_latency_ms`` es cuánto pasó (en tiempo real) desde
+    que llegó la última trama con voz hasta que se dio la frase por terminada.
+    """
+
+    def __init__(self, vad, sample_rate: int, hangover_ms: int = DEFAULT_HANGOVER_MS,
+                 pre_roll_ms: int = DEFAULT_PRE_ROLL_MS, min_speech_ms: int = DEFAULT_MIN_SPEECH_MS):
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.frame_bytes = sample_rate * FRAME_MS // 1000 * 2
+        self.hangover_frames = max(1, hangover_ms // FRAME_MS)
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.trailing_frames = min(self.hangover_frames, TRAILING_PAD_MS // FRAME_MS)
+        self._pending = bytearray()
+        self._pre_roll: deque[bytes] = deque(maxlen=max(0, pre_roll_ms // FRAME_MS) + self.min_speech_frames)
+        self._frames: list[bytes] = []
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._last_voiced = 0  # tramas de _frames hasta la última con voz
+        self._last_voiced_at = 0.0
+        self.started = False
+        self.ended = False
+        self.endpoint_latency_ms: Optional[float] = None
+
+    def feed(self, pcm) -> bool:
+        if self.ended:
+            return True
+        self._pending += pcm
+        offset = 0
+        while len(self._pending) - offset >= self.frame_bytes and not self.ended:
+            self._process(bytes(self._pending[offset:offset + self.frame_bytes]))
+            offset += self.frame_bytes
+        del self._pending[:offset]
+        return self.ended
+
+    def _process(self, frame: bytes) -> None:
+        speech = self.vad.is_speech(frame)
+        if not self.started:
+            self._pre_roll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if speech else 0
+            if self._voiced_run >= self.min_speech_frames:
+                # Empieza la frase: incluye las tramas previas para no cortar la primera sílaba
+                self.started = True
+                self._frames = list(self._pre_roll)
+                self._last_voiced = len(self._frames)
+                self._last_voiced_at = time.monotonic()
+            return
+        self._frames.append(frame)
+        if speech:
+            self._silent_run = 0
+            self._last_voiced = len(self._frames)
+            self._last_voiced_at = time.monotonic()
+            return
+        self._silent_run += 1
+        if self._silent_run >= self.hangover_frames:
+            self.ended = True
+            self.endpoint_latency_ms = (time.monotonic() - self._last_voiced_at) * 1000
+
+    @property
+    def speech_ms(self) -> int:
+        return self._last_voiced * FRAME_MS
+
+    def audio(self) -> bytes:
+        """La frase sin el silencio inicial (salvo el margen previo) ni el final."""
+        if not self.started:
+            return b""
+        return b"".join(self._frames[:self._last_voiced + self.trailing_frames])
@@ -0,0 +1,178 @@
+"""Palabra de activación ("Neno") siempre a la escucha sobre la captura compartida.
+
+Para gastar poca CPU, un detector de voz por energía (unos microsegundos por
+trama) decide qué tramos merece la pena mirar; solo esos se pasan a un
+reconocedor limitado a la palabra clave, y solo los primeros
+``MAX_SEGMENT_S`` segundos de cada tramo, porque las órdenes empiezan por
+"Neno". Al detectarla se avisa con la posición de la captura donde empezó el
+tramo: el reconocimiento de la orden lee desde ahí el audio que sigue en el
+búfer circular, así que no se pierde nada de lo dicho mientras tanto.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from .capture import CaptureService
+from .recognizers import RecognitionSession
+from .vad import FRAME_MS, EnergyVAD
+
+WAKE_WORD = "neno"
+MAX_SEGMENT_S = 2.0  # la palabra clave tiene que estar al principio del tramo
+SEGMENT_END_MS = 600  # silencio que cierra un tramo sin palabra clave
+PRE_ROLL_MS = 300
+MIN_VOICED_MS = 60
+REFRACTORY_S = 1.5  # tras una detección, tiempo sin volver a disparar
+READ_BYTES = 8192
+
+
+class WakeWordListener:
+    """Hilo que escucha la captura y llama a ``on_wake(posición)`` al oír la palabra clave.
+
+    ``start_session`` crea una sesión de reconocimiento limitada a la palabra clave.
+    Mientras ``is_blocked()`` sea cierto (se está escuchando una orden o hablando)
+    el audio se descarta.
+    """
+
+    def __init__(self, service: CaptureService, start_session: Callable[[], RecognitionSession],
+                 on_wake: Callable[[int], None], is_blocked: Callable[[], bool] = lambda: False,
+                 keyword: str = WAKE_WORD, energy_threshold: Optional[float] = None):
+        self.service = service
+        self.keyword = keyword.lower()
+        self._start_session = start_session
+        self._on_wake = on_wake
+        self._is_blocked = is_blocked
+        self._vad = EnergyVAD(energy_threshold)
+        self._quiet_until = 0.0
+        self._frame_bytes = service.rate * FRAME_MS // 1000 * 2
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"detections": 0, "segments": 0, "cpu_s": 0.0, "wall_s": 0.0}
+        self._reset()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="neno-palabra-clave", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(2.0)
+
+    def stats(self) -> dict[str, float]:
+        """Detecciones, tramos analizados y uso de CPU del hilo (% de un núcleo)."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        wall = stats.pop("wall_s")
+        stats["cpu_percent"] = 100.0 * stats.pop("cpu_s") / wall if wall else 0.0
+        return stats
+
+    def _run(self) -> None:
+        try:
+            reader = self.service.subscribe("palabra-clave")
+        except RuntimeError as e:
+            print(f"La palabra de activación no puede abrir el micrófono: {e}")
+            self._running = False
+            return
+        cpu_start, wall_start = time.thread_time(), time.monotonic()
+        pending = bytearray()
+        pending_position = reader.position
+        try:
+            while self._running:
+                chunk = reader.read(READ_BYTES, timeout=0.5)
+                if not chunk:
+                    if not self.service.running:
+                        print("La palabra de activación se detuvo: el micrófono dejó de dar audio.")
+                        break
+                    continue
+                chunk_start = reader.position - len(chunk)
+                if chunk_start != pending_position + len(pending):
+                    # El escritor adelantó al lector: lo pendiente ya no es contiguo
+                    pending.clear()
+                    pending_position = chunk_start
+                pending += chunk
+                if self._is_blocked() or time.monotonic() < self._quiet_until:
+                    self._reset()
+                    pending.clear()
+                    pending_position = reader.position
+                    continue
+                offset = 0
+                while len(pending) - offset >= self._frame_bytes:
+                    frame = bytes(pending[offset:offset + self._frame_bytes])
+                    position = pending_position + offset
+                    offset += self._frame_bytes
+                    wake_position = self._process(frame, position)
+                    if wake_position is not None:
+                        with self._stats_lock:
+                            self._stats["detections"] += 1
+                        self._quiet_until = time.monotonic() + REFRACTORY_S
+                        self._reset()
+                        try:
+                            self._on_wake(wake_position)
+                        except Exception as e:
+                            print(f"Error atendiendo la palabra de activación: {e}")
+                        break
+                del pending[:offset]
+                pending_position += offset
+                with self._stats_lock:
+                    self._stats["cpu_s"] = time.thread_time() - cpu_start
+                    self._stats["wall_s"] = time.monotonic() - wall_start
+        finally:
+            reader.close()
+            self._running = False
+
+    def _reset(self) -> None:
+        self._session: Optional[RecognitionSession] = None
+        self._pre_roll: deque[tuple[int, bytes]] = deque(maxlen=PRE_ROLL_MS // FRAME_MS)
+        self._segment_start = 0
+        self._segment_frames = 0
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._wait_for_pause = False
+
+    def _process(self, frame: bytes, position: int) -> Optional[int]:
+        """Pasa una trama; devuelve la posición del principio del tramo si contiene la palabra clave."""
+        speech = self._vad.is_speech(frame)
+        self._silent_run = 0 if speech else self._silent_run + 1
+        if self._session is None:
+            if self._wait_for_pause:
+                # Tras un tramo largo sin palabra clave, esperar a una pausa: la orden empieza después
+                if self._silent_run * FRAME_MS >= SEGMENT_END_MS:
+                    self._wait_for_pause = False
+                return None
+            self._pre_roll.append((position, frame))
+            self._voiced_run = self._voiced_run + 1 if speech else 0
+            if self._voiced_run < max(1, MIN_VOICED_MS // FRAME_MS):
+                return None
+            # Empieza un tramo con voz: al reconocedor desde el margen previo
+            self._session = self._start_session()
+            self._segment_start = self._pre_roll[0][0]
+            self._segment_frames = len(self._pre_roll)
+            with self._stats_lock:
+                self._stats["segments"] += 1
+            self._session.accept(b"".join(previous for _, previous in self._pre_roll))
+            self._pre_roll.clear()
+        else:
+            self._session.accept(frame)
+            self._segment_frames += 1
+        if self.keyword in self._session.partial().lower().split():
+            return self._segment_start
+        if self._silent_run * FRAME_MS >= SEGMENT_END_MS:
+            self._session = None
+            self._voiced_run = 0
+        elif self._segment_frames * FRAME_MS >= MAX_SEGMENT_S * 1000:
+            self._session = None
+            self._voiced_run = 0
+            self._wait_for_pause = True
+        return None
@@ -0,0 +1,454 @@
+"""Proceso aparte para la síntesis, el procesado de audio y el reconocimiento local.
+
+Decodificar el mp3, cambiar el tono, calcular la envolvente y reconocer voz son
+trabajos de CPU que, en hilos del proceso de la interfaz, compiten por el GIL con
+el bucle de Tk y la animación del avatar. Con el proceso auxiliar se hacen fuera:
+
+- El PCM viaja en bloques de ``multiprocessing.shared_memory``. Quien crea un
+  bloque es quien lo borra, cuando el otro lado ya lo ha copiado.
+- Por la conexión de control (un socket local con clave) solo van órdenes y
+  resultados pequeños: nombres de bloques, envolventes, texto.
+- Si el proceso muere, las peticiones en curso fallan con :class:`WorkerCrashed`
+  y se arranca otro enseguida, con los modelos que ya estaban cargados.
+
+El proceso se lanza con ``python -m audio.worker`` y no con ``multiprocessing``:
+este volvería a importar ``main.py`` (bandeja, Tk...) en el hijo.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Any, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+REQUEST_TIMEOUT_S = 60.0
+MAX_RESTARTS = 3  # en RESTART_WINDOW_S; si se supera, se deja de usar el proceso
+RESTART_WINDOW_S = 60.0
+WORKER_THREADS = 4
+
+
+class WorkerError(RuntimeError):
+    """La operación falló dentro del proceso auxiliar. ``network``: fue un fallo de red."""
+
+    def __init__(self, message: str, network: bool = False):
+        super().__init__(message)
+        self.network = network
+
+
+class WorkerCrashed(WorkerError):
+    """El proceso auxiliar murió o dejó de responder antes de contestar."""
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Abre un bloque creado por el otro proceso sin que este lo dé por suyo al salir."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13: el registro se deshace a mano
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _copy_shared(name: str, size: int) -> bytes:
+    shm = _attach(name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        shm.close()
+
+
+def _export(data: bytes) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+    return shm
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+# ---------------------------------------------------------------- proceso auxiliar
+
+class _Server:
+    """Lado del proceso auxiliar: atiende las órdenes que llegan por ``conn``."""
+
+    def __init__(self, conn) -> None:
+        self.conn = conn
+        self._send_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="neno-worker")
+        self._exported: dict[str, shared_memory.SharedMemory] = {}
+        self._exported_lock = threading.Lock()
+        self._sessions: dict[int, Any] = {}
+
+    def serve(self) -> None:
+        # Las sesiones de reconocimiento se atienden en orden aquí mismo; el resto, en paralelo
+        inline = {"session_start", "session_accept", "session_result", "session_close"}
+        while True:
+            try:
+                request_id, op, args = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            if op == "shutdown":
+                break
+            if op == "release":
+                self._release_export(*args)
+            elif op in inline:
+                self._handle(request_id, op, args)
+            else:
+                self._executor.submit(self._handle, request_id, op, args)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._exported_lock:
+            for shm in self._exported.values():
+                _release(shm)
+            self._exported.clear()
+
+    def _handle(self, request_id: int, op: str, args: tuple) -> None:
+        try:
+            result = (True, getattr(self, f"_op_{op}")(*args))
+        except Exception as e:
+            from .backends import is_network_error
+            result = (False, (f"{type(e).__name__}: {e}", is_network_error(e)))
+        with self._send_lock:
+            try:
+                self.conn.send((request_id, *result))
+            except OSError:
+                pass
+
+    def _release_export(self, name: str) -> None:
+        with self._exported_lock:
+            shm = self._exported.pop(name, None)
+        if shm is not None:
+            _release(shm)
+
+    def _share(self, data: bytes) -> tuple[str, int]:
+        shm = _export(data)
+        with self._exported_lock:
+            self._exported[shm.name] = shm
+        return shm.name, len(data)
+
+    def _op_ping(self) -> int:
+        return os.getpid()
+
+    def _op_render(self, backend_name: str, text: str, voice, http_timeout: Optional[float]):
+        from . import backends, http_pool
+        from .envelope import ENVELOPE_FRAME_MS, mouth_envelope
+        from .pcm import SAMPLE_WIDTH
+
+        if http_timeout:
+            http_pool.configure(timeout=http_timeout)
+        audio = backends.get_backend(backend_name).synthesize(text, voice)
+        envelope = mouth_envelope(audio.pcm, audio.sample_rate, audio.channels, SAMPLE_WIDTH)
+        name, size = self._share(audio.pcm)
+        return name, size, audio.sample_rate, audio.channels, envelope, ENVELOPE_FRAME_MS
+
+    def _op_stop_backends(self) -> None:
+        from . import backends
+        for backend in backends.loaded_backends():
+            try:
+                backend.stop()
+            except Exception:
+                pass
+
+    def _op_load(self, engine: str, options) -> None:
+        from . import recognizers
+        recognizers.get_recognizer(engine).load(options)
+
+    def _op_recognize(self, engine: str, options, sample_rate: int, name: str, size: int) -> str:
+        from . import recognizers
+        session = recognizers.get_recognizer(engine).start(options, sample_rate)
+        session.accept(_copy_shared(name, size))
+        return session.result()
+
+    def _op_session_start(self, session_id: int, engine: str, options, sample_rate: int,
+                          grammar: Optional[list[str]]) -> None:
+        from . import recognizers
+        self._sessions[session_id] = recognizers.get_recognizer(engine).start(options, sample_rate, grammar)
+
+    def _op_session_accept(self, session_id: int, pcm: bytes) -> tuple[bool, str]:
+        session = self._sessions[session_id]
+        finished = session.accept(pcm)
+        return finished, session.partial()
+
+    def _op_session_result(self, session_id: int) -> str:
+        return self._sessions.pop(session_id).result()
+
+    def _op_session_close(self, session_id: int) -> None:
+        self._sessions.pop(session_id, None)
+
+
+def main() -> None:
+    """Punto de entrada del proceso auxiliar: ``python -m audio.worker``."""
+    authkey = bytes.fromhex(sys.stdin.readline().strip())
+    with Listener(("127.0.0.1", 0), authkey=authkey) as listener:
+        # El padre lee el puerto de la primera línea; después stdout ya no se lee
+        print(listener.address[1], flush=True)
+        sys.stdout = sys.stderr
+        conn = listener.accept()
+    with conn:
+        _Server(conn).serve()
+
+
+# ---------------------------------------------------------------- proceso de la interfaz
+
+class RemoteSession:
+    """:class:`audio.recognizers.RecognitionSession` que se ejecuta en el proceso auxiliar."""
+
+    def __init__(self, worker: "AudioWorker", session_id: int):
+        self._worker = worker
+        self._id = session_id
+        self._partial = ""
+
+    def accept(self, pcm: bytes) -> bool:
+        finished, self._partial = self._worker.call("session_accept", self._id, bytes(pcm))
+        return finished
+
+    def partial(self) -> str:
+        # Llega con cada bloque: no hace falta otra ida y vuelta
+        return self._partial
+
+    def result(self) -> str:
+        return self._worker.call("session_result", self._id)
+
+    def __del__(self) -> None:
+        self._worker._notify("session_close", self._id)
+
+
+class RemoteRecognizer:
+    """Motor de :mod:`audio.recognizers` usado a través del proceso auxiliar."""
+
+    def __init__(self, worker: "AudioWorker", name: str):
+        self._worker = worker
+        self.name = name
+
+    def is_available(self, options) -> bool:
+        from . import recognizers
+        return recognizers.get_recognizer(self.name).is_available(options)
+
+    def load(self, options) -> None:
+        self._worker.load_recognizer(self.name, options)
+
+    def recognize(self, options, sample_rate: int, pcm: bytes) -> str:
+        """Transcribe una frase entera; el audio pasa por memoria compartida."""
+        return self._worker.recognize(self.name, options, sample_rate, pcm)
+
+    def start(self, options, sample_rate: int, grammar: Optional[list[str]] = None) -> RemoteSession:
+        session_id = next(self._worker._ids)
+        self._worker.call("session_start", session_id, self.name, options, sample_rate, grammar)
+        return RemoteSession(self._worker, session_id)
+
+
+class AudioWorker:
+    """Cliente del proceso auxiliar: lo arranca, le pasa órdenes y lo relanza si muere."""
+
+    def __init__(self, timeout: float = REQUEST_TIMEOUT_S):
+        self.timeout = timeout
+        self.restarts = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._send_lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._conn = None
+        self._pending: dict[int, Future] = {}
+        self._crashes: list[float] = []
+        self._loaded: dict[str, Any] = {}  # modelos a recargar si hay que relanzar el proceso
+        self._disabled = False
+        self._closing = False
+
+    @property
+    def alive(self) -> bool:
+        return self._conn is not None and self._process is not None and self._process.poll() is None
+
+    def start(self) -> bool:
+        """Arranca el proceso si no está en marcha. False si no se pudo o está desactivado."""
+        with self._lock:
+            if self.alive:
+                return True
+            if self._disabled:
+                return False
+            try:
+                self._spawn()
+            except Exception as e:
+                print(f"No se pudo arrancar el proceso de audio: {e}")
+                self._kill()
+                return False
+        for engine, options in list(self._loaded.items()):
+            try:
+                self.call("load", engine, options)
+            except WorkerError as e:
+                print(f"No se pudo recargar el modelo '{engine}' en el proceso de audio: {e}")
+        return True
+
+    def _spawn(self) -> None:
+        authkey = os.urandom(16)
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "audio.worker"], cwd=str(ROOT),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        self._process.stdin.write(authkey.hex() + "\n")
+        self._process.stdin.close()
+        line = self._process.stdout.readline().strip()
+        if not line.isdigit():
+            raise RuntimeError(f"el proceso terminó al arrancar (código {self._process.poll()})")
+        self._conn = Client(("127.0.0.1", int(line)), authkey=authkey)
+        threading.Thread(target=self._read_responses, args=(self._conn, self._process),
+                         name="neno-worker-respuestas", daemon=True).start()
+
+    def _read_responses(self, conn, process: subprocess.Popen) -> None:
+        while True:
+            try:
+                request_id, ok, result = conn.recv()
+            except (EOFError, OSError):
+                break
+            future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(WorkerError(*result))
+        self._on_exit(conn, process)
+
+    def _on_exit(self, conn, process: subprocess.Popen) -> None:
+        with self._lock:
+            if conn is not self._conn:
+                return
+            self._kill()
+            pending, self._pending = self._pending, {}
+            restart = not self._closing
+            if restart:
+                print(f"El proceso de audio terminó inesperadamente (código {process.poll()}).")
+                now = time.monotonic()
+                self._crashes = [t for t in self._crashes if now - t < RESTART_WINDOW_S] + [now]
+                if len(self._crashes) > MAX_RESTARTS:
+                    self._disabled = True
+                    restart = False
+                    print("Demasiados fallos del proceso de audio: se hace todo en el proceso principal.")
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(WorkerCrashed("el proceso de audio terminó"))
+        if restart:
+            self.restarts += 1
+            threading.Thread(target=self.start, name="neno-worker-reinicio", daemon=True).start()
+
+    def _kill(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+            try:
+                process.wait(2.0)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def send(self, op: str, *args: Any) -> Future:
+        """Envía una orden sin esperar; el resultado llega al ``Future``."""
+        if not self.alive and not self.start():
+            raise WorkerCrashed("el proceso de audio no está disponible")
+        request_id = next(self._ids)
+        future: Future = Future()
+        self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                self._conn.send((request_id, op, args))
+        except (OSError, AttributeError) as e:
+            self._pending.pop(request_id, None)
+            raise WorkerCrashed(f"no se pudo enviar la orden: {e}")
+        return future
+
+    def _notify(self, op: str, *args: Any) -> None:
+        """Orden sin respuesta; si el proceso ya no está, no hay nada que avisar."""
+        conn = self._conn
+        if conn is None:
+            return
+        try:
+            with self._send_lock:
+                conn.send((0, op, args))
+        except OSError:
+            pass
+
+    def call(self, op: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        future = self.send(op, *args)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            # Colgado: se mata y _on_exit lo relanza
+            print(f"El proceso de audio no respondió a '{op}'; se reinicia.")
+            with self._lock:
+                process = self._process
+            if process is not None and process.poll() is None:
+                process.kill()
+            raise WorkerCrashed(f"sin respuesta a '{op}'")
+
+    def render(self, backend_name: str, text: str, voice, http_timeout: Optional[float] = None
+               ) -> tuple[bytes, int, int, list[int], int]:
+        """Sintetiza y calcula la envolvente: ``(pcm, sample_rate, channels, envelope, frame_ms)``."""
+        name, size, sample_rate, channels, envelope, frame_ms = self.call(
+            "render", backend_name, text, voice, http_timeout)
+        try:
+            pcm = _copy_shared(name, size)
+        finally:
+            self._notify("release", name)
+        return pcm, sample_rate, channels, envelope, frame_ms
+
+    def recognize(self, engine: str, options, sample_rate: int, pcm: bytes) -> str:
+        shm = _export(pcm)
+        try:
+            return self.call("recognize", engine, options, sample_rate, shm.name, len(pcm))
+        finally:
+            _release(shm)
+
+    def load_recognizer(self, engine: str, options) -> None:
+        self._loaded[engine] = options
+        self.call("load", engine, options)
+
+    def recognizer(self, name: str) -> RemoteRecognizer:
+        return RemoteRecognizer(self, name)
+
+    def stop_backends(self) -> None:
+        if self.alive:
+            try:
+                self.send("stop_backends")
+            except WorkerError:
+                pass
+
+    def stats(self) -> dict[str, Any]:
+        return {"alive": self.alive, "restarts": self.restarts, "pending": len(self._pending),
+                "disabled": self._disabled, "pid": self._process.pid if self.alive else None}
+
+    def close(self) -> None:
+        with self._lock:
+            self._closing = True
+            self._notify("shutdown")
+            process = self._process
+        if process is not None:
+            try:
+                process.wait(2.0)
+            except subprocess.TimeoutExpired:
+                pass
+        with self._lock:
+            self._kill()
+            self._closing = False
+
+
+if __name__ == "__main__":
+    main()
@@ -18,13 +18,6 @@ import tkinter as tk
 from knowledge_base import find_answer, knowledge_file_path
 from scheduler import add_reminder
 from conversation_memory import (
-    extract_age_from_text,
-    extract_doctor_from_text,
-    extract_hospital_from_text,
-    extract_medical_condition_from_text,
-    extract_medication_from_text,
-    extract_name_from_text,
-    extract_treatment_from_text,
     find_user_age_from_history,
     find_user_doctor_from_history,
     find_user_hospital_from_history,
@@ -33,6 +26,7 @@ from conversation_memory import (
     find_user_name_from_history,
     find_user_treatment_from_history,
 )
+from .intents import INTENTS, IntentContext, IntentRouter
 from .shared_refs import AvatarWidgetRefs
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -53,6 +47,8 @@ except ImportError:  # pragma: no cover - dependencias opcionales
     get_gemini_chat = None
     is_gemini_available = lambda: False  # type: ignore[assignment]
 
+INTENT_ROUTER = IntentRouter(INTENTS)
+
 
 class AvatarCommandMixin(AvatarWidgetRefs):
     """Lógica de comandos, recordatorios y acciones del sistema."""
@@ -66,172 +62,176 @@ class AvatarCommandMixin(AvatarWidgetRefs):
     _lock_controls: Callable[[str], None]
     _unlock_controls: Callable[[], None]
 
-    def generate_response(self, message):
-        message_lower = message.lower()
-
-        introduced_name = extract_name_from_text(message)
-        if introduced_name:
-            return f"Encantado, {introduced_name}. Haré lo posible por recordarlo."
-
-        introduced_age = extract_age_from_text(message)
-        if introduced_age is not None:
-            return f"Perfecto, tomo nota: tienes {introduced_age} años."
-
-        introduced_doctor = extract_doctor_from_text(message)
-        if introduced_doctor:
-            return f"Entendido, tu profesional de cabecera es {introduced_doctor}."
-
-        introduced_medication = extract_medication_from_text(message)
-        if introduced_medication:
-            return f"Gracias por avisarme. Recordaré que tu medicación incluye {introduced_medication}."
-
-        introduced_hospital = extract_hospital_from_text(message)
-        if introduced_hospital:
-            return f"Perfecto, tendré presente que te atienden en {introduced_hospital}."
-
-        introduced_condition = extract_medical_condition_from_text(message)
-        if introduced_condition:
-            return f"Lo siento, cuidaré de recordarte que padeces {introduced_condition}."
-
-        introduced_treatment = extract_treatment_from_text(message)
-        if introduced_treatment:
-            return f"De acuerdo, tomaré nota de que sigues el tratamiento {introduced_treatment}."
-
-        if self._is_name_question(message_lower):
-            remembered_name = find_user_name_from_history()
-            if remembered_name:
-                return f"Me dijiste que te llamas {remembered_name}."
-            return "Aún no me has dicho tu nombre. Puedes decirme: 'Mi nombre es ...'."
-
-        if self._is_age_question(message_lower):
-            remembered_age = find_user_age_from_history()
-            if remembered_age is not None:
-                return f"Recuerdo que me dijiste que tienes {remembered_age} años."
-            return "Todavía no sé tu edad. Puedes decirme: 'Tengo X años'."
-
-        if self._is_doctor_question(message_lower):
-            remembered_doctor = find_user_doctor_from_history()
-            if remembered_doctor:
-                return f"Me comentaste que tu médico es {remembered_doctor}."
-            return "Aún no me has contado quién es tu médico habitual."
-
-        if self._is_medication_question(message_lower):
-            remembered_medication = find_user_medication_from_history()
-            if remembered_medication:
-                return f"Sé que tu medicación incluye {remembered_medication}."
-            return "Todavía no sé qué medicación tomas. Puedes decirme: 'Mi medicación es ...'."
-
-        if self._is_hospital_question(message_lower):
-            remembered_hospital = find_user_hospital_from_history()
-            if remembered_hospital:
-                return f"Me dijiste que te atienden en {remembered_hospital}."
-            return "No recuerdo que me hayas mencionado tu hospital o clínica habitual."
-
-        if self._is_condition_question(message_lower):
-            remembered_condition = find_user_medical_condition_from_history()
-            if remembered_condition:
-                return f"Recuerdo que padeces {remembered_condition}."
-            return "Aún no me has contado qué dolencia o enfermedad tienes."
-
-        if self._is_treatment_question(message_lower):
-            remembered_treatment = find_user_treatment_from_history()
-            if remembered_treatment:
-                return f"Sé que sigues el tratamiento {remembered_treatment}."
-            return "Todavía no me has contado qué tratamiento sigues."
-
-        if self._is_email_command(message_lower):
-            if self.open_mail_client():
-                return "Abriendo tu gestor de correo predeterminado."
-            return "No pude abrir tu gestor de correo en este sistema."
-
-        if self._is_document_command(message_lower):
-            if self.open_text_editor():
-                return "Abriendo un documento en tu editor de texto predeterminado."
-            return "No pude abrir el editor de texto en este sistema."
-
-        if "neno" in message_lower and "charlemos" in message_lower:
-            if GEMINI_ENABLED and get_gemini_chat is not None and is_gemini_available():
-                self.gemini_mode = True
-                gemini = get_gemini_chat()
-                if gemini.start_conversation():
-                    return (
-                        "¡Claro! Estoy listo para charlar. Pregúntame lo que quieras. "
-                        "(Di Neno, termina ... para salir del modo conversación)"
-                    )
-                return "Lo siento, no pude conectarme con Gemini. Verifica tu conexión a internet y tu API key."
-            return "Lo siento, necesito que configures tu API key de Gemini en Preferencias para poder charlar."
-
-        if self.gemini_mode and ("neno" in message_lower and "termina" in message_lower):
-            self.gemini_mode = False
-            if GEMINI_ENABLED and get_gemini_chat is not None:
-                gemini = get_gemini_chat()
-                return gemini.end_conversation()
-            return "Modo conversación finalizado."
-
-        if self.gemini_mode:
-            try:
-                if GEMINI_ENABLED and get_gemini_chat is not None:
-                    gemini = get_gemini_chat()
-                    return gemini.send_message(message)
-                return "No puedo conectar con Gemini en este momento."
-            except Exception as exc:
-                print(f"Error con Gemini: {exc}")
-                self.gemini_mode = False
-                return "Lo siento, hubo un error con Gemini. Volviendo al modo normal."
-
-        handled_reminder, reminder_response = self._handle_reminder_request(message)
-        if handled_reminder:
-            return reminder_response
-
-        if self._is_document_command(message_lower):
+    def generate_response(self, message, source: str = "text"):
+        """Resuelve el mensaje con la tabla de intenciones (compartida por texto y voz)."""
+        return INTENT_ROUTER.dispatch(self, message, source)
+
+    def _intent_introduce_name(self, ctx: IntentContext):
+        return f"Encantado, {ctx.value}. Haré lo posible por recordarlo."
+
+    def _intent_introduce_age(self, ctx: IntentContext):
+        return f"Perfecto, tomo nota: tienes {ctx.value} años."
+
+    def _intent_introduce_doctor(self, ctx: IntentContext):
+        return f"Entendido, tu profesional de cabecera es {ctx.value}."
+
+    def _intent_introduce_medication(self, ctx: IntentContext):
+        return f"Gracias por avisarme. Recordaré que tu medicación incluye {ctx.value}."
+
+    def _intent_introduce_hospital(self, ctx: IntentContext):
+        return f"Perfecto, tendré presente que te atienden en {ctx.value}."
+
+    def _intent_introduce_condition(self, ctx: IntentContext):
+        return f"Lo siento, cuidaré de recordarte que padeces {ctx.value}."
+
+    def _intent_introduce_treatment(self, ctx: IntentContext):
+        return f"De acuerdo, tomaré nota de que sigues el tratamiento {ctx.value}."
+
+    def _intent_ask_name(self, ctx: IntentContext):
+        remembered_name = find_user_name_from_history()
+        if remembered_name:
+            return f"Me dijiste que te llamas {remembered_name}."
+        return "Aún no me has dicho tu nombre. Puedes decirme: 'Mi nombre es ...'."
+
+    def _intent_ask_age(self, ctx: IntentContext):
+        remembered_age = find_user_age_from_history()
+        if remembered_age is not None:
+            return f"Recuerdo que me dijiste que tienes {remembered_age} años."
+        return "Todavía no sé tu edad. Puedes decirme: 'Tengo X años'."
+
+    def _intent_ask_doctor(self, ctx: IntentContext):
+        remembered_doctor = find_user_doctor_from_history()
+        if remembered_doctor:
+            return f"Me comentaste que tu médico es {remembered_doctor}."
+        return "Aún no me has contado quién es tu médico habitual."
+
+    def _intent_ask_medication(self, ctx: IntentContext):
+        remembered_medication = find_user_medication_from_history()
+        if remembered_medication:
+            return f"Sé que tu medicación incluye {remembered_medication}."
+        return "Todavía no sé qué medicación tomas. Puedes decirme: 'Mi medicación es ...'."
+
+    def _intent_ask_hospital(self, ctx: IntentContext):
+        remembered_hospital = find_user_hospital_from_history()
+        if remembered_hospital:
+            return f"Me dijiste que te atienden en {remembered_hospital}."
+        return "No recuerdo que me hayas mencionado tu hospital o clínica habitual."
+
+    def _intent_ask_condition(self, ctx: IntentContext):
+        remembered_condition = find_user_medical_condition_from_history()
+        if remembered_condition:
+            return f"Recuerdo que padeces {remembered_condition}."
+        return "Aún no me has contado qué dolencia o enfermedad tienes."
+
+    def _intent_ask_treatment(self, ctx: IntentContext):
+        remembered_treatment = find_user_treatment_from_history()
+        if remembered_treatment:
+            return f"Sé que sigues el tratamiento {remembered_treatment}."
+        return "Todavía no me has contado qué tratamiento sigues."
+
+    def _intent_email(self, ctx: IntentContext):
+        if self.open_mail_client():
+            return "Abriendo tu gestor de correo predeterminado."
+        return "No pude abrir tu gestor de correo en este sistema."
+
+    def _intent_document(self, ctx: IntentContext):
+        if ctx.source == "voice":
+            # Por voz no hay caja de texto: se bloquea la interfaz hasta cerrar el editor.
             started = self._start_blocking_action(
                 self.open_text_editor_blocking,
                 "Editor abierto. Cierra la ventana para continuar.",
-                followup_success="Editor cerrado. Ya puedes seguir hablando conmigo.",
+                followup_success="Editor cerrado. Ya puedes continuar.",
                 followup_failure="No pude abrir el editor de texto."
             )
             if started:
                 return "Abriendo un documento en tu editor de texto predeterminado..."
             return "Termina la tarea que está en curso antes de pedirme otra cosa."
+        if self.open_text_editor():
+            return "Abriendo un documento en tu editor de texto predeterminado."
+        return "No pude abrir el editor de texto en este sistema."
+
+    def _intent_gemini_start(self, ctx: IntentContext):
+        if GEMINI_ENABLED and get_gemini_chat is not None and is_gemini_available():
+            self.gemini_mode = True
+            gemini = get_gemini_chat()
+            if gemini.start_conversation():
+                return (
+                    "¡Claro! Estoy listo para charlar. Pregúntame lo que quieras. "
+                    "(Di Neno, termina ... para salir del modo conversación)"
+                )
+            return "Lo siento, no pude conectarme con Gemini. Verifica tu conexión a internet y tu API key."
+        return "Lo siento, necesito que configures tu API key de Gemini en Preferencias para poder charlar."
+
+    def _intent_gemini_end(self, ctx: IntentContext):
+        self.gemini_mode = False
+        if GEMINI_ENABLED and get_gemini_chat is not None:
+            gemini = get_gemini_chat()
+            return gemini.end_conversation()
+        return "Modo conversación finalizado."
+
+    def _intent_gemini_chat(self, ctx: IntentContext):
+        try:
+            if GEMINI_ENABLED and get_gemini_chat is not None:
+                gemini = get_gemini_chat()
+                return gemini.send_message(ctx.message)
+            return "No puedo conectar con Gemini en este momento."
+        except Exception as exc:
+            print(f"Error con Gemini: {exc}")
+            self.gemini_mode = False
+            return "Lo siento, hubo un error con Gemini. Volviendo al modo normal."
 
-        if self._is_terminal_command(message_lower):
-            started = self._start_blocking_action(
-                self.open_system_terminal,
-                "Abriendo la terminal...",
-                followup_success="Terminal abierta. Avísame cuando necesites otra cosa.",
-                followup_failure="No pude abrir una terminal en este sistema."
-            )
-            if started:
-                return "Abriendo la terminal predeterminada del sistema..."
-            return "Termina la tarea que está en curso antes de pedirme otra cosa."
+    def _intent_reminder(self, ctx: IntentContext):
+        handled_reminder, reminder_response = self._handle_reminder_request(ctx.message)
+        if handled_reminder:
+            return reminder_response
+        return None
 
-        search_trigger = self._extract_veno_search(message)
-        if search_trigger:
-            self.open_web_search(search_trigger)
-            return f"Buscando '{search_trigger}' en tu navegador predeterminado."
-        if message_lower.startswith("buscar ") or message_lower.startswith("busca ") or "buscar en la web" in message_lower:
-            return "Empieza la orden con 'Neno,' por ejemplo: 'Neno, busca clima en Madrid'."
-
-        if "hola" in message_lower or "buenos días" in message_lower or "buenas tardes" in message_lower:
-            return "¡Hola! ¿En qué puedo ayudarte?"
-        if "cómo estás" in message_lower or "como estas" in message_lower:
-            return "Estoy funcionando perfectamente, gracias por preguntar. ¿Y tú?"
-        if "qué hora" in message_lower or "que hora" in message_lower:
-            now = datetime.now()
-            return f"Son las {now.strftime('%H:%M')} del {now.strftime('%d/%m/%Y')}"
-        if "recordatorio" in message_lower:
-            return "Para gestionar recordatorios, abre la ventana principal desde la bandeja del sistema."
-        if "gracias" in message_lower:
-            return "De nada, estoy aquí para ayudarte."
-        if "adiós" in message_lower or "adios" in message_lower or "chao" in message_lower:
-            return "¡Hasta pronto! Que tengas un buen día."
-        if "ayuda" in message_lower:
-            return "Puedo ayudarte con recordatorios, la hora actual, o simplemente charlar contigo. ¿Qué necesitas?"
-
-        kb_answer = find_answer(message)
-        if kb_answer:
-            return kb_answer
+    def _intent_terminal(self, ctx: IntentContext):
+        started = self._start_blocking_action(
+            self.open_system_terminal,
+            "Abriendo la terminal...",
+            followup_success="Terminal abierta. Avísame cuando necesites otra cosa.",
+            followup_failure="No pude abrir una terminal en este sistema."
+        )
+        if started:
+            return "Abriendo la terminal predeterminada del sistema..."
+        return "Termina la tarea que está en curso antes de pedirme otra cosa."
 
+    def _intent_web_search(self, ctx: IntentContext):
+        self.open_web_search(ctx.value)
+        return f"Buscando '{ctx.value}' en tu navegador predeterminado."
+
+    def _intent_search_hint(self, ctx: IntentContext):
+        return "Empieza la orden con 'Neno,' por ejemplo: 'Neno, busca clima en Madrid'."
+
+    def _intent_greeting(self, ctx: IntentContext):
+        return "¡Hola! ¿En qué puedo ayudarte?"
+
+    def _intent_how_are_you(self, ctx: IntentContext):
+        return "Estoy funcionando perfectamente, gracias por preguntar. ¿Y tú?"
+
+    def _intent_time(self, ctx: IntentContext):
+        now = datetime.now()
+        return f"Son las {now.strftime('%H:%M')} del {now.strftime('%d/%m/%Y')}"
+
+    def _intent_thanks(self, ctx: IntentContext):
+        return "De nada, estoy aquí para ayudarte."
+
+    def _intent_goodbye(self, ctx: IntentContext):
+        return "¡Hasta pronto! Que tengas un buen día."
+
+    def _intent_help(self, ctx: IntentContext):
+        return "Puedo ayudarte con recordatorios, la hora actual, o simplemente charlar contigo. ¿Qué necesitas?"
+
+    def _intent_knowledge_base(self, ctx: IntentContext):
+        try:
+            from voice import get_kb_retrieval_mode
+            kb_mode = get_kb_retrieval_mode()
+        except Exception:
+            kb_mode = "exact"
+        return find_answer(ctx.message, mode=kb_mode)
+
+    def _intent_fallback(self, ctx: IntentContext):
         try:
             kb_relative = knowledge_file_path().relative_to(PROJECT_ROOT).as_posix()
         except Exception:
@@ -320,140 +320,6 @@ class AvatarCommandMixin(AvatarWidgetRefs):
             "repeat": repeat
         }
 
-    def _extract_veno_search(self, message: str) -> str | None:
-        text = (message or "").strip()
-        pattern = re.compile(r"^neno[\s,]+(?:busca|buscar en la web)\s+(.+)$", re.IGNORECASE)
-        match = pattern.match(text)
-        if not match:
-            return None
-        content = match.group(1).strip()
-        if not content:
-            return None
-        if (content.startswith('"') and content.endswith('"')) or (content.startswith("'") and content.endswith("'")):
-            content = content[1:-1].strip()
-        return content or None
-
-    def _is_email_command(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        return normalized.startswith("neno, escribe un correo") or normalized.startswith("neno escribe un correo")
-
-    def _is_document_command(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        return (
-            normalized.startswith("neno, escribe un documento")
-            or normalized.startswith("neno escribe un documento")
-            or normalized.startswith("neno, escribe un texto")
-            or normalized.startswith("neno escribe un texto")
-        )
-
-    def _is_terminal_command(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        if not normalized.startswith("neno"):
-            return False
-        return "terminal" in normalized or "consola" in normalized or "cmd" in normalized or "powershell" in normalized
-
-    def _is_name_question(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        triggers = (
-            "cual es mi nombre",
-            "cuál es mi nombre",
-            "como me llamo",
-            "cómo me llamo",
-            "recuerdas mi nombre",
-            "te acuerdas de mi nombre",
-            "sabes como me llamo",
-            "sabes cuál es mi nombre",
-        )
-        return any(trigger in normalized for trigger in triggers)
-
-    def _is_age_question(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        triggers = (
-            "cuantos años tengo",
-            "cuántos años tengo",
-            "cual es mi edad",
-            "cuál es mi edad",
-            "recuerdas mi edad",
-            "sabes cuantos años tengo",
-            "sabes cuántos años tengo",
-            "como cuantos años tengo",
-            "cómo cuantos años tengo",
-        )
-        return any(trigger in normalized for trigger in triggers)
-
-    def _is_doctor_question(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        triggers = (
-            "quien es mi medico",
-            "quién es mi médico",
-            "cuál es mi médico",
-            "cual es mi medico",
-            "recuerdas mi medico",
-            "recuerdas mi médico",
-            "sabes quien es mi medico",
-            "como se llama mi doctor",
-            "cómo se llama mi doctor",
-        )
-        return any(trigger in normalized for trigger in triggers)
-
-    def _is_medication_question(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        triggers = (
-            "que medicacion tomo",
-            "qué medicación tomo",
-            "cual es mi medicacion",
-            "cuál es mi medicación",
-            "que pastillas tomo",
-            "qué pastillas tomo",
-            "recuerdas mi medicacion",
-            "recuerdas mi medicación",
-            "sabes que medicinas",
-            "que medicina uso",
-            "cual es mi tratamiento",
-            "cuál es mi tratamiento",
-        )
-        return any(trigger in normalized for trigger in triggers)
-
-    def _is_hospital_question(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        triggers = (
-            "cual es mi hospital",
-            "cuál es mi hospital",
-            "a que hospital voy",
-            "a qué hospital voy",
-            "que clinica me atiende",
-            "qué clínica me atiende",
-            "recuerdas mi hospital",
-        )
-        return any(trigger in normalized for trigger in triggers)
-
-    def _is_condition_question(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        triggers = (
-            "que enfermedad tengo",
-            "qué enfermedad tengo",
-            "cual es mi enfermedad",
-            "cuál es mi enfermedad",
-            "que dolencia tengo",
-            "qué dolencia tengo",
-            "sabes que padezco",
-            "recuerdas mi dolencia",
-        )
-        return any(trigger in normalized for trigger in triggers)
-
-    def _is_treatment_question(self, message_lower: str) -> bool:
-        normalized = (message_lower or "").strip()
-        triggers = (
-            "cual es mi tratamiento",
-            "cuál es mi tratamiento",
-            "que terapia sigo",
-            "qué terapia sigo",
-            "recuerdas mi tratamiento",
-            "que tratamiento sigo",
-            "qué tratamiento sigo",
-        )
-        return any(trigger in normalized for trigger in triggers)
-
     def open_system_terminal(self) -> bool:
         platform = sys.platform
         try:
@@ -0,0 +1,213 @@
+"""Tabla declarativa de intenciones y enrutador compilado para los mensajes del avatar."""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+from conversation_memory import (
+    extract_age_from_text,
+    extract_doctor_from_text,
+    extract_hospital_from_text,
+    extract_medical_condition_from_text,
+    extract_medication_from_text,
+    extract_name_from_text,
+    extract_treatment_from_text,
+)
+from text_matching import AhoCorasick
+
+# Con NENO_TRACE_INTENTS=1 se imprime qué intención respondió y cuánto tardó.
+_TRACE = bool(os.environ.get("NENO_TRACE_INTENTS"))
+
+
+class IntentContext(NamedTuple):
+    """Datos que recibe cada manejador de intención."""
+
+    message: str
+    normalized: str
+    source: str  # "text" o "voice"
+    value: Any = None  # resultado del extractor, si la intención lo tiene
+
+
+class Intent(NamedTuple):
+    """Una entrada de la tabla de intenciones.
+
+    Se evalúan por ``priority`` ascendente. Una intención aplica cuando se cumplen
+    todas sus condiciones declaradas: alguna frase de ``contains``, todas las de
+    ``requires``, algún prefijo de ``prefixes`` y ``when(owner)``. Si tiene
+    ``extract``, solo aplica cuando el extractor devuelve un valor. El manejador
+    (método del mixin de comandos) puede devolver ``None`` para dejar pasar el
+    mensaje a la siguiente intención.
+    """
+
+    name: str
+    priority: int
+    handler: str
+    contains: tuple[str, ...] = ()
+    requires: tuple[str, ...] = ()
+    prefixes: tuple[str, ...] = ()
+    when: Optional[Callable[[Any], bool]] = None
+    extract: Optional[Callable[[str], Any]] = None
+
+
+class _CompiledIntent(NamedTuple):
+    intent: Intent
+    any_ids: frozenset[int]
+    all_ids: frozenset[int]
+
+
+class IntentRouter:
+    """Normaliza cada mensaje una vez y lo resuelve con un único autómata de frases."""
+
+    def __init__(self, intents: list[Intent]) -> None:
+        self._automaton = AhoCorasick()
+        compiled = []
+        for intent in sorted(intents, key=lambda item: item.priority):
+            any_ids = frozenset(self._automaton.add(phrase) for phrase in intent.contains)
+            all_ids = frozenset(self._automaton.add(phrase) for phrase in intent.requires)
+            compiled.append(_CompiledIntent(intent, any_ids, all_ids))
+        self._automaton.build()
+        self._intents = tuple(compiled)
+        self._stats_lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self.last_match: tuple[str, float] | None = None
+
+    def dispatch(self, owner: Any, message: str, source: str = "text") -> str:
+        """Devuelve la respuesta de la primera intención que aplica al mensaje."""
+        start = time.perf_counter()
+        normalized = (message or "").strip().lower()
+        found = self._automaton.find_ids(normalized)
+        for compiled in self._intents:
+            intent = compiled.intent
+            if compiled.any_ids and compiled.any_ids.isdisjoint(found):
+                continue
+            if compiled.all_ids and not compiled.all_ids <= found:
+                continue
+            if intent.prefixes and not normalized.startswith(intent.prefixes):
+                continue
+            if intent.when is not None and not intent.when(owner):
+                continue
+            value = None
+            if intent.extract is not None:
+                value = intent.extract(message)
+                if value is None or value == "":
+                    continue
+            matched_ms = (time.perf_counter() - start) * 1000
+            response = getattr(owner, intent.handler)(IntentContext(message, normalized, source, value))
+            if response is not None:
+                self._record(intent.name, matched_ms)
+                return response
+        raise LookupError("Ninguna intención respondió al mensaje")
+
+    def _record(self, name: str, matched_ms: float) -> None:
+        with self._stats_lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+            self.last_match = (name, matched_ms)
+        if _TRACE:
+            print(f"Intención '{name}' resuelta en {matched_ms:.3f} ms")
+
+    def stats(self) -> dict[str, int]:
+        """Veces que ha respondido cada intención desde el arranque."""
+        with self._stats_lock:
+            return dict(self._counts)
+
+
+def _in_gemini_mode(owner: Any) -> bool:
+    return bool(getattr(owner, "gemini_mode", False))
+
+
+_NENO_SEARCH_RE = re.compile(r"^neno[\s,]+(?:busca|buscar en la web)\s+(.+)$", re.IGNORECASE)
+
+
+def extract_neno_search(message: str) -> str | None:
+    """Extrae el término de 'Neno, busca ...' (sin comillas), o ``None``."""
+    match = _NENO_SEARCH_RE.match((message or "").strip())
+    if not match:
+        return None
+    content = match.group(1).strip()
+    if not content:
+        return None
+    if (content.startswith('"') and content.endswith('"')) or (content.startswith("'") and content.endswith("'")):
+        content = content[1:-1].strip()
+    return content or None
+
+
+INTENTS: list[Intent] = [
+    # Datos personales que el usuario nos cuenta
+    Intent("introduce_name", 10, "_intent_introduce_name", extract=extract_name_from_text),
+    Intent("introduce_age", 11, "_intent_introduce_age", extract=extract_age_from_text),
+    Intent("introduce_doctor", 12, "_intent_introduce_doctor", extract=extract_doctor_from_text),
+    Intent("introduce_medication", 13, "_intent_introduce_medication", extract=extract_medication_from_text),
+    Intent("introduce_hospital", 14, "_intent_introduce_hospital", extract=extract_hospital_from_text),
+    Intent("introduce_condition", 15, "_intent_introduce_condition", extract=extract_medical_condition_from_text),
+    Intent("introduce_treatment", 16, "_intent_introduce_treatment", extract=extract_treatment_from_text),
+    # Preguntas sobre lo que recordamos
+    Intent("ask_name", 20, "_intent_ask_name", contains=(
+        "cual es mi nombre", "cuál es mi nombre", "como me llamo", "cómo me llamo",
+        "recuerdas mi nombre", "te acuerdas de mi nombre", "sabes como me llamo",
+        "sabes cuál es mi nombre",
+    )),
+    Intent("ask_age", 21, "_intent_ask_age", contains=(
+        "cuantos años tengo", "cuántos años tengo", "cual es mi edad", "cuál es mi edad",
+        "recuerdas mi edad", "sabes cuantos años tengo", "sabes cuántos años tengo",
+        "como cuantos años tengo", "cómo cuantos años tengo",
+    )),
+    Intent("ask_doctor", 22, "_intent_ask_doctor", contains=(
+        "quien es mi medico", "quién es mi médico", "cuál es mi médico", "cual es mi medico",
+        "recuerdas mi medico", "recuerdas mi médico", "sabes quien es mi medico",
+        "como se llama mi doctor", "cómo se llama mi doctor",
+    )),
+    Intent("ask_medication", 23, "_intent_ask_medication", contains=(
+        "que medicacion tomo", "qué medicación tomo", "cual es mi medicacion",
+        "cuál es mi medicación", "que pastillas tomo", "qué pastillas tomo",
+        "recuerdas mi medicacion", "recuerdas mi medicación", "sabes que medicinas",
+        "que medicina uso", "cual es mi tratamiento", "cuál es mi tratamiento",
+    )),
+    Intent("ask_hospital", 24, "_intent_ask_hospital", contains=(
+        "cual es mi hospital", "cuál es mi hospital", "a que hospital voy", "a qué hospital voy",
+        "que clinica me atiende", "qué clínica me atiende", "recuerdas mi hospital",
+    )),
+    Intent("ask_condition", 25, "_intent_ask_condition", contains=(
+        "que enfermedad tengo", "qué enfermedad tengo", "cual es mi enfermedad",
+        "cuál es mi enfermedad", "que dolencia tengo", "qué dolencia tengo",
+        "sabes que padezco", "recuerdas mi dolencia",
+    )),
+    Intent("ask_treatment", 26, "_intent_ask_treatment", contains=(
+        "cual es mi tratamiento", "cuál es mi tratamiento", "que terapia sigo",
+        "qué terapia sigo", "recuerdas mi tratamiento", "que tratamiento sigo",
+        "qué tratamiento sigo",
+    )),
+    # Órdenes "Neno, ..."
+    Intent("email", 30, "_intent_email", prefixes=(
+        "neno, escribe un correo", "neno escribe un correo",
+    )),
+    Intent("document", 31, "_intent_document", prefixes=(
+        "neno, escribe un documento", "neno escribe un documento",
+        "neno, escribe un texto", "neno escribe un texto",
+    )),
+    # Modo conversación con Gemini
+    Intent("gemini_start", 40, "_intent_gemini_start", requires=("neno", "charlemos")),
+    Intent("gemini_end", 41, "_intent_gemini_end", requires=("neno", "termina"), when=_in_gemini_mode),
+    Intent("gemini_chat", 42, "_intent_gemini_chat", when=_in_gemini_mode),
+    Intent("reminder", 50, "_intent_reminder", contains=(
+        "recordatorio", "recordarme", "recuerdame", "recuérdame",
+    )),
+    Intent("terminal", 60, "_intent_terminal", prefixes=("neno",), contains=(
+        "terminal", "consola", "cmd", "powershell",
+    )),
+    Intent("web_search", 61, "_intent_web_search", prefixes=("neno",), extract=extract_neno_search),
+    Intent("search_hint", 62, "_intent_search_hint", contains=("buscar en la web",)),
+    Intent("search_hint_prefix", 63, "_intent_search_hint", prefixes=("buscar ", "busca ")),
+    # Charla rápida
+    Intent("greeting", 70, "_intent_greeting", contains=("hola", "buenos días", "buenas tardes")),
+    Intent("how_are_you", 71, "_intent_how_are_you", contains=("cómo estás", "como estas")),
+    Intent("time", 72, "_intent_time", contains=("qué hora", "que hora")),
+    Intent("thanks", 73, "_intent_thanks", contains=("gracias",)),
+    Intent("goodbye", 74, "_intent_goodbye", contains=("adiós", "adios", "chao")),
+    Intent("help", 75, "_intent_help", contains=("ayuda",)),
+    # Respuestas locales y respuesta por defecto
+    Intent("knowledge_base", 90, "_intent_knowledge_base"),
+    Intent("fallback", 100, "_intent_fallback"),
+]
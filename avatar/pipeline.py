@@ -0,0 +1,208 @@
+"""Canal único para procesar mensajes de texto y voz: entrada → intención → respuesta → voz."""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+REQUEST_TIMEOUT_S = 60.0
+MAX_WORKERS = 2
+
+
+class MessageRequest:
+    """Una petición del usuario en curso, identificada por ``id``."""
+
+    def __init__(self, request_id: int, source: str, text: str | None = None,
+                 audio_position: int | None = None):
+        self.id = request_id
+        self.source = source  # "text" o "voice"
+        self.text = text
+        self.audio_position = audio_position  # voz: empezar en audio ya capturado (palabra de activación)
+        self.created = time.monotonic()
+        self.running = False  # ocupa un hilo del ejecutor (protegido por el cerrojo del canal)
+        self.cancel_reason: str | None = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self, reason: str) -> bool:
+        if self._done.is_set() or self._cancelled.is_set():
+            return False
+        self.cancel_reason = reason
+        self._cancelled.set()
+        return True
+
+    def finish(self) -> None:
+        self._done.set()
+        if self._timer is not None:
+            self._timer.cancel()
+
+
+class MessagePipeline:
+    """Procesa las peticiones en un ejecutor acotado con cancelación y tiempo límite.
+
+    Cada mensaje nuevo (o el botón de parar) cancela el anterior: si aún no había
+    empezado no se ejecuta, y si estaba esperando a Gemini o al reconocedor su
+    resultado se descarta. Todas las actualizaciones de la interfaz se envían al
+    hilo de Tk a través de ``owner._run_on_ui``.
+
+    Una petición que vence sigue ocupando su hilo hasta que la llamada bloqueante
+    vuelve (Gemini tiene su propio límite, menor). Mientras todos los hilos estén
+    así, los mensajes nuevos esperan en cola y se le dice al usuario.
+    """
+
+    def __init__(self, owner: Any, max_workers: int = MAX_WORKERS, timeout: float = REQUEST_TIMEOUT_S):
+        self._owner = owner
+        self._timeout = timeout
+        self._max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="neno-mensajes")
+        self._stuck: set[int] = set()  # peticiones vencidas cuyo hilo sigue ocupado
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._current: Optional[MessageRequest] = None
+
+    def submit_text(self, text: str) -> MessageRequest:
+        request = self._start(MessageRequest(next(self._ids), "text", text))
+        self._executor.submit(self._run, request)
+        self._warn_if_blocked(request)
+        return request
+
+    def submit_voice(self, audio_position: int | None = None) -> MessageRequest:
+        request = self._start(MessageRequest(next(self._ids), "voice", audio_position=audio_position))
+        self._executor.submit(self._run, request)
+        self._warn_if_blocked(request)
+        return request
+
+    def _all_stuck(self) -> bool:
+        with self._lock:
+            return len(self._stuck) >= self._max_workers
+
+    def _warn_if_blocked(self, request: MessageRequest) -> None:
+        if self._all_stuck():
+            print(f"Petición {request.id} en cola: {len(self._stuck)} peticiones vencidas siguen ocupando los hilos")
+            self._deliver(request, None, "Sigo esperando respuestas anteriores; atenderé este mensaje en cuanto terminen.")
+
+    def cancel_current(self, reason: str = "stop") -> bool:
+        """Cancela la petición en curso y corta la voz que esté sonando."""
+        with self._lock:
+            current = self._current
+        cancelled = current is not None and current.cancel(reason)
+        if cancelled:
+            self._stop_voice(reason)
+        return cancelled
+
+    def shutdown(self) -> None:
+        self.cancel_current("shutdown")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, request: MessageRequest) -> MessageRequest:
+        with self._lock:
+            previous = self._current
+            self._current = request
+        if previous is not None and previous.cancel("superseded"):
+            self._stop_voice("superseded")
+        return request
+
+    def _is_current(self, request: MessageRequest) -> bool:
+        with self._lock:
+            return self._current is request and not request.cancelled
+
+    def _on_timeout(self, request: MessageRequest) -> None:
+        if not request.cancel("timeout"):
+            return
+        with self._lock:
+            if request.running:
+                self._stuck.add(request.id)
+        print(f"Petición {request.id} cancelada: sin respuesta en {self._timeout:.0f} s")
+        if self._all_stuck():
+            message = ("Lo siento, no llega la respuesta y las peticiones anteriores siguen sin terminar. "
+                       "Los mensajes nuevos esperarán hasta que terminen.")
+        else:
+            message = "Lo siento, la respuesta está tardando demasiado. Inténtalo de nuevo."
+        self._deliver(request, None, message, ignore_cancel=True)
+
+    def _run(self, request: MessageRequest) -> None:
+        # El tiempo límite cuenta desde que la petición tiene hilo, no mientras espera en cola
+        timer = threading.Timer(self._timeout, self._on_timeout, args=(request,))
+        timer.daemon = True
+        request._timer = timer
+        with self._lock:
+            request.running = True
+        timer.start()
+        try:
+            if not self._is_current(request):
+                return
+            if request.source == "voice":
+                request.text = self._listen(request.audio_position)
+                if not self._is_current(request):
+                    return
+                if not request.text:
+                    self._deliver(request, None, "No se entendió. Di: 'buscar <término>'.")
+                    return
+            response = self._owner.generate_response(request.text or "", source=request.source)
+            if not self._is_current(request):
+                return
+            user_text = request.text if request.source == "voice" else None
+            self._deliver(request, user_text, response)
+        except Exception as exc:
+            print(f"Error procesando la petición {request.id}: {exc}")
+            self._deliver(request, None, "Lo siento, algo falló al procesar tu mensaje.")
+        finally:
+            with self._lock:
+                request.running = False
+                self._stuck.discard(request.id)
+            request.finish()
+
+    def _listen(self, audio_position: int | None = None) -> str:
+        show_partial = getattr(self._owner, "show_partial_transcript", None)
+        try:
+            from voice import escuchar
+            return escuchar(on_partial=show_partial, start_position=audio_position).strip()
+        except Exception as exc:
+            print(f"Error reconocimiento de voz: {exc}")
+            return ""
+        finally:
+            if show_partial is not None:
+                show_partial("")
+
+    def _deliver(self, request: MessageRequest, user_text: str | None, response: str,
+                 ignore_cancel: bool = False) -> None:
+        def update_ui():
+            if not ignore_cancel and not self._is_current(request):
+                return
+            if user_text:
+                self._owner._append_conversation("Tú", user_text)
+            self._owner._append_conversation("Asistente", response)
+            self._speak(response)
+
+        self._owner._run_on_ui(update_ui)
+
+    def _speak(self, text: str) -> None:
+        try:
+            from voice import hablar
+            hablar(text)
+        except Exception as exc:
+            print(f"Error hablando respuesta: {exc}")
+
+    def _stop_voice(self, reason: str) -> None:
+        try:
+            if reason == "superseded":
+                # Solo se calla la respuesta anterior; un recordatorio sigue sonando
+                from voice import PRIORITY_REPLY, cancel_speech
+                cancel_speech(PRIORITY_REPLY)
+                return
+            from voice import stop_speaking
+            stop_speaking()
+        except Exception as exc:
+            print(f"Error deteniendo la voz: {exc}")
+
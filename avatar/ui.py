@@ -14,6 +14,7 @@ from conversation_memory import (
 
 if TYPE_CHECKING:  # Solo para ayudar a los analizadores estáticos
     from .commands import AvatarCommandMixin as _CommandMixin
+    from .pipeline import MessagePipeline
     from .visuals import AvatarVisualsMixin as _VisualMixin
 
 
@@ -30,6 +31,7 @@ class AvatarUIMixin(AvatarWidgetRefs):
     clear_history_button: Optional[ttk.Button]
     _supports_true_transparency: bool
     transparent_color: str
+    pipeline: "MessagePipeline"
 
     def _commands(self) -> "_CommandMixin":
         return cast("_CommandMixin", self)
@@ -212,14 +214,21 @@ class AvatarUIMixin(AvatarWidgetRefs):
         try:
             if not self._greeted_once and not history_loaded:
                 self._append_conversation("Asistente", "Hola")
-                from voice import hablar
-                hablar("Hola")
+                from voice import PRIORITY_CONFIRMATION, hablar
+                hablar("Hola", priority=PRIORITY_CONFIRMATION)
                 self._greeted_once = True
         except Exception:
             pass
 
         self.window.protocol("WM_DELETE_WINDOW", self.close_window)
 
+        try:
+            from voice import start_barge_in, start_wake_word
+            start_wake_word(self.on_wake_word)
+            start_barge_in(self.on_barge_in)
+        except Exception as exc:
+            print(f"No se pudo activar la escucha continua: {exc}")
+
     def on_send_message(self, event):
         if self._action_locked:
             self._append_conversation(
@@ -235,129 +244,40 @@ class AvatarUIMixin(AvatarWidgetRefs):
             return
         self.text_input.delete(0, tk.END)
 
-        commands = self._commands()
-
-        def process_message():
-            response = commands.generate_response(user_message)
+        self._append_conversation("Tú", user_message)
+        self.pipeline.submit_text(user_message)
 
-            def update_ui():
-                self._append_conversation("Tú", user_message)
-                self._append_conversation("Asistente", response)
-                try:
-                    from voice import hablar
-                    hablar(response)
-                except Exception as exc:
-                    print(f"Error hablando respuesta: {exc}")
+    def on_voice_search(self):
+        if self._action_locked:
+            msg = "Estoy ocupada con otra tarea. Cierra el editor actual o pulsa Salir."
+            self._append_conversation("Asistente", msg)
+            try:
+                from voice import PRIORITY_CONFIRMATION, hablar
+                hablar(msg, priority=PRIORITY_CONFIRMATION)
+            except Exception:
+                pass
+            return
+        self.pipeline.submit_voice()
 
-            if self.window is not None and self.window_created:
-                try:
-                    self.window.after(0, update_ui)
-                except Exception:
-                    pass
+    def on_wake_word(self, audio_position: int):
+        """Se oyó "Neno": reconocer la orden desde donde empezó (llamado desde el hilo de escucha)."""
+        self._listen_from(audio_position)
 
-        threading.Thread(target=process_message, daemon=True).start()
+    def on_barge_in(self, audio_position: int):
+        """El usuario habló encima de la respuesta (la voz ya está cortada): reconocer lo que dijo."""
+        self._listen_from(audio_position)
 
-    def on_voice_search(self):
-        def worker():
-            commands = self._commands()
-            if self._action_locked:
-                msg = "Estoy ocupada con otra tarea. Cierra el editor actual o pulsa Salir."
-                if self.window is not None and self.window_created:
-                    self.window.after(0, lambda: self._append_conversation("Asistente", msg))
-                try:
-                    from voice import hablar
-                    hablar(msg)
-                except Exception:
-                    pass
+    def _listen_from(self, audio_position: int):
+        def start():
+            if self._action_locked or self.window is None:
                 return
-            try:
-                from voice import escuchar, hablar
-                texto = escuchar().strip()
-            except Exception as exc:
-                texto = ""
-                print(f"Error reconocimiento de voz: {exc}")
-
-            def update_ui():
-                if not self.window_created:
-                    return
-                if not texto:
-                    msg = "No se entendió. Di: 'buscar <término>'."
-                    self._append_conversation("Asistente", msg)
-                    try:
-                        from voice import hablar
-                        hablar(msg)
-                    except Exception:
-                        pass
-                    return
-                lower = texto.lower()
-                if commands._is_email_command(lower):
-                    opened = commands.open_mail_client()
-                    msg = "Abriendo tu gestor de correo predeterminado." if opened else "No pude abrir tu gestor de correo."
-                    self._append_conversation("Tú", texto)
-                    self._append_conversation("Asistente", msg)
-                    try:
-                        from voice import hablar
-                        hablar(msg)
-                    except Exception:
-                        pass
-                    return
-                if commands._is_document_command(lower):
-                    self._append_conversation("Tú", texto)
-                    started = self._start_blocking_action(
-                        commands.open_text_editor_blocking,
-                        "Editor abierto. Cierra la ventana para continuar.",
-                        followup_success="Editor cerrado. Ya puedes continuar.",
-                        followup_failure="No pude abrir el editor de texto."
-                    )
-                    msg = (
-                        "Abriendo un documento en tu editor de texto predeterminado..."
-                        if started
-                        else "Termina la tarea que está en curso antes de pedirme otra cosa."
-                    )
-                    self._append_conversation("Asistente", msg)
-                    try:
-                        from voice import hablar
-                        hablar(msg)
-                    except Exception:
-                        pass
-                    return
-                search_trigger = commands._extract_veno_search(texto)
-                if search_trigger:
-                    commands.open_web_search(search_trigger)
-                    msg = f"Búsqueda abierta en el navegador para: '{search_trigger}'"
-                    self._append_conversation("Tú", texto)
-                    self._append_conversation("Asistente", msg)
-                    try:
-                        from voice import hablar
-                        hablar(msg)
-                    except Exception:
-                        pass
-                    return
-                if lower.startswith("buscar ") or lower.startswith("busca ") or "buscar en la web" in lower:
-                    msg = "Recuerda decir 'Neno, ...' antes de tus órdenes. Por ejemplo: 'Neno, busca clima en Madrid'."
-                    self._append_conversation("Asistente", msg)
-                    try:
-                        from voice import hablar
-                        hablar(msg)
-                    except Exception:
-                        pass
-                    return
-                response = commands.generate_response(texto)
-                self._append_conversation("Tú", texto)
-                self._append_conversation("Asistente", response)
-                try:
-                    from voice import hablar
-                    hablar(response)
-                except Exception:
-                    pass
+            self.pipeline.submit_voice(audio_position)
 
-            if self.window is not None and self.window_created:
-                self.window.after(0, update_ui)
-
-        threading.Thread(target=worker, daemon=True).start()
+        self._run_on_ui(start)
 
     def on_stop_voice_click(self):
         was_speaking = getattr(self, "is_speaking", False)
+        self.pipeline.cancel_current("stop")
         try:
             from voice import stop_speaking as stop_voice_output
             stop_voice_output()
@@ -370,6 +290,28 @@ class AvatarUIMixin(AvatarWidgetRefs):
         if was_speaking:
             self._append_conversation("Asistente", "He detenido la locución.")
 
+    def _run_on_ui(self, callback: Callable[[], None]):
+        """Programa ``callback`` en el bucle de Tk (seguro desde cualquier hilo)."""
+        if self.window is None or not self.window_created:
+            return
+        try:
+            self.window.after(0, callback)
+        except Exception:
+            pass
+
+    def show_partial_transcript(self, text: str):
+        """Muestra lo que el reconocedor va entendiendo mientras se habla (desde cualquier hilo)."""
+        def update():
+            # La línea de estado de una tarea bloqueante tiene preferencia
+            if self._status_label is None or self._action_locked:
+                return
+            try:
+                self._status_label.config(text=f"Oyendo: {text}…" if text else "")
+            except Exception:
+                pass
+
+        self._run_on_ui(update)
+
     def _append_conversation(self, role: str, text: str):
         if not getattr(self, "_loading_history", False):
             try:
@@ -488,7 +430,9 @@ class AvatarUIMixin(AvatarWidgetRefs):
                                followup_failure: str | None = None):
         if self._action_locked:
             return False
-        self._lock_controls(status_text)
+        # Puede llamarse desde el hilo del canal de mensajes: los widgets se tocan en Tk.
+        self._action_locked = True
+        self._run_on_ui(lambda: self._lock_controls(status_text))
 
         def worker():
             success = False
@@ -504,8 +448,8 @@ class AvatarUIMixin(AvatarWidgetRefs):
                     if msg:
                         self._append_conversation("Asistente", msg)
                         try:
-                            from voice import hablar
-                            hablar(msg)
+                            from voice import PRIORITY_CONFIRMATION, hablar
+                            hablar(msg, priority=PRIORITY_CONFIRMATION)
                         except Exception:
                             pass
                 if self.window is not None and self.window_created:
@@ -718,6 +662,13 @@ class AvatarUIMixin(AvatarWidgetRefs):
             pass
 
     def close_window(self):
+        self.pipeline.cancel_current("close")
+        try:
+            from voice import stop_barge_in, stop_wake_word
+            stop_wake_word()
+            stop_barge_in()
+        except Exception:
+            pass
         try:
             from voice import stop_speaking as stop_voice_output
             stop_voice_output()
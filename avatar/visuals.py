@@ -21,6 +21,8 @@ class AvatarVisualsMixin(AvatarWidgetRefs):
     animation_thread: Optional[threading.Thread]
     _envelope_index: int
     _envelope_data: list[int]
+    _envelope_clock: Optional[Callable[[], float]]
+    _envelope_origin: float
     show_window: Callable[[], None]
     _append_conversation: Callable[[str, str], None]
 
@@ -125,8 +127,8 @@ class AvatarVisualsMixin(AvatarWidgetRefs):
             self.load_head_image()
             try:
                 self._append_conversation("Asistente", "Hola")
-                from voice import hablar
-                hablar("Hola")
+                from voice import PRIORITY_CONFIRMATION, hablar
+                hablar("Hola", priority=PRIORITY_CONFIRMATION)
             except Exception:
                 pass
             return
@@ -150,8 +152,8 @@ class AvatarVisualsMixin(AvatarWidgetRefs):
             pass
         try:
             self._append_conversation("Asistente", "Hola")
-            from voice import hablar
-            hablar("Hola")
+            from voice import PRIORITY_CONFIRMATION, hablar
+            hablar("Hola", priority=PRIORITY_CONFIRMATION)
         except Exception:
             pass
 
@@ -186,7 +188,13 @@ class AvatarVisualsMixin(AvatarWidgetRefs):
         self.animation_thread = threading.Thread(target=animate, daemon=True)
         self.animation_thread.start()
 
-    def start_speaking_envelope(self, envelope, frame_interval_ms=60):
+    def start_speaking_envelope(self, envelope, frame_interval_ms=60, start_time=None, clock=None):
+        """Anima la boca con la envolvente de la voz.
+
+        Con ``clock`` (reloj de la salida de audio, en segundos) y ``start_time``
+        (posición del primer marco en ese reloj) cada paso mira qué marco está
+        sonando en lugar de avanzar uno por tick, así la boca sigue al audio.
+        """
         if not envelope:
             self.start_speaking()
             return
@@ -195,9 +203,15 @@ class AvatarVisualsMixin(AvatarWidgetRefs):
         self.is_speaking = True
         self.show_window()
         self._envelope_index = 0
-        self._envelope_data = envelope
+        self._envelope_data = list(envelope)
+        self._envelope_clock = clock if start_time is not None else None
+        self._envelope_origin = start_time or 0.0
 
         def update():
+            if self._envelope_clock is not None:
+                elapsed_ms = (self._envelope_clock() - self._envelope_origin) * 1000
+                # Nunca hacia atrás, aunque el reloj se pare entre fragmentos
+                self._envelope_index = max(self._envelope_index, int(elapsed_ms // frame_interval_ms))
             if (not self.is_speaking) or self._envelope_index >= len(self._envelope_data):
                 try:
                     self.draw_face(mouth_state=0)
@@ -210,7 +224,8 @@ class AvatarVisualsMixin(AvatarWidgetRefs):
                 self.draw_face(mouth_state=state)
             except Exception:
                 pass
-            self._envelope_index += 1
+            if self._envelope_clock is None:
+                self._envelope_index += 1
             if self.window is not None and self.window_created:
                 try:
                     self.window.after(frame_interval_ms, update)
@@ -220,6 +235,33 @@ class AvatarVisualsMixin(AvatarWidgetRefs):
         if self.window is not None and self.window_created:
             self.window.after(0, update)
 
+    def feed_speaking_envelope(self, envelope, frame_interval_ms=60, start_time=None, clock=None):
+        """Añade la envolvente de un fragmento de voz a la animación en curso (o la inicia)."""
+        if not envelope:
+            return
+
+        def feed():
+            # En el hilo de Tk: update() sigue programado mientras is_speaking sea True
+            if not self.is_speaking:
+                self.start_speaking_envelope(envelope, frame_interval_ms=frame_interval_ms,
+                                             start_time=start_time, clock=clock)
+                return
+            if self._envelope_clock is not None and start_time is not None:
+                # Colocar el fragmento en su instante: rellenar con boca cerrada o recortar
+                offset = max(0, round((start_time - self._envelope_origin) * 1000 / frame_interval_ms))
+                data = self._envelope_data
+                if offset < len(data):
+                    del data[offset:]
+                else:
+                    data.extend([0] * (offset - len(data)))
+            self._envelope_data.extend(envelope)
+
+        if self.window is not None and self.window_created:
+            try:
+                self.window.after(0, feed)
+            except Exception:
+                pass
+
     def stop_speaking(self):
         self.is_speaking = False
         if self.animation_thread and self.animation_thread.is_alive():
@@ -2,6 +2,7 @@ from queue import Queue
 from typing import Optional
 
 from .commands import AvatarCommandMixin
+from .pipeline import MessagePipeline
 from .ui import AvatarUIMixin
 from .visuals import AvatarVisualsMixin
 
@@ -47,7 +48,10 @@ class AvatarWindow(AvatarCommandMixin, AvatarVisualsMixin, AvatarUIMixin):
         self._internal_editor_event = None
         self._envelope_index = 0
         self._envelope_data: list[int] = []
+        self._envelope_clock = None
+        self._envelope_origin = 0.0
         self._loading_history = False
+        self.pipeline = MessagePipeline(self)
 
 
 _avatar_instance: Optional[AvatarWindow] = None
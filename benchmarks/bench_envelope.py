@@ -0,0 +1,102 @@
+"""Compara el cálculo de la envolvente de boca tramo a tramo con la versión vectorizada.
+
+Uso: python3 benchmarks/bench_envelope.py
+"""
+from __future__ import annotations
+
+import math
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio import envelope  # noqa: E402
+
+SAMPLE_RATE = 24_000
+DURATIONS_S = (5, 60, 300)
+REPEATS = 5
+
+
+def _make_speech_like(seconds: int) -> bytes:
+    """Tono con sílabas de volumen variable y pausas, como una frase hablada."""
+    rng = random.Random(seconds)
+    samples = array("h")
+    syllable = SAMPLE_RATE // 6
+    for index in range(seconds * 6):
+        level = 0 if rng.random() < 0.15 else rng.uniform(0.1, 1.0)
+        freq = rng.uniform(120, 260)
+        for n in range(syllable):
+            shape = math.sin(math.pi * n / syllable)
+            value = level * shape * math.sin(2 * math.pi * freq * (index * syllable + n) / SAMPLE_RATE)
+            samples.append(int(value * 20_000))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def _best_ms(func) -> float:
+    best = math.inf
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _pydub_slices(pcm: bytes) -> float | None:
+    """Camino anterior: un AudioSegment por tramo de 50 ms (solo si pydub está instalado)."""
+    try:
+        from pydub import AudioSegment
+    except ImportError:
+        return None
+    sound = AudioSegment(data=pcm, sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+    def run() -> None:
+        for ms in range(0, len(sound), envelope.ENVELOPE_FRAME_MS):
+            _ = sound[ms:ms + envelope.ENVELOPE_FRAME_MS].rms
+
+    return _best_ms(run)
+
+
+def _check_short_clips(frame_samples: int) -> None:
+    """Los dos cálculos deben dar los mismos estados también con 1, 2 o 3 tramos y un tramo final parcial."""
+    if envelope.np is None:
+        return
+    pcm = _make_speech_like(1)
+    for samples in (100, frame_samples, frame_samples + 886, 2 * frame_samples,
+                    2 * frame_samples + 100, 3 * frame_samples, 3 * frame_samples - 1):
+        chunk = pcm[:samples * 2]
+        python_states = envelope._python_envelope(chunk, 2, frame_samples)
+        numpy_states = envelope._numpy_envelope(chunk, 2, frame_samples)
+        if python_states != numpy_states:
+            raise SystemExit(f"{samples} muestras: python {python_states} != numpy {numpy_states}")
+    print("clips cortos (1-3 tramos, tramo final parcial): mismos estados con python y numpy")
+
+
+def main() -> None:
+    frame_samples = SAMPLE_RATE * envelope.ENVELOPE_FRAME_MS // 1000
+    _check_short_clips(frame_samples)
+    print(f"{'audio (s)':>10} {'tramos':>8} {'pydub (ms)':>11} {'python (ms)':>12} "
+          f"{'numpy (ms)':>11} {'iguales':>8}")
+    for seconds in DURATIONS_S:
+        pcm = _make_speech_like(seconds)
+        python_states = envelope._python_envelope(pcm, 2, frame_samples)
+        python_ms = _best_ms(lambda: envelope._python_envelope(pcm, 2, frame_samples))
+        pydub_ms = _pydub_slices(pcm)
+        if envelope.np is not None:
+            numpy_states = envelope._numpy_envelope(pcm, 2, frame_samples)
+            numpy_ms = _best_ms(lambda: envelope._numpy_envelope(pcm, 2, frame_samples))
+            same = (sum(a == b for a, b in zip(python_states, numpy_states)) / len(python_states)
+                    if len(numpy_states) == len(python_states) else 0.0)
+            numpy_col, same_col = f"{numpy_ms:>11.2f}", f"{same:>8.1%}"
+        else:
+            numpy_col, same_col = f"{'(sin numpy)':>11}", f"{'-':>8}"
+        pydub_col = f"{pydub_ms:>11.2f}" if pydub_ms is not None else f"{'(sin pydub)':>11}"
+        print(f"{seconds:>10} {len(python_states):>8} {pydub_col} {python_ms:>12.2f} {numpy_col} {same_col}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compara una sesión HTTP nueva por petición (lo que hace gTTS) frente al pool compartido.
+
+Levanta un servidor local y una librería de prueba que hace sus peticiones como
+gTTS (una ``requests.Session`` nueva por petición) y como ``speech_recognition``
+(``urlopen``), así que no necesita conexión y sirve para probar
+``fetch_gtts_mp3``, :func:`audio.http_pool.route_requests` y
+:func:`audio.http_pool.route_urlopen` sin Google. Con ``--tls-delay`` simula el
+coste de abrir cada conexión (handshake TLS + DNS).
+
+Uso: python3 benchmarks/bench_http.py [--requests 50] [--tls-delay 0.05]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio import http_pool  # noqa: E402
+from audio.backends import fetch_gtts_mp3  # noqa: E402
+
+FAKE_MP3 = b"ID3" + bytes(2000)
+
+
+class _GTTSLikeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+    connect_delay = 0.0
+
+    def setup(self) -> None:
+        super().setup()
+        # Cada conexión nueva paga este retraso una vez, como un handshake
+        time.sleep(self.connect_delay)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(FAKE_MP3)))
+        self.end_headers()
+        self.wfile.write(FAKE_MP3)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+_LIBRARY_SOURCE = """
+import requests
+from urllib.request import Request, urlopen
+
+URL = None
+
+class LibraryTTS:
+    def write_to_fp(self, fp):
+        request = requests.Request("POST", URL, data="f.req=%5B%5D&").prepare()
+        with requests.Session() as session:
+            response = session.send(request, timeout=None)
+        response.raise_for_status()
+        fp.write(response.content)
+
+def recognize():
+    return urlopen(Request(URL, data=b"flac"), timeout=None).read()
+"""
+
+
+def _library(name: str, url: str) -> types.ModuleType:
+    """Módulo que pide como gTTS y ``speech_recognition``; cada uno se enruta por separado."""
+    module = types.ModuleType(name)
+    sys.modules[name] = module
+    exec(_LIBRARY_SOURCE, module.__dict__)
+    module.URL = url
+    return module
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--tls-delay", type=float, default=0.05)
+    args = parser.parse_args()
+    if not http_pool.get_pool().available:
+        print("requests no está instalado")
+        return
+
+    _GTTSLikeHandler.connect_delay = args.tls_delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GTTSLikeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/batchexecute"
+    pool = http_pool.HTTPPool()
+    fresh = _library("bench_http_sin_pool", url)
+    pooled = _library("bench_http_con_pool", url)
+    try:
+        assert fetch_gtts_mp3(pooled.LibraryTTS(), pool=pool) == FAKE_MP3
+        assert http_pool.route_urlopen(pooled, "recognize", pool) and pooled.recognize() == FAKE_MP3
+        print(f"{'modo':>16} {'peticiones':>10} {'total (ms)':>11} {'media (ms)':>11}")
+        for label, call in (("sesión nueva", lambda: fresh.LibraryTTS().write_to_fp(io.BytesIO())),
+                            ("pool compartido", lambda: fetch_gtts_mp3(pooled.LibraryTTS(), pool=pool)),
+                            ("urlopen", fresh.recognize),
+                            ("urlopen por pool", pooled.recognize)):
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                call()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label:>16} {args.requests:>10} {elapsed:>11.1f} {elapsed / args.requests:>11.2f}")
+        print(f"métricas del pool: {pool.stats()}")
+    finally:
+        pool.close()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
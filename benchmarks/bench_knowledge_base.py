@@ -0,0 +1,93 @@
+"""Compara la búsqueda lineal de disparadores con el autómata compilado y su caché.
+
+Uso: python3 benchmarks/bench_knowledge_base.py
+"""
+from __future__ import annotations
+
+import pickle
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from knowledge_base import CompiledKnowledgeBase  # noqa: E402
+
+SIZES = (100, 10_000, 100_000)
+QUERIES = 200
+_WORDS = (
+    "receta", "horario", "farmacia", "autobús", "médico", "factura", "contraseña",
+    "impresora", "vacuna", "correo", "banco", "tren", "museo", "clima", "teléfono",
+)
+
+
+def _make_entries(count: int) -> list[dict[str, Any]]:
+    rng = random.Random(count)
+    entries: list[dict[str, Any]] = []
+    for i in range(count):
+        topic = rng.choice(_WORDS)
+        entries.append({
+            "triggers": [f"pregunta {i} sobre {topic}", f"faq{i} {topic}"],
+            "keywords": [f"clave{i}", topic],
+            "answer": f"Respuesta número {i}.",
+        })
+    return entries
+
+
+def _linear_find(entries: list[dict[str, Any]], message: str) -> str | None:
+    """Recorrido original: cada disparador de cada entrada, en orden."""
+    for entry in entries:
+        for trig in entry.get("triggers", []):
+            if trig.lower() in message:
+                return entry["answer"]
+        keywords = entry.get("keywords")
+        if keywords and all(keyword.lower() in message for keyword in keywords):
+            return entry["answer"]
+    return None
+
+
+def _messages(count: int) -> list[str]:
+    rng = random.Random(7)
+    messages = []
+    for _ in range(QUERIES):
+        i = rng.randrange(count)
+        if rng.random() < 0.5:
+            messages.append(f"oye, tengo una pregunta {i} sobre {rng.choice(_WORDS)} por favor")
+        else:
+            messages.append("esto no coincide con ninguna entrada de la base de conocimiento")
+    return messages
+
+
+def _per_query_ms(func, messages: list[str]) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        func(message)
+    return (time.perf_counter() - start) * 1000 / len(messages)
+
+
+def main() -> None:
+    print(
+        f"{'entradas':>10} {'compilar (ms)':>14} {'caché (ms)':>11} "
+        f"{'lineal (ms)':>12} {'autómata (ms)':>14}"
+    )
+    for size in SIZES:
+        entries = _make_entries(size)
+        messages = _messages(size)
+        start = time.perf_counter()
+        compiled = CompiledKnowledgeBase(entries)
+        compile_ms = (time.perf_counter() - start) * 1000
+        blob = pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL)
+        start = time.perf_counter()
+        pickle.loads(blob)
+        cache_ms = (time.perf_counter() - start) * 1000
+        for message in messages:
+            assert compiled.find_answer(message) == _linear_find(entries, message)
+        linear = _per_query_ms(lambda m: _linear_find(entries, m), messages)
+        automaton = _per_query_ms(compiled.find_answer, messages)
+        print(f"{size:>10} {compile_ms:>14.1f} {cache_ms:>11.1f} {linear:>12.3f} {automaton:>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compara el coste en CPU de medir el nivel del micrófono: bucle con struct frente a audio.levels.
+
+El medidor de la ventana principal procesa un bloque de 1024 muestras diez veces
+por segundo mientras la ventana está abierta; "CPU a 10 Hz" es el porcentaje de
+un núcleo que eso supone.
+
+Uso: python3 benchmarks/bench_levels.py
+"""
+from __future__ import annotations
+
+import math
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio import levels  # noqa: E402
+from bench_envelope import _make_speech_like  # noqa: E402
+
+BLOCK_SAMPLES = 1024
+ITERATIONS = 5000
+
+
+def _struct_loop(data: bytes) -> float:
+    """Cálculo anterior de launch_gui/test_mic."""
+    count = len(data) // 2
+    samples = struct.unpack(f"{count}h", data)
+    sum_squares = 0.0
+    for s in samples:
+        sum_squares += (s/32768.0) * (s/32768.0)
+    return math.sqrt(sum_squares / count)
+
+
+def _with_backend(np_module, audioop_module):
+    def run(data: bytes) -> float:
+        saved = levels.np, levels.audioop
+        levels.np, levels.audioop = np_module, audioop_module
+        try:
+            return levels.block_levels(data).rms
+        finally:
+            levels.np, levels.audioop = saved
+    return run
+
+
+def _cpu_us(func, block: bytes) -> float:
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        func(block)
+    return (time.process_time() - start) / ITERATIONS * 1e6
+
+
+def main() -> None:
+    # Un bloque en mitad de una sílaba (las pausas darían RMS 0)
+    block = _make_speech_like(1)[16000:16000 + BLOCK_SAMPLES * 2]
+    variants = [("struct + bucle", _struct_loop)]
+    if levels.np is not None:
+        variants.append(("numpy", _with_backend(levels.np, None)))
+    if levels.audioop is not None:
+        variants.append(("audioop", _with_backend(None, levels.audioop)))
+    variants.append(("array", _with_backend(None, None)))
+    reference = _struct_loop(block)
+    print(f"{'método':>15} {'CPU/bloque (µs)':>16} {'CPU a 10 Hz (%)':>16} {'RMS':>8}")
+    for label, func in variants:
+        cpu = _cpu_us(func, block)
+        rms = func(block)
+        assert abs(rms - reference) < 1e-3, label
+        print(f"{label:>15} {cpu:>16.1f} {cpu * 10 / 1e4:>16.4f} {rms:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compara el cambio de tono de la voz masculina: pydub (remuestreo + speedup) frente a WSOLA.
+
+Uso: python3 benchmarks/bench_pitch.py
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio import pitch  # noqa: E402
+from bench_envelope import SAMPLE_RATE, _make_speech_like  # noqa: E402
+
+DURATIONS_S = (3, 15, 60)
+PROFILE = pitch.DEFAULT_PROFILES["male"]
+
+
+def _pydub_path(pcm: bytes):
+    from pydub import AudioSegment
+    sound = AudioSegment(data=pcm, sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+    new_rate = int(sound.frame_rate * (2.0 ** (PROFILE.semitones / 12.0)))
+    pitched = sound._spawn(sound.raw_data, overrides={"frame_rate": new_rate}).set_frame_rate(sound.frame_rate)
+    return pitched.speedup(playback_speed=(2.0 ** (-PROFILE.semitones / 12.0)) * PROFILE.tempo).raw_data
+
+
+def _wsola_path(pcm: bytes) -> bytes:
+    return pitch.shift_pcm(pcm, SAMPLE_RATE, 1, PROFILE.semitones, PROFILE.tempo)
+
+
+def _time(func, pcm: bytes) -> tuple[float, int] | None:
+    try:
+        start = time.perf_counter()
+        out = func(pcm)
+        return time.perf_counter() - start, len(out)
+    except ImportError:
+        return None
+
+
+def main() -> None:
+    print(f"{'audio (s)':>10} {'pydub (ms)':>11} {'RTF pydub':>10} {'wsola (ms)':>11} {'RTF wsola':>10} {'dur. rel.':>9}")
+    for seconds in DURATIONS_S:
+        pcm = _make_speech_like(seconds)
+        cols = []
+        ratio = float("nan")  # duración de la salida / entrada (debería ser 1/tempo)
+        for func, available in ((_pydub_path, True), (_wsola_path, pitch.available())):
+            result = _time(func, pcm) if available else None
+            if result is None:
+                cols.append(f"{'-':>11} {'-':>10}")
+                continue
+            elapsed, size = result
+            cols.append(f"{elapsed * 1000:>11.1f} {elapsed / seconds:>10.4f}")
+            ratio = size / len(pcm)
+        print(f"{seconds:>10} {' '.join(cols)} {ratio:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
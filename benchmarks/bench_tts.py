@@ -0,0 +1,67 @@
+"""Compara los motores de voz: latencia de síntesis y factor de tiempo real (RTF).
+
+RTF = segundos de cálculo / segundos de audio generado; por debajo de 1 el motor
+genera más rápido de lo que se tarda en escucharlo. Los motores que no están
+instalados (o gTTS sin conexión) aparecen con "-".
+
+Uso: python3 benchmarks/bench_tts.py [motor ...]
+     (por defecto todos los registrados; Piper necesita PIPER_MODEL=<ruta .onnx>)
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio import backends  # noqa: E402
+from audio.pcm import SAMPLE_WIDTH  # noqa: E402
+
+SENTENCES = (
+    "Hola.",
+    "Es la hora de tomar la medicación de la mañana.",
+    "Recuerda que mañana a las diez tienes cita con el médico de cabecera en el centro de salud, "
+    "lleva la tarjeta sanitaria y la lista de medicamentos.",
+)
+REPEATS = 3
+
+
+def _bench(backend: backends.TTSBackend, voice: backends.VoiceOptions, text: str) -> tuple[float, float] | None:
+    """Mejor tiempo de ``REPEATS`` síntesis y duración del audio, o None si el motor falla."""
+    best = float("inf")
+    seconds = 0.0
+    for _ in range(REPEATS):
+        try:
+            start = time.perf_counter()
+            audio = backend.synthesize(text, voice)
+            best = min(best, time.perf_counter() - start)
+        except Exception as exc:
+            print(f"  {backend.name}: {exc}")
+            return None
+        seconds = len(audio.pcm) / (SAMPLE_WIDTH * audio.channels * audio.sample_rate)
+    return best, seconds
+
+
+def main() -> None:
+    names = sys.argv[1:] or list(backends.backend_names())
+    voice = backends.VoiceOptions(model=os.environ.get("PIPER_MODEL"))
+    print(f"{'motor':>8} {'caracteres':>10} {'latencia (ms)':>14} {'audio (s)':>10} {'RTF':>7}")
+    for name in names:
+        backend = backends.get_backend(name)
+        if not backend.is_available(voice):
+            print(f"{name:>8} {'-':>10} {'-':>14} {'-':>10} {'-':>7}")
+            continue
+        for text in SENTENCES:
+            result = _bench(backend, voice, text)
+            if result is None:
+                print(f"{name:>8} {len(text):>10} {'-':>14} {'-':>10} {'-':>7}")
+                break
+            elapsed, seconds = result
+            rtf = elapsed / seconds if seconds else float("nan")
+            print(f"{name:>8} {len(text):>10} {elapsed * 1000:>14.1f} {seconds:>10.2f} {rtf:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
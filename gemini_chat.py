@@ -16,6 +16,9 @@ except ImportError:
 
 # Configuración
 SETTINGS_FILE = get_user_settings_file()
+# Por debajo del límite de cada mensaje del avatar (60 s), para que el hilo que
+# espera a Gemini quede libre poco después de que la interfaz se rinda
+REQUEST_TIMEOUT_S = 45.0
 
 class GeminiChat:
     """Gestor de conversaciones con Gemini."""
@@ -75,7 +78,7 @@ class GeminiChat:
                 if self.chat is not None:
                     send_initial = getattr(self.chat, "send_message", None)
                     if callable(send_initial):
-                        send_initial(system_prompt)
+                        self._send(send_initial, system_prompt)
             except Exception:
                 pass
             
@@ -109,7 +112,7 @@ class GeminiChat:
             send_message = getattr(self.chat, "send_message", None)
             if not callable(send_message):
                 return "La conversación de Gemini no está lista todavía."
-            response = send_message(message)
+            response = self._send(send_message, message)
             
             # Guardar en historial
             self.history.append({
@@ -128,11 +131,20 @@ class GeminiChat:
                 return "Error de autenticación. Por favor, verifica tu API key de Gemini en Preferencias."
             elif "quota" in error_msg.lower() or "limit" in error_msg.lower():
                 return "Has alcanzado el límite de uso de la API. Intenta más tarde o verifica tu cuenta de Google."
+            elif "deadline" in error_msg.lower() or "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
+                return "Gemini no respondió a tiempo. Inténtalo de nuevo en un momento."
             elif "network" in error_msg.lower() or "connection" in error_msg.lower():
                 return "Error de conexión. Verifica tu conexión a internet."
             else:
                 return f"Lo siento, hubo un error al procesar tu mensaje. Intenta de nuevo."
     
+    def _send(self, send_message, message):
+        """Envía con tiempo límite; las versiones antiguas del SDK no aceptan ``request_options``."""
+        try:
+            return send_message(message, request_options={"timeout": REQUEST_TIMEOUT_S})
+        except TypeError:
+            return send_message(message)
+
     def end_conversation(self):
         """Finaliza la conversación actual."""
         self.conversation_active = False
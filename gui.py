@@ -207,46 +207,43 @@ def launch_gui():
     vu_canvas = tk.Canvas(vu_frame, width=120, height=12, bg="#222", highlightthickness=0)
     vu_canvas.pack(side=tk.LEFT, padx=5)
     vu_bar = vu_canvas.create_rectangle(0, 0, 0, 12, fill="#4CAF50")
-    vu_level_var = {"rms": 0.0}
+    vu_peak = vu_canvas.create_line(0, 0, 0, 12, fill="#EEEEEE")
+    vu_level_var = {"rms": 0.0, "peak_hold": 0.0}
     meter_running = [True]
     meter_thread: dict[str, Optional[threading.Thread]] = {"t": None}
     after_vu_id: list[Optional[str]] = [None]
 
     def start_meter_thread():
         try:
-            import pyaudio, math, struct, speech_recognition as sr
-            pa = pyaudio.PyAudio()
+            from audio import capture
+            from audio.levels import LevelMeter
             device_index = voice.get_microphone_device() if hasattr(voice, 'get_microphone_device') else None
-            # Elegir índice válido o None
-            if device_index is not None and (device_index < 0 or device_index >= pa.get_device_count()):
-                device_index = None
-            stream = pa.open(format=pyaudio.paInt16, channels=1, rate=16000, input=True,
-                             frames_per_buffer=1024, input_device_index=device_index)
+            # Se comparte el stream del micrófono con el reconocedor y la prueba de ruido
+            try:
+                reader = capture.get_capture_service(device_index).subscribe("vu")
+            except Exception:
+                if device_index is None:
+                    raise
+                reader = capture.get_capture_service(None).subscribe("vu")
         except Exception as e:
             print(f"No se pudo iniciar VU meter: {e}")
             return
 
+        meter = LevelMeter()
+
         def run():
             while meter_running[0]:
                 try:
-                    data = stream.read(1024, exception_on_overflow=False)
-                    # Calcular RMS
+                    data = reader.latest(1024 * 2)
+                    # RMS suavizado y pico retenido del último bloque
                     if data:
-                        count = len(data) // 2
-                        fmt = f"{count}h"
-                        samples = struct.unpack(fmt, data)
-                        sum_squares = 0.0
-                        for s in samples:
-                            sum_squares += (s/32768.0) * (s/32768.0)
-                        rms = math.sqrt(sum_squares / count)
-                        vu_level_var["rms"] = rms
+                        reading = meter.update(data)
+                        vu_level_var["rms"] = reading.rms
+                        vu_level_var["peak_hold"] = reading.peak_hold
                 except Exception:
                     pass
                 time.sleep(0.1)
-            try:
-                stream.stop_stream(); stream.close(); pa.terminate()
-            except Exception:
-                pass
+            reader.close()
         t = threading.Thread(target=run, daemon=True)
         meter_thread["t"] = t
         t.start()
@@ -260,6 +257,8 @@ def launch_gui():
             rms = vu_level_var.get("rms", 0.0)
             width = int(max(0, min(1.0, rms * 3.0)) * 120)  # amplificar para visibilidad
             vu_canvas.coords(vu_bar, 0, 0, width, 12)
+            peak_x = int(max(0, min(1.0, vu_level_var.get("peak_hold", 0.0))) * 119)
+            vu_canvas.coords(vu_peak, peak_x, 0, peak_x, 12)
             color = "#4CAF50" if width < 60 else ("#FFC107" if width < 90 else "#F44336")
             vu_canvas.itemconfig(vu_bar, fill=color)
         except Exception:
@@ -334,6 +333,20 @@ def launch_gui():
     search_engine_menu.add_radiobutton(label="Google", variable=search_engine_var, value="google", command=lambda: set_engine("google"))
     search_engine_menu.add_radiobutton(label="DuckDuckGo", variable=search_engine_var, value="duckduckgo", command=lambda: set_engine("duckduckgo"))
 
+    # Submenú Respuestas locales (coincidencia exacta o búsqueda aproximada)
+    kb_mode_menu = tk.Menu(preferences_menu, tearoff=0)
+    preferences_menu.add_cascade(label="Respuestas locales", menu=kb_mode_menu)
+    kb_mode_var = tk.StringVar(value=voice.get_kb_retrieval_mode())
+
+    def set_kb_mode(value):
+        try:
+            voice.set_kb_retrieval_mode(value)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo guardar el modo: {e}")
+
+    kb_mode_menu.add_radiobutton(label="Solo frases exactas", variable=kb_mode_var, value="exact", command=lambda: set_kb_mode("exact"))
+    kb_mode_menu.add_radiobutton(label="Búsqueda aproximada", variable=kb_mode_var, value="ranked", command=lambda: set_kb_mode("ranked"))
+
     # Submenú Tema (Claro/Oscuro)
     theme_menu = tk.Menu(preferences_menu, tearoff=0)
     preferences_menu.add_cascade(label="Tema", menu=theme_menu)
@@ -801,6 +814,13 @@ def voice_config_window(on_close=None):
         variable=engine_var, 
         value="pyttsx3",
     ).pack(anchor="w", pady=5)
+
+    ttk.Radiobutton(
+        motor_frame, 
+        text="espeak-ng - Voz local muy rápida (requiere tenerlo instalado)", 
+        variable=engine_var, 
+        value="espeak",
+    ).pack(anchor="w", pady=5)
     
     # Género de voz
     gender_frame = ttk.LabelFrame(content, text="Género de Voz")
@@ -908,30 +928,14 @@ def voice_config_window(on_close=None):
 
         def worker():
             try:
-                import pyaudio, struct, math
-                pa = pyaudio.PyAudio()
-                stream = pa.open(format=pyaudio.paInt16, channels=1, rate=16000, input=True,
-                                 frames_per_buffer=1024, input_device_index=idx)
-                frames = 0
-                sum_squares = 0.0
+                from audio import capture
+                from audio.levels import block_levels
                 target_frames = 10
-                while frames < target_frames:
-                    data = stream.read(1024, exception_on_overflow=False)
-                    if data:
-                        count = len(data) // 2
-                        samples = struct.unpack(f"{count}h", data)
-                        for s in samples:
-                            v = (s/32768.0)
-                            sum_squares += v*v
-                        frames += 1
-                try:
-                    stream.stop_stream(); stream.close(); pa.terminate()
-                except Exception:
-                    pass
-                total_samples = target_frames * 1024
-                rms = (sum_squares / max(1, total_samples)) ** 0.5
-                import math as _math
-                dbfs = -90.0 if rms <= 1e-6 else 20.0 * _math.log10(rms)
+                # Lector temporal del micrófono elegido (comparte el stream si ya está abierto)
+                with capture.get_capture_service(idx).subscribe("prueba-ruido") as reader:
+                    data = reader.read_exact(target_frames * 1024 * 2, timeout=2.0)
+                levels = block_levels(data)
+                dbfs = levels.dbfs
                 calidad = "bajo" if dbfs < -45 else ("medio" if dbfs < -30 else "alto")
                 mensaje = (
                     f"Micrófono {'automático' if idx is None else idx} listo.\n"
@@ -962,7 +966,7 @@ def voice_config_window(on_close=None):
     # Botones de prueba y guardar
     def test_voice():
         texto = "Hola, esta es una prueba de voz en español."
-        voice.hablar(texto)
+        voice.hablar(texto, priority=voice.PRIORITY_CONFIRMATION)
         messagebox.showinfo("Prueba", "Reproduciendo voz de prueba...")
     
     def save_config():
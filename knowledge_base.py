@@ -1,12 +1,35 @@
-"""Simple keyword-based knowledge base for local responses."""
+"""Simple keyword-based knowledge base for local responses, loaded from merged packs."""
 from __future__ import annotations
 
+from array import array
 from pathlib import Path
+import ctypes
+import ctypes.util
+import hashlib
 import json
+import marshal
+import math
+import os
+import pickle
 import re
+import struct
+import sys
+import threading
+import time
 from typing import Any
 
+from text_matching import AhoCorasick, tokenize_es
+from user_storage import get_user_config_dir
+
 _KB_FILE = Path(__file__).parent / "config" / "knowledge_base.json"
+# Topic packs shared by every user; per-user packs live in config/users/<slug>/knowledge.
+_PACKS_DIR = _KB_FILE.parent / "knowledge"
+_NON_PACK_FILES = frozenset({"settings.json", "reminders.json", "conversation_history.json"})
+_INDEX_VERSION = 3
+_CACHE_MAGIC = b"NENOKB1\n"
+
+RETRIEVAL_MODES = ("exact", "ranked")
+DEFAULT_MIN_CONFIDENCE = 0.4
 
 _DEFAULT_DATA = [
 	{
@@ -98,58 +121,543 @@ _DEFAULT_DATA = [
 
 def _ensure_file() -> None:
 	_KB_FILE.parent.mkdir(parents=True, exist_ok=True)
+	_PACKS_DIR.mkdir(parents=True, exist_ok=True)
+	_user_packs_dir().mkdir(parents=True, exist_ok=True)
 	if not _KB_FILE.exists():
 		with open(_KB_FILE, "w", encoding="utf-8") as fh:
 			json.dump(_DEFAULT_DATA, fh, indent=2, ensure_ascii=False)
 
 
-def _load_entries() -> list[dict[str, Any]]:
+def _user_packs_dir() -> Path:
+	return get_user_config_dir() / "knowledge"
+
+
+def _cache_file() -> Path:
+	return get_user_config_dir() / "knowledge_cache.bin"
+
+
+def _index_file() -> Path:
+	return get_user_config_dir() / "knowledge_base.idx"
+
+
+def pack_files() -> list[Path]:
+	"""Knowledge files in precedence order: user packs, topic packs, global default.
+
+	Entries are merged in this order, so on conflicting triggers the user's own
+	packs win over topic packs, which win over ``knowledge_base.json``.
+	"""
 	_ensure_file()
+	files: list[Path] = []
+	for directory in (_user_packs_dir(), _PACKS_DIR):
+		try:
+			files.extend(sorted(path for path in directory.glob("*.json") if path.is_file()))
+		except OSError:
+			pass
+	files.append(_KB_FILE)
+	return files
+
+
+def _load_entries(blobs: list[tuple[Path, bytes]] | None = None) -> list[dict[str, Any]]:
+	if blobs is None:
+		blobs = _read_blobs(_source_stamps()[1])
+	entries: list[dict[str, Any]] = []
+	global_loaded = False
+	for path, raw in blobs:
+		try:
+			data = json.loads(raw.decode("utf-8"))
+		except Exception as exc:
+			print(f"No se pudo leer {path.name}: {exc}")
+			continue
+		if isinstance(data, list):
+			entries.extend(entry for entry in data if isinstance(entry, dict))
+			global_loaded = global_loaded or path == _KB_FILE
+	if not global_loaded:
+		entries.extend(_DEFAULT_DATA)
+	return entries
+
+
+def _entry_answer(entry: dict[str, Any]) -> str | None:
+	answer = entry.get("answer")
+	if not isinstance(answer, str) or not answer.strip():
+		return None
+	return answer.strip()
+
+
+class CompiledKnowledgeBase:
+	"""Entries compiled into a single automaton over every trigger and keyword.
+
+	Matching is one pass over the message; when several entries match, the one
+	listed first in the file still wins.
+	"""
+
+	_NO_OWNER = -1
+
+	def __init__(self, entries: list[dict[str, Any]]) -> None:
+		self.answers: list[str] = []
+		self._automaton = AhoCorasick()
+		trigger_owner: dict[int, int] = {}
+		keyword_owners: dict[int, list[int]] = {}
+		keyword_required: dict[int, int] = {}
+		self._questions: dict[str, int] = {}
+		self._patterns: list[tuple[int, re.Pattern[str]]] = []
+
+		for entry in entries:
+			answer = _entry_answer(entry)
+			if answer is None:
+				# Entries without an answer can never be returned.
+				continue
+			index = len(self.answers)
+			self.answers.append(answer)
+
+			triggers = entry.get("triggers")
+			if isinstance(triggers, list):
+				for trig in triggers:
+					if isinstance(trig, str):
+						pattern_id = self._automaton.add(trig.lower())
+						trigger_owner.setdefault(pattern_id, index)
+
+			keywords = entry.get("keywords")
+			if (
+				isinstance(keywords, list)
+				and keywords
+				and all(isinstance(keyword, str) for keyword in keywords)
+			):
+				keyword_ids = {self._automaton.add(keyword.lower()) for keyword in keywords}
+				keyword_required[index] = len(keyword_ids)
+				for pattern_id in keyword_ids:
+					keyword_owners.setdefault(pattern_id, []).append(index)
+
+			pattern = entry.get("pattern")
+			if isinstance(pattern, str):
+				try:
+					self._patterns.append((index, re.compile(pattern, flags=re.IGNORECASE)))
+				except re.error:
+					pass
+
+			question = entry.get("question")
+			if isinstance(question, str):
+				self._questions.setdefault(question.lower(), index)
+
+		self._automaton.build()
+		# Flat arrays (indexed by pattern id / entry index) keep the pickled cache compact.
+		pattern_count = len(self._automaton)
+		self._trigger_owner = array("i", [self._NO_OWNER]) * pattern_count
+		for pattern_id, index in trigger_owner.items():
+			self._trigger_owner[pattern_id] = index
+		self._keyword_starts = array("I")
+		self._keyword_entries = array("I")
+		for pattern_id in range(pattern_count):
+			self._keyword_starts.append(len(self._keyword_entries))
+			self._keyword_entries.extend(keyword_owners.get(pattern_id, ()))
+		self._keyword_starts.append(len(self._keyword_entries))
+		self._keyword_required = array("I", [0]) * len(self.answers)
+		for index, required in keyword_required.items():
+			self._keyword_required[index] = required
+
+	def __len__(self) -> int:
+		return len(self.answers)
+
+	def match(self, normalized_message: str) -> int | None:
+		"""Return the index of the first entry matching an already lowercased message."""
+		best: int | None = self._questions.get(normalized_message)
+		keyword_hits: dict[int, int] = {}
+		starts, owners = self._keyword_starts, self._keyword_entries
+		for pattern_id in self._automaton.find_ids(normalized_message):
+			owner = self._trigger_owner[pattern_id]
+			if owner != self._NO_OWNER and (best is None or owner < best):
+				best = owner
+			for index in owners[starts[pattern_id]:starts[pattern_id + 1]]:
+				hits = keyword_hits.get(index, 0) + 1
+				keyword_hits[index] = hits
+				if hits == self._keyword_required[index] and (best is None or index < best):
+					best = index
+		# Regex entries only need checking when they could beat the current best.
+		for index, compiled in self._patterns:
+			if best is not None and index >= best:
+				break
+			if compiled.search(normalized_message):
+				return index
+		return best
+
+	def find_answer(self, normalized_message: str) -> str | None:
+		index = self.match(normalized_message)
+		return self.answers[index] if index is not None else None
+
+
+class RetrievalIndex:
+	"""BM25 index over triggers, keywords, questions and answers.
+
+	Documents are numbered like :attr:`CompiledKnowledgeBase.answers`. Postings are
+	kept as packed ``array`` buffers so the index marshals to a compact file.
+	"""
+
+	K1 = 1.2
+	B = 0.75
+	# Trigger-like fields are repeated so they outweigh words in the answer.
+	PHRASE_WEIGHT = 2
+
+	def __init__(self, doc_lengths: list[int], postings: dict[str, tuple[bytes, bytes]]) -> None:
+		self._doc_lengths = doc_lengths
+		self._postings = {
+			term: (array("I", docs), array("H", freqs)) for term, (docs, freqs) in postings.items()
+		}
+		count = len(doc_lengths)
+		self._avg_length = (sum(doc_lengths) / count) if count else 0.0
+		self._idf = {
+			term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+			for term, (docs, _) in self._postings.items()
+		}
+
+	@classmethod
+	def build(cls, entries: list[dict[str, Any]]) -> "RetrievalIndex":
+		doc_lengths: list[int] = []
+		term_docs: dict[str, tuple[array, array]] = {}
+		for entry in entries:
+			if _entry_answer(entry) is None:
+				continue
+			phrases: list[str] = []
+			for field in ("triggers", "keywords"):
+				values = entry.get(field)
+				if isinstance(values, list):
+					phrases.extend(value for value in values if isinstance(value, str))
+			question = entry.get("question")
+			if isinstance(question, str):
+				phrases.append(question)
+			tokens = tokenize_es(" ".join(phrases)) * cls.PHRASE_WEIGHT
+			tokens += tokenize_es(str(entry.get("answer", "")))
+			doc_id = len(doc_lengths)
+			doc_lengths.append(len(tokens))
+			counts: dict[str, int] = {}
+			for token in tokens:
+				counts[token] = counts.get(token, 0) + 1
+			for term, freq in counts.items():
+				docs, freqs = term_docs.setdefault(term, (array("I"), array("H")))
+				docs.append(doc_id)
+				freqs.append(min(freq, 0xFFFF))
+		postings = {term: (docs.tobytes(), freqs.tobytes()) for term, (docs, freqs) in term_docs.items()}
+		return cls(doc_lengths, postings)
+
+	def dumps(self, content_hash: str) -> bytes:
+		postings = {term: (docs.tobytes(), freqs.tobytes()) for term, (docs, freqs) in self._postings.items()}
+		return marshal.dumps((_INDEX_VERSION, content_hash, self._doc_lengths, postings))
+
+	@classmethod
+	def loads(cls, blob: bytes, content_hash: str) -> "RetrievalIndex | None":
+		"""Rebuild the index from :meth:`dumps` output, or ``None`` if it is stale."""
+		try:
+			version, stored_hash, doc_lengths, postings = marshal.loads(blob)
+		except Exception:
+			return None
+		if version != _INDEX_VERSION or stored_hash != content_hash:
+			return None
+		return cls(doc_lengths, postings)
+
+	def search(self, message: str) -> tuple[int, float] | None:
+		"""Return ``(document, confidence)`` for the best hit, confidence in ``[0, 1]``."""
+		terms = set(tokenize_es(message))
+		if not terms or not self._doc_lengths:
+			return None
+		k1, b, avg = self.K1, self.B, self._avg_length or 1.0
+		scores: dict[int, float] = {}
+		# Only terms the index knows count towards the ceiling: filler words
+		# ("dime", "oye") must not push a good hit below the confidence threshold.
+		ceiling = 0.0
+		for term in terms:
+			posting = self._postings.get(term)
+			if posting is None:
+				continue
+			idf = self._idf[term]
+			ceiling += idf * (k1 + 1)
+			for doc, freq in zip(*posting):
+				norm = k1 * (1 - b + b * self._doc_lengths[doc] / avg)
+				scores[doc] = scores.get(doc, 0.0) + idf * freq * (k1 + 1) / (freq + norm)
+		if not scores:
+			return None
+		doc = max(scores, key=lambda candidate: (scores[candidate], -candidate))
+		return doc, min(1.0, scores[doc] / ceiling)
+
+
+_compiled_lock = threading.Lock()
+_compiled: CompiledKnowledgeBase | None = None
+_compiled_key: str | None = None
+_index: RetrievalIndex | None = None
+_index_key: str | None = None
+# Bumped by the watcher whenever a pack changes; compared on every lookup.
+_generation = 0
+_loaded_generation = -1
+_watcher: "_PackWatcher | None" = None
+
+
+def _source_stamps() -> tuple[str, list[Path]]:
+	"""Key the packs by path, size and modification time, without reading them.
+
+	A warm start therefore costs one ``stat`` per pack plus one unpickle of the
+	compiled matcher; pack contents are only read when something changed.
+	"""
+	digest = hashlib.sha1()
+	paths: list[Path] = []
+	for path in pack_files():
+		try:
+			stat = path.stat()
+		except OSError as exc:
+			print(f"No se pudo leer {path.name}: {exc}")
+			continue
+		digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode("utf-8"))
+		paths.append(path)
+	return digest.hexdigest(), paths
+
+
+def _read_blobs(paths: list[Path]) -> list[tuple[Path, bytes]]:
+	blobs: list[tuple[Path, bytes]] = []
+	for path in paths:
+		try:
+			blobs.append((path, path.read_bytes()))
+		except OSError as exc:
+			print(f"No se pudo leer {path.name}: {exc}")
+	return blobs
+
+
+def _load_compiled_cache(source_key: str) -> CompiledKnowledgeBase | None:
+	"""Unpickle the cached matcher if it was compiled from packs with ``source_key``.
+
+	The matcher holds strings, a dict and compiled regexes besides its flat
+	arrays, so it cannot be used straight from a mapped file: a hit costs one
+	read and one unpickle, still far cheaper than parsing and compiling the packs.
+	"""
+	header = _CACHE_MAGIC + source_key.encode("ascii") + b"\n"
 	try:
-		with open(_KB_FILE, "r", encoding="utf-8") as fh:
-			data = json.load(fh)
-			if isinstance(data, list):
-				return [entry for entry in data if isinstance(entry, dict)]
+		data = _cache_file().read_bytes()
+	except OSError:
+		return None
+	if not data.startswith(header):
+		return None
+	try:
+		compiled = pickle.loads(memoryview(data)[len(header):])
 	except Exception as exc:
-		print(f"No se pudo leer knowledge_base.json: {exc}")
-	return list(_DEFAULT_DATA)
-
-
-def _matches(entry: dict[str, Any], normalized_message: str) -> bool:
-	triggers = entry.get("triggers")
-	if isinstance(triggers, list):
-		for trig in triggers:
-			if isinstance(trig, str) and trig.lower() in normalized_message:
-				return True
-	keywords = entry.get("keywords")
-	if isinstance(keywords, list) and keywords:
-		if all(isinstance(keyword, str) and keyword.lower() in normalized_message for keyword in keywords):
-			return True
-	pattern = entry.get("pattern")
-	if isinstance(pattern, str):
+		print(f"Caché de la base de conocimiento inválida: {exc}")
+		return None
+	return compiled if isinstance(compiled, CompiledKnowledgeBase) else None
+
+
+def _store_compiled_cache(source_key: str, compiled: CompiledKnowledgeBase) -> None:
+	target = _cache_file()
+	tmp = target.with_suffix(".tmp")
+	try:
+		with open(tmp, "wb") as fh:
+			fh.write(_CACHE_MAGIC + source_key.encode("ascii") + b"\n")
+			pickle.dump(compiled, fh, protocol=pickle.HIGHEST_PROTOCOL)
+		tmp.replace(target)
+	except OSError as exc:
+		print(f"No se pudo guardar la caché de la base de conocimiento: {exc}")
+
+
+def _install_locked(source_key: str, paths: list[Path]) -> list[tuple[Path, bytes]] | None:
+	"""Make the matcher for ``source_key`` current. Caller holds ``_compiled_lock``.
+
+	Returns the packs read to compile it, or ``None`` if it came from the cache.
+	"""
+	global _compiled, _compiled_key
+	blobs = None
+	compiled = _load_compiled_cache(source_key)
+	if compiled is None:
+		blobs = _read_blobs(paths)
+		compiled = CompiledKnowledgeBase(_load_entries(blobs))
+		_store_compiled_cache(source_key, compiled)
+	if _compiled is not None:
+		print("Base de conocimiento recargada.")
+	_compiled = compiled
+	_compiled_key = source_key
+	return blobs
+
+
+def _refresh_locked() -> list[tuple[Path, bytes]] | None:
+	"""Reload the matcher if the watcher saw a change; return the packs read, if any."""
+	global _loaded_generation
+	_ensure_watcher()
+	if _compiled is not None and _loaded_generation == _generation:
+		return None
+	generation = _generation
+	source_key, paths = _source_stamps()
+	blobs = None
+	if _compiled is None or source_key != _compiled_key:
+		blobs = _install_locked(source_key, paths)
+	_loaded_generation = generation
+	return blobs
+
+
+def _get_compiled() -> CompiledKnowledgeBase:
+	"""Return the compiled matcher, reloading only after the watcher saw a change."""
+	with _compiled_lock:
+		_refresh_locked()
+		return _compiled
+
+
+def _load_or_build_index(blobs: list[tuple[Path, bytes]] | None) -> RetrievalIndex:
+	"""Load the persisted index for ``_compiled_key`` or build it from the same packs.
+
+	Caller holds ``_compiled_lock``. Documents are numbered like the compiled
+	answers, so both must come from the same snapshot of the packs: if they
+	changed since the matcher was compiled, the matcher is recompiled too.
+	"""
+	try:
+		index = RetrievalIndex.loads(_index_file().read_bytes(), _compiled_key or "")
+	except OSError:
+		index = None
+	if index is not None:
+		return index
+	while blobs is None:
+		source_key, paths = _source_stamps()
+		if source_key != _compiled_key:
+			blobs = _install_locked(source_key, paths)
+		if blobs is None:
+			blobs = _read_blobs(paths)
+			# A pack changed while reading: start over so the matcher matches these blobs
+			if _source_stamps()[0] != _compiled_key:
+				blobs = None
+	index = RetrievalIndex.build(_load_entries(blobs))
+	try:
+		_index_file().write_bytes(index.dumps(_compiled_key or ""))
+	except OSError as exc:
+		print(f"No se pudo guardar el índice de la base de conocimiento: {exc}")
+	return index
+
+
+def _get_ranked() -> tuple[CompiledKnowledgeBase, RetrievalIndex]:
+	"""Return the matcher and the BM25 index built from the same packs."""
+	global _index, _index_key
+	with _compiled_lock:
+		blobs = _refresh_locked()
+		if _index is None or _index_key != _compiled_key:
+			_index = _load_or_build_index(blobs)
+			_index_key = _compiled_key
+		return _compiled, _index
+
+
+def _mark_changed() -> None:
+	global _generation
+	_generation += 1
+
+
+class _PackWatcher:
+	"""Watch the pack directories and flag the knowledge base for reload.
+
+	Uses inotify through ctypes on Linux; elsewhere it polls file stamps.
+	"""
+
+	POLL_INTERVAL = 2.0
+	# IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+	_INOTIFY_MASK = 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+	_EVENT = struct.Struct("iIII")
+
+	def __init__(self, directories: list[Path]) -> None:
+		self._directories = directories
+		self._thread = threading.Thread(target=self._run, daemon=True)
+
+	def start(self) -> None:
+		self._thread.start()
+
+	def _run(self) -> None:
+		fd = self._open_inotify()
+		if fd is None:
+			self._poll()
+			return
+		while True:
+			try:
+				data = os.read(fd, 4096)
+			except OSError as exc:
+				print(f"Vigilancia de la base de conocimiento detenida: {exc}")
+				return
+			offset = 0
+			changed = False
+			while offset + self._EVENT.size <= len(data):
+				_, _, _, name_len = self._EVENT.unpack_from(data, offset)
+				offset += self._EVENT.size
+				name = data[offset:offset + name_len].rstrip(b"\0").decode("utf-8", "replace")
+				offset += name_len
+				changed = changed or _is_pack_name(name)
+			if changed:
+				_mark_changed()
+
+	def _open_inotify(self) -> int | None:
+		if not sys.platform.startswith("linux"):
+			return None
 		try:
-			if re.search(pattern, normalized_message, flags=re.IGNORECASE):
-				return True
-		except re.error:
-			pass
-	question = entry.get("question")
-	if isinstance(question, str) and question.lower() == normalized_message:
-		return True
-	return False
+			libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+			fd = libc.inotify_init1(os.O_CLOEXEC)
+			if fd < 0:
+				return None
+			for directory in self._directories:
+				if libc.inotify_add_watch(fd, os.fsencode(directory), self._INOTIFY_MASK) < 0:
+					os.close(fd)
+					return None
+			return fd
+		except (OSError, AttributeError):
+			return None
+
+	def _stamps(self) -> tuple[tuple[str, int, int], ...]:
+		stamps = []
+		for directory in self._directories:
+			try:
+				children = list(directory.iterdir())
+			except OSError:
+				continue
+			for child in children:
+				if not _is_pack_name(child.name):
+					continue
+				try:
+					stat = child.stat()
+				except OSError:
+					continue
+				stamps.append((str(child), stat.st_mtime_ns, stat.st_size))
+		return tuple(sorted(stamps))
+
+	def _poll(self) -> None:
+		previous = self._stamps()
+		while True:
+			time.sleep(self.POLL_INTERVAL)
+			current = self._stamps()
+			if current != previous:
+				previous = current
+				_mark_changed()
+
 
+def _is_pack_name(name: str) -> bool:
+	return name.endswith(".json") and name not in _NON_PACK_FILES
 
-def find_answer(message: str | None) -> str | None:
+
+def _ensure_watcher() -> None:
+	global _watcher
+	if _watcher is None:
+		_watcher = _PackWatcher([_KB_FILE.parent, _PACKS_DIR, _user_packs_dir()])
+		_watcher.start()
+
+
+def find_answer(
+	message: str | None,
+	mode: str = "exact",
+	min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+) -> str | None:
+	"""Answer from the local knowledge base.
+
+	``mode="exact"`` only uses triggers, keywords, patterns and questions.
+	``mode="ranked"`` falls back to BM25 retrieval when nothing matches exactly,
+	returning the best hit if its confidence reaches ``min_confidence``.
+	"""
 	if not message:
 		return None
 	normalized = message.strip().lower()
 	if not normalized:
 		return None
-	for entry in _load_entries():
-		if _matches(entry, normalized):
-			answer = entry.get("answer")
-			if isinstance(answer, str) and answer.strip():
-				return answer.strip()
-	return None
+	compiled = _get_compiled()
+	answer = compiled.find_answer(normalized)
+	if answer is not None or mode != "ranked":
+		return answer
+	# The answers must come from the matcher the index was built with
+	compiled, index = _get_ranked()
+	hit = index.search(normalized)
+	if hit is None or hit[1] < min_confidence:
+		return None
+	return compiled.answers[hit[0]]
 
 
 def knowledge_file_path() -> Path:
@@ -1,7 +1,9 @@
 # main.py
 from scheduler import run_scheduler
 from tray import start_tray
-from voice import hablar
+from voice import (hablar, open_audio_output, preload_recognizer, refresh_microphone_calibration,
+                   start_audio_worker, stop_audio_worker)
+import threading
 import time
 import sys
 import os
@@ -30,6 +32,15 @@ def main():
     print("     • Probar Voz - Escuchar la voz actual")
     print("     • Salir - Cerrar la aplicación")
 
+    # Abrir la salida de audio ya, para que la primera frase no espere al dispositivo
+    open_audio_output()
+    # Medir el ruido del micrófono ahora (en segundo plano) si no hay una calibración reciente
+    refresh_microphone_calibration()
+    # Arrancar el proceso de audio (si está activado) y cargar ya el modelo del
+    # reconocedor local (si hay uno), que tarda unos segundos
+    threading.Thread(target=lambda: (start_audio_worker(), preload_recognizer()),
+                     name="neno-arranque-audio", daemon=True).start()
+
     # Mensaje de bienvenida (voz) después de un breve delay
     time.sleep(2)
     print("\n3. Reproduciendo mensaje de bienvenida...")
@@ -50,6 +61,7 @@ def main():
         print("=" * 60)
         print("🛑 Cerrando Asistente de Escritorio...")
         print("=" * 60)
+        stop_audio_worker()
         print("\n✓ Aplicación cerrada correctamente")
         print("  Todos los recordatorios han sido guardados")
         print("  ¡Hasta pronto!\n")
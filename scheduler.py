@@ -4,13 +4,17 @@ import uuid
 from datetime import datetime, timedelta
 import threading
 import time
-from voice import hablar
+from voice import PRIORITY_REMINDER, hablar, is_speech_cached, prefetch_speech
 from reminder_events import notify_reminders_updated
 from user_storage import get_user_reminders_file
 
 REMINDERS_FILE = get_user_reminders_file()
 CONFIG_DIR = REMINDERS_FILE.parent
 LOCK = threading.Lock()
+# Con cuánta antelación se prepara el audio de los recordatorios próximos.
+PREFETCH_WINDOW_MINUTES = 60
+_prefetch_stats = {"triggered": 0, "prefetched": 0, "rendered": 0, "failed": 0}
+_prefetch_lock = threading.Lock()
 
 def _ensure_file():
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
@@ -100,7 +104,15 @@ def _should_trigger(rem):
 
 def _on_trigger(rem):
     texto = rem.get("text", "Recordatorio")
-    hablar(texto)
+    ready = is_speech_cached(texto)
+    with _prefetch_lock:
+        _prefetch_stats["triggered"] += 1
+        if ready:
+            _prefetch_stats["prefetched"] += 1
+    coverage = get_prefetch_stats()["coverage"]
+    origin = "audio precargado" if ready else "síntesis en directo"
+    print(f"Recordatorio con {origin} (cobertura de precarga: {coverage:.0%})")
+    hablar(texto, priority=PRIORITY_REMINDER)
     # también se puede integrar notificaciones del SO aquí
     # con plyer o notify2 (opcional)
 
@@ -116,7 +128,39 @@ def _reschedule_if_needed(rem):
             return True
     return False
 
-def run_scheduler(poll_interval=30):
+def _upcoming_texts(reminders, window_minutes):
+    """Textos de los recordatorios que sonarán dentro de la ventana (incluye los diarios)."""
+    now = datetime.now()
+    limit = now + timedelta(minutes=window_minutes)
+    texts = []
+    for rem in reminders:
+        # Los diarios ya notificados tienen 'when' apuntando a la siguiente repetición
+        if rem.get("notified", False) and rem.get("repeat") != "daily":
+            continue
+        when_dt = _parse_when(rem.get("when", ""))
+        if when_dt and when_dt <= limit:
+            texto = rem.get("text", "Recordatorio")
+            if texto not in texts:
+                texts.append(texto)
+    return texts
+
+def prefetch_upcoming(window_minutes=PREFETCH_WINDOW_MINUTES):
+    """Sintetiza por adelantado el audio de los recordatorios próximos que aún no esté en caché."""
+    for texto in _upcoming_texts(load_reminders(), window_minutes):
+        if is_speech_cached(texto):
+            continue
+        ok = prefetch_speech(texto)
+        with _prefetch_lock:
+            _prefetch_stats["rendered" if ok else "failed"] += 1
+
+def get_prefetch_stats():
+    """Recordatorios disparados, cuántos tenían el audio listo y audios precargados o fallidos."""
+    with _prefetch_lock:
+        stats = dict(_prefetch_stats)
+    stats["coverage"] = stats["prefetched"] / stats["triggered"] if stats["triggered"] else 1.0
+    return stats
+
+def run_scheduler(poll_interval=30, prefetch_minutes=PREFETCH_WINDOW_MINUTES):
     """Loop principal del scheduler: comprueba recordatorios cada poll_interval segundos."""
     _ensure_file()
     def loop():
@@ -138,6 +182,15 @@ def run_scheduler(poll_interval=30):
                 # no romper el loop por un error puntual
                 print("Error scheduler:", e)
             time.sleep(poll_interval)
+    def prefetch_loop():
+        # Hilo aparte: una síntesis lenta no debe retrasar la comprobación de recordatorios
+        while True:
+            try:
+                prefetch_upcoming(prefetch_minutes)
+            except Exception as e:
+                print("Error precargando recordatorios:", e)
+            time.sleep(poll_interval)
     t = threading.Thread(target=loop, daemon=True)
     t.start()
+    threading.Thread(target=prefetch_loop, daemon=True).start()
     return t
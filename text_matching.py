@@ -0,0 +1,168 @@
+"""Multi-pattern substring matching shared by the knowledge base and command routing."""
+from __future__ import annotations
+
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Iterable
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton: finds every registered pattern in one pass over the text.
+
+    Patterns are registered with :meth:`add`, which returns a stable id. Empty
+    patterns match any text, mirroring ``"" in text``. :meth:`build` freezes the
+    trie into flat ``array`` buffers, which keeps the automaton small and makes
+    pickling it little more than a memory copy.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()) -> None:
+        self._trie: list[dict[str, int]] | None = [{}]
+        self._terminal: list[tuple[int, ...]] = [()]
+        self._ids: dict[str, int] = {}
+        self._always: frozenset[int] = frozenset()
+        self._count = 0
+        # Frozen form: children of node n are _chars/_targets[_starts[n]:_starts[n + 1]],
+        # sorted by code point; pattern ids ending at n are _out_ids[_out_starts[n]:...].
+        self._starts = array("I")
+        self._chars = array("I")
+        self._targets = array("I")
+        self._fail = array("I")
+        self._out_starts = array("I")
+        self._out_ids = array("I")
+        for pattern in patterns:
+            self.add(pattern)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, pattern: str) -> int:
+        """Register a pattern and return its id (duplicates share the same id)."""
+        if self._trie is None:
+            raise RuntimeError("AhoCorasick ya está compilado")
+        existing = self._ids.get(pattern)
+        if existing is not None:
+            return existing
+        pattern_id = self._count
+        self._ids[pattern] = pattern_id
+        self._count += 1
+        if not pattern:
+            self._always = self._always | {pattern_id}
+            return pattern_id
+        trie = self._trie
+        node = 0
+        for char in pattern:
+            nxt = trie[node].get(char)
+            if nxt is None:
+                nxt = len(trie)
+                trie[node][char] = nxt
+                trie.append({})
+                self._terminal.append(())
+            node = nxt
+        self._terminal[node] = self._terminal[node] + (pattern_id,)
+        return pattern_id
+
+    def build(self) -> "AhoCorasick":
+        """Compute failure links and freeze the trie; no patterns can be added afterwards."""
+        trie = self._trie
+        if trie is None:
+            return self
+        out = self._terminal
+        fail = [0] * len(trie)
+        queue: deque[int] = deque(trie[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in trie[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in trie[state]:
+                    state = fail[state]
+                target = trie[state].get(char, 0)
+                fail[child] = target if target != child else 0
+                if out[fail[child]]:
+                    out[child] = out[child] + out[fail[child]]
+
+        starts, chars, targets = array("I"), array("I"), array("I")
+        out_starts, out_ids = array("I"), array("I")
+        for node, children in enumerate(trie):
+            starts.append(len(chars))
+            for char, child in sorted(children.items()):
+                chars.append(ord(char))
+                targets.append(child)
+            out_starts.append(len(out_ids))
+            out_ids.extend(out[node])
+        starts.append(len(chars))
+        out_starts.append(len(out_ids))
+        self._starts, self._chars, self._targets = starts, chars, targets
+        self._fail = array("I", fail)
+        self._out_starts, self._out_ids = out_starts, out_ids
+        self._trie = None
+        self._terminal = []
+        self._ids = {}
+        return self
+
+    def find_ids(self, text: str) -> set[int]:
+        """Return the ids of every pattern contained in ``text``."""
+        if self._trie is not None:
+            self.build()
+        starts, chars, targets, fail = self._starts, self._chars, self._targets, self._fail
+        out_starts, out_ids = self._out_starts, self._out_ids
+        found: set[int] = set(self._always)
+        node = 0
+        for char in text:
+            code = ord(char)
+            while True:
+                lo, hi = starts[node], starts[node + 1]
+                pos = bisect_left(chars, code, lo, hi)
+                if pos < hi and chars[pos] == code:
+                    node = targets[pos]
+                    break
+                if not node:
+                    break
+                node = fail[node]
+            first, last = out_starts[node], out_starts[node + 1]
+            if first != last:
+                found.update(out_ids[first:last])
+        return found
+
+
+_STOPWORDS = frozenset({
+    "a", "al", "algo", "como", "con", "cual", "de", "del", "donde", "el", "en", "es", "esta",
+    "este", "esto", "hay", "la", "las", "le", "lo", "los", "me", "mi", "mis", "muy", "no",
+    "o", "para", "pero", "por", "que", "quien", "se", "si", "sin", "son", "su", "sus", "te",
+    "tu", "un", "una", "unas", "unos", "y", "ya",
+})
+
+# Demonyms in -ol ("española", "españoles") go before the plurals so they share
+# the country's stem ("espan").
+_SUFFIXES = ("amente", "mente", "ciones", "cion", "idades", "idad", "ismos", "ismo",
+             "oles", "olas", "ola", "ol", "es", "s")
+
+
+def fold_accents(text: str) -> str:
+    """Lowercase and strip diacritics: "Información, España" -> "informacion, espana"."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            break
+    if len(word) > 4 and word[-1] in "aeo":
+        word = word[:-1]
+    return word
+
+
+def tokenize_es(text: str) -> list[str]:
+    """Accent-folded, lightly stemmed Spanish tokens without stopwords."""
+    return [
+        _stem(word)
+        for word in _WORD_RE.findall(fold_accents(text))
+        if word not in _STOPWORDS
+    ]
@@ -72,21 +72,21 @@ def _open_voice_config(icon):
 def _add_sample_reminder(icon, item):
     """Añade un recordatorio de prueba para dentro de 1 minuto"""
     from scheduler import add_reminder
-    from voice import hablar
+    from voice import PRIORITY_CONFIRMATION, hablar
     try:
         # Formato español: DD/MM/YYYY HH:MM
         when_dt = (datetime.now() + timedelta(minutes=1)).replace(second=0, microsecond=0)
         when = when_dt.strftime("%d/%m/%Y %H:%M")
         add_reminder("Recordatorio de prueba: ¡Hola!", when)
-        hablar("Recordatorio de prueba añadido para dentro de un minuto.")
+        hablar("Recordatorio de prueba añadido para dentro de un minuto.", priority=PRIORITY_CONFIRMATION)
         print(f"Recordatorio de prueba añadido para: {when}")
     except Exception as e:
         print(f"Error al añadir recordatorio: {e}")
 
 def _test_voice(icon, item):
     """Prueba la voz actual"""
-    from voice import hablar
-    hablar("Hola, esta es una prueba de voz del asistente.")
+    from voice import PRIORITY_CONFIRMATION, hablar
+    hablar("Hola, esta es una prueba de voz del asistente.", priority=PRIORITY_CONFIRMATION)
     print("Probando voz...")
 
 def _open_about(icon):
@@ -104,3 +104,10 @@ def get_user_conversation_file() -> Path:
         except Exception:
             pass
     return path
+
+
+def get_user_cache_dir() -> Path:
+    """Directorio de datos regenerables de este usuario (audio sintetizado, etc.)."""
+    path = get_user_config_dir() / "cache"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
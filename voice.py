@@ -1,21 +1,78 @@
 import speech_recognition as sr
-import pyttsx3
 import threading
 import json
 import os
-import tempfile
+import queue
 import re
+import sys
+import time
+from concurrent.futures import Future
 from typing import Any, Iterable, Optional, Callable
-from gtts import gTTS
-import pygame
-from pydub import AudioSegment
-from user_storage import get_user_settings_file
+from audio import backends, bargein, capture, http_pool, pitch, recognizers, vad, wakeword
+from audio.breaker import CircuitBreaker
+from audio.envelope import ENVELOPE_FRAME_MS, mouth_envelope
+from audio.output import DEFAULT_BUFFER_SAMPLES, AudioOutput, Playback
+from audio.pcm import SAMPLE_WIDTH, SpeechAudio
+from audio.speech_service import PRIORITY_CONFIRMATION, PRIORITY_REMINDER, PRIORITY_REPLY, SpeechService
+from audio.streaming import SpeechStream, split_for_speech
+from audio.tts_cache import TTSCache, speech_cache_key
+from audio.worker import AudioWorker, RemoteRecognizer, WorkerCrashed, WorkerError
+from user_storage import get_user_cache_dir, get_user_settings_file
 
 _tts_lock = threading.Lock()
-_tts_engine = None
-_pygame_initialized = False
 CONFIG_FILE = get_user_settings_file()
 
+DEFAULT_VOICE_ENGINE = "gtts"
+# Reconocimiento de Google (la misma API y clave pública que usa speech_recognition)
+# Motores locales que sustituyen al de red cuando este no responde, por orden de preferencia
+OFFLINE_FALLBACK_ENGINES = ("pyttsx3", "espeak")
+DEFAULT_TTS_CACHE_MB = 64
+# Escucha: cuánto esperar a que se empiece a hablar y duración máxima de una orden
+DEFAULT_LISTEN_TIMEOUT_S = 5.0
+DEFAULT_PHRASE_TIME_LIMIT_S = 10.0
+# Calibración del ruido ambiente, guardada por micrófono en settings['mic_calibration']
+MIC_CALIBRATION_S = 0.5
+MIC_CALIBRATION_MAX_AGE_S = 30 * 60
+# Reconocimiento: "google" (en línea) o un motor local de audio.recognizers ("vosk")
+DEFAULT_RECOGNITION_ENGINE = "google"
+STREAM_READ_BYTES = 4 * capture.BLOCK_FRAMES * capture.SAMPLE_WIDTH  # hasta 128 ms por bloque
+# Detector de voz para el final de frase: "auto" (WebRTC si está instalado), "webrtc" o "energy"
+DEFAULT_VAD_MODE = "auto"
+
+_tts_cache: TTSCache | None = None
+_tts_cache_lock = threading.Lock()
+_speech_service: SpeechService | None = None
+_speech_service_lock = threading.Lock()
+_audio_output: AudioOutput | None = None
+_audio_output_lock = threading.Lock()
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_recognizer: Optional[sr.Recognizer] = None
+_mic_lock = threading.Lock()  # un solo uso del micrófono a la vez (escucha o calibración)
+_calibration_thread: Optional[threading.Thread] = None
+_recognizer_preload_thread: Optional[threading.Thread] = None
+_wake_listener: Optional[wakeword.WakeWordListener] = None
+_wake_lock = threading.Lock()
+_barge_in: Optional[bargein.BargeInMonitor] = None
+_audio_worker: Optional[AudioWorker] = None
+_audio_worker_lock = threading.Lock()
+# Con NENO_TRACE_SPEECH=1 se imprime el tiempo hasta el primer sonido de cada frase.
+_TRACE_SPEECH = bool(os.environ.get("NENO_TRACE_SPEECH"))
+_speech_metrics: dict[str, float | int | None] = {
+    "utterances": 0,
+    "last_time_to_first_sound": None,
+    "total_time_to_first_sound": 0.0,
+}
+_speech_metrics_lock = threading.Lock()
+_listen_metrics: dict[str, float | int | None] = {
+    "utterances": 0,
+    "last_endpoint_ms": None,
+    "total_endpoint_ms": 0.0,
+    "last_speech_ms": None,
+    "last_recognition_ms": None,
+}
+_listen_metrics_lock = threading.Lock()
+
 def _sanitize_for_speech(text: str) -> str:
     """Quita marcas como ` o * para que el TTS no las pronuncie literalmente."""
     if not text:
@@ -44,9 +101,15 @@ def _load_settings():
                 data["mic_device_index"] = null_value()
             if "theme" not in data:
                 data["theme"] = "light"
+            if "kb_retrieval_mode" not in data:
+                data["kb_retrieval_mode"] = "exact"
+            if "tts_cache_max_mb" not in data:
+                data["tts_cache_max_mb"] = DEFAULT_TTS_CACHE_MB
+            if "audio_buffer_samples" not in data:
+                data["audio_buffer_samples"] = DEFAULT_BUFFER_SAMPLES
             return data
     return {
-        "voice_engine": "gtts",
+        "voice_engine": DEFAULT_VOICE_ENGINE,
         "voice_id": None,
         "voice_rate": 150,
         "voice_volume": 1.0,
@@ -54,7 +117,10 @@ def _load_settings():
         "search_engine": "google",
         "mic_device_index": null_value(),
         "theme": "light",
-        "gemini_api_key": ""
+        "gemini_api_key": "",
+        "kb_retrieval_mode": "exact",
+        "tts_cache_max_mb": DEFAULT_TTS_CACHE_MB,
+        "audio_buffer_samples": DEFAULT_BUFFER_SAMPLES
     }
 
 def null_value():
@@ -67,29 +133,26 @@ def _save_settings(settings):
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
         json.dump(settings, f, indent=2, ensure_ascii=False)
 
-def _init_pygame():
-    """Inicializa pygame mixer para reproducir audio."""
-    global _pygame_initialized
-    if not _pygame_initialized:
-        pygame.mixer.init()
-        _pygame_initialized = True
-
-def _init_pyttsx3_engine():
-    """Inicializa el motor de pyttsx3 una sola vez."""
-    global _tts_engine
-    if _tts_engine is None:
-        settings = _load_settings()
-        _tts_engine = pyttsx3.init()
-        _tts_engine.setProperty("rate", settings.get("voice_rate", 150))
-        _tts_engine.setProperty("volume", settings.get("voice_volume", 1.0))
-        
-        if settings.get("voice_id"):
-            _tts_engine.setProperty("voice", settings["voice_id"])
-    return _tts_engine
+def _get_audio_output() -> AudioOutput:
+    """Salida de audio compartida; el tamaño de buffer sale de la configuración."""
+    global _audio_output
+    with _audio_output_lock:
+        if _audio_output is None:
+            try:
+                buffer_samples = int(_load_settings().get("audio_buffer_samples", DEFAULT_BUFFER_SAMPLES))
+            except (TypeError, ValueError, OSError, json.JSONDecodeError):
+                buffer_samples = DEFAULT_BUFFER_SAMPLES
+            _audio_output = AudioOutput(buffer_samples=max(64, buffer_samples))
+        return _audio_output
+
+def open_audio_output() -> bool:
+    """Abre el dispositivo de salida al arrancar para que la primera frase no espere."""
+    return _get_audio_output().open()
 
 def get_available_voices():
     """Retorna una lista de voces disponibles en pyttsx3."""
     try:
+        import pyttsx3
         engine = pyttsx3.init()
         raw_voices: Any = engine.getProperty("voices")
         voices_iter: Iterable[Any]
@@ -113,11 +176,12 @@ def get_available_voices():
 def set_voice_engine(engine_name: str, voice_id: str | None = None, gender: str | None = None):
     """
     Configura el motor de voz a usar.
-    engine_name: 'gtts' o 'pyttsx3'
+    engine_name: 'gtts', 'pyttsx3', 'espeak' o 'piper' (ver ``audio.backends``)
     voice_id: ID de la voz (solo para pyttsx3)
-    gender: 'male' o 'female' (para ambos motores)
+    gender: 'male' o 'female' (para todos los motores)
     """
-    global _tts_engine
+    if engine_name not in backends.backend_names():
+        raise ValueError("Motor de voz inválido")
     settings = _load_settings()
     settings["voice_engine"] = engine_name
     if voice_id:
@@ -128,7 +192,9 @@ def set_voice_engine(engine_name: str, voice_id: str | None = None, gender: str
     
     # Reiniciar motor si es pyttsx3
     if engine_name == "pyttsx3":
-        _tts_engine = None
+        engine = backends.get_backend("pyttsx3")
+        if isinstance(engine, backends.Pyttsx3Backend):
+            engine.reset()
 
 def set_search_engine(engine_name: str):
     """Configura el motor de búsqueda web (google o duckduckgo)."""
@@ -170,194 +236,913 @@ def set_gemini_api_key(api_key: str):
 def get_theme() -> str:
     return _load_settings().get("theme", "light")
 
-def hablar(texto: str):
-    """Habla el texto usando el motor configurado. Thread-safe."""
-    sanitized_text = _sanitize_for_speech(texto) or "..."
+def set_kb_retrieval_mode(mode: str):
+    """Guarda cómo se consultan las respuestas locales ('exact' o 'ranked')."""
+    from knowledge_base import RETRIEVAL_MODES
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError("Modo de búsqueda local inválido")
+    settings = _load_settings()
+    settings["kb_retrieval_mode"] = mode
+    _save_settings(settings)
+
+def get_kb_retrieval_mode() -> str:
+    return _load_settings().get("kb_retrieval_mode", "exact")
+
+def _get_tts_cache() -> TTSCache | None:
+    """Caché de audio sintetizado del usuario (``None`` si se desactivó con tamaño 0)."""
+    global _tts_cache
+    with _tts_cache_lock:
+        max_mb = _load_settings().get("tts_cache_max_mb", DEFAULT_TTS_CACHE_MB)
+        if not max_mb:
+            return None
+        max_bytes = int(float(max_mb) * 1024 * 1024)
+        if _tts_cache is None:
+            _tts_cache = TTSCache(get_user_cache_dir() / "tts", max_bytes)
+        _tts_cache.max_bytes = max_bytes
+        return _tts_cache
+
+def get_tts_cache_stats() -> dict[str, int]:
+    """Aciertos, fallos, expulsiones y tamaño de la caché de voz."""
+    cache = _get_tts_cache()
+    return cache.stats() if cache is not None else {}
+
+def _voice_profile(settings: dict[str, Any]) -> tuple[str, pitch.VoiceProfile]:
+    """Género configurado y su perfil de tono/tempo (``settings['voice_profiles']`` lo ajusta)."""
+    gender = settings.get("voice_gender", "female")
+    return gender, pitch.resolve_profile(gender, settings.get("voice_profiles"))
+
+def _voice_options(settings: dict[str, Any]) -> backends.VoiceOptions:
+    gender, profile = _voice_profile(settings)
+    return backends.VoiceOptions(
+        gender=gender,
+        profile=profile,
+        voice_id=settings.get("voice_id"),
+        rate=settings.get("voice_rate", 150),
+        volume=settings.get("voice_volume", 1.0),
+        model=settings.get("piper_model"),
+    )
+
+def _get_tts_backend(settings: dict[str, Any]) -> backends.TTSBackend:
+    """Motor configurado; si no existe o no está instalado se usa Google TTS."""
+    name = settings.get("voice_engine", DEFAULT_VOICE_ENGINE)
+    try:
+        backend = backends.get_backend(name)
+    except KeyError as e:
+        print(f"{e}; usando {DEFAULT_VOICE_ENGINE}")
+        return backends.get_backend(DEFAULT_VOICE_ENGINE)
+    if not backend.is_available(_voice_options(settings)):
+        print(f"El motor de voz '{name}' no está disponible; usando {DEFAULT_VOICE_ENGINE}")
+        return backends.get_backend(DEFAULT_VOICE_ENGINE)
+    return backend
+
+def _get_worker() -> Optional[AudioWorker]:
+    """Proceso de audio si ``"audio_worker"`` está activado y en marcha (``None``: todo aquí)."""
+    global _audio_worker
+    if not _load_settings().get("audio_worker"):
+        return None
+    with _audio_worker_lock:
+        if _audio_worker is None:
+            _audio_worker = AudioWorker()
+        worker = _audio_worker
+    return worker if worker.start() else None
+
+def start_audio_worker() -> bool:
+    """Arranca ya el proceso de audio (si está activado), para que la primera frase no lo espere."""
+    return _get_worker() is not None
+
+def stop_audio_worker() -> None:
+    worker = _audio_worker
+    if worker is not None:
+        worker.close()
+
+def get_audio_worker_status() -> Optional[dict[str, Any]]:
+    worker = _audio_worker
+    return worker.stats() if worker is not None else None
+
+def _render_speech(backend: backends.TTSBackend, text: str, voice: backends.VoiceOptions) -> SpeechAudio:
+    """Sintetiza con ``backend`` y calcula la envolvente sobre el mismo audio que se reproducirá.
+
+    Con el proceso de audio activado, todo eso se hace allí y aquí solo se copia el PCM.
+    """
+    worker = _get_worker()
+    if worker is not None:
+        try:
+            return SpeechAudio(*worker.render(backend.name, text, voice, http_pool.get_pool().timeout))
+        except WorkerCrashed as e:
+            print(f"Proceso de audio no disponible ({e}); se sintetiza en este proceso.")
+        except WorkerError as e:
+            # Se conserva si fue la red, que es lo único que cuenta para el cortacircuitos
+            error = ConnectionError if e.network else RuntimeError
+            raise error(f"Error sintetizando en el proceso de audio: {e}") from e
+    audio = backend.synthesize(text, voice)
+    return SpeechAudio(audio.pcm, audio.sample_rate, audio.channels,
+                       mouth_envelope(audio.pcm, audio.sample_rate, audio.channels, SAMPLE_WIDTH),
+                       ENVELOPE_FRAME_MS)
+
+def _get_breaker(backend: backends.TTSBackend) -> CircuitBreaker:
+    """Cortacircuitos del motor en línea; su sonda es ``backend.probe``."""
+    with _breakers_lock:
+        breaker = _breakers.get(backend.name)
+        if breaker is None:
+            breaker = _breakers[backend.name] = CircuitBreaker(backend.name, backend.probe)
+        return breaker
 
-    def _speak(text):
-        # Iniciar animación del avatar si está visible
-        avatar = None
+def _configure_http(settings: dict[str, Any]) -> http_pool.HTTPPool:
+    """Pool HTTP compartido con el tiempo de espera de ``settings['http_timeout_s']``."""
+    try:
+        timeout = float(settings.get("http_timeout_s", http_pool.DEFAULT_TIMEOUT_S))
+    except (TypeError, ValueError):
+        timeout = http_pool.DEFAULT_TIMEOUT_S
+    return http_pool.configure(timeout=timeout)
+
+def get_network_stats() -> dict[str, dict[str, float]]:
+    """Latencia de las llamadas de red de la voz (síntesis y reconocimiento), en ms."""
+    return http_pool.get_pool().stats()
+
+def _backend_source(backend: backends.TTSBackend, settings: dict[str, Any]
+                    ) -> tuple[Callable[[str], str], Callable[[str], SpeechAudio]]:
+    voice = _voice_options(settings)
+    params = backend.cache_params(voice)
+
+    def render(chunk: str) -> SpeechAudio:
+        if backend.offline:
+            return _render_speech(backend, chunk, voice)
+        breaker = _get_breaker(backend)
+        try:
+            speech = _render_speech(backend, chunk, voice)
+        except Exception as e:
+            # Un fallo local (ffmpeg, decodificación, tono) no dice nada de la red
+            if backends.is_network_error(e):
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+        return speech
+
+    return (lambda chunk: speech_cache_key(chunk, backend.name, voice.gender, params), render)
+
+def _speech_source(settings: dict[str, Any]) -> tuple[Callable[[str], str], Callable[[str], SpeechAudio]]:
+    """Clave de caché y función de síntesis por fragmento para el motor configurado."""
+    _configure_http(settings)
+    return _backend_source(_get_tts_backend(settings), settings)
+
+def _offline_backend(settings: dict[str, Any], skip: tuple[str, ...] = ()) -> Optional[backends.TTSBackend]:
+    """Primer motor local instalado de ``OFFLINE_FALLBACK_ENGINES`` que no esté en ``skip``."""
+    voice = _voice_options(settings)
+    for name in OFFLINE_FALLBACK_ENGINES:
+        if name in skip:
+            continue
+        backend = backends.get_backend(name)
+        if backend.is_available(voice):
+            return backend
+    return None
+
+def _offline_source(settings: dict[str, Any], skip: tuple[str, ...] = ()) -> Optional[tuple[Callable[[str], str], Callable[[str], SpeechAudio]]]:
+    """Motor local de reserva si el configurado necesita red (``None`` si ya es local).
+
+    Con ``skip`` se descartan motores que ya fallaron y se busca el siguiente
+    aunque el configurado sea local.
+    """
+    if not skip and _get_tts_backend(settings).offline:
+        return None
+    backend = _offline_backend(settings, skip)
+    return _backend_source(backend, settings) if backend is not None else None
+
+def _online_allowed(settings: dict[str, Any]) -> bool:
+    """False si el motor configurado necesita red y su cortacircuitos está abierto."""
+    backend = _get_tts_backend(settings)
+    return backend.offline or _get_breaker(backend).allow()
+
+def get_online_voice_status() -> dict[str, dict[str, object]]:
+    """Estado del cortacircuitos de cada motor en línea usado desde el arranque."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+def _get_speech(text: str, cache_key: Callable[[str], str], render: Callable[[str], SpeechAudio],
+                fallback: Optional[tuple[Callable[[str], str], Callable[[str], SpeechAudio]]] = None,
+                online: Callable[[], bool] = lambda: True) -> SpeechAudio:
+    """Audio desde la caché (funciona sin conexión) o sintetizado al momento.
+
+    Con ``fallback``, si ``online()`` dice que el motor en línea está caído o su
+    síntesis falla, el fragmento se genera con el motor local (y se guarda con la
+    clave de ese motor, no con la del de red).
+    """
+    key = cache_key(text)
+    cache = _get_tts_cache()
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return cached
+    if fallback is not None and not online():
+        return _get_speech(text, *fallback)
+    try:
+        speech = render(text)
+    except Exception as e:
+        if fallback is None:
+            raise
+        print(f"Voz en línea no disponible ({e}); usando voz offline")
+        return _get_speech(text, *fallback)
+    if cache is not None:
+        cache.put(key, speech)
+    return speech
+
+def prefetch_speech(texto: str) -> bool:
+    """Deja en la caché el audio de ``texto`` sin reproducirlo. Devuelve True si queda listo."""
+    sanitized_text = _sanitize_for_speech(texto) or "..."
+    cache = _get_tts_cache()
+    if cache is None:
+        return False
+    settings = _load_settings()
+    if not _online_allowed(settings):
+        # Sin conexión no se espera a que venza la red: al sonar se usará la voz offline
+        return False
+    cache_key, render = _speech_source(settings)
+    # Misma división en frases que usa hablar(), para que cada fragmento acierte en la caché
+    for chunk in split_for_speech(sanitized_text):
+        key = cache_key(chunk)
+        if cache.contains(key):
+            continue
         try:
-            from avatar import get_avatar
-            avatar = get_avatar()
-            # No iniciar aún hasta tener el audio listo
-        except:
-            pass
-        
-        with _tts_lock:
+            speech = render(chunk)
+        except Exception as e:
+            print(f"No se pudo precargar la voz: {e}")
+            return False
+        if not cache.put(key, speech):
+            return False
+    return True
+
+def is_speech_cached(texto: str) -> bool:
+    """Indica si ``hablar(texto)`` podrá reproducirse desde la caché."""
+    cache = _get_tts_cache()
+    if cache is None:
+        return False
+    cache_key, _ = _speech_source(_load_settings())
+    chunks = split_for_speech(_sanitize_for_speech(texto) or "...")
+    return all(cache.contains(cache_key(chunk)) for chunk in chunks)
+
+def get_speech_metrics() -> dict[str, float | int | None]:
+    """Tiempo hasta el primer sonido (s) de la última frase y la media desde el arranque."""
+    with _speech_metrics_lock:
+        metrics: dict[str, float | int | None] = dict(_speech_metrics)
+    count = int(metrics["utterances"] or 0)
+    metrics["avg_time_to_first_sound"] = (float(metrics.pop("total_time_to_first_sound") or 0.0) / count
+                                          if count else None)
+    return metrics
+
+def _record_first_sound(stream: SpeechStream) -> None:
+    stream.mark_first_sound()
+    ttfs = stream.time_to_first_sound or 0.0
+    with _speech_metrics_lock:
+        _speech_metrics["utterances"] = int(_speech_metrics["utterances"] or 0) + 1
+        _speech_metrics["last_time_to_first_sound"] = ttfs
+        _speech_metrics["total_time_to_first_sound"] = float(_speech_metrics["total_time_to_first_sound"] or 0.0) + ttfs
+    if _TRACE_SPEECH:
+        print(f"Primer sonido a los {ttfs * 1000:.0f} ms ({len(stream.chunks)} fragmentos)")
+
+def _feed_avatar(avatar, speech: SpeechAudio, playback: Playback, output: AudioOutput) -> None:
+    """Añade a la animación de boca la envolvente del fragmento que acaba de encolarse.
+
+    La animación se sitúa en ``playback.start_time`` y avanza con el reloj de la
+    salida, así que la boca no se adelanta ni se retrasa respecto al sonido.
+    """
+    if avatar is None or not avatar.is_visible():
+        return
+    try:
+        if speech.envelope:
+            avatar.feed_speaking_envelope(speech.envelope, frame_interval_ms=speech.frame_interval_ms,
+                                          start_time=playback.start_time, clock=output.clock)
+        else:
+            # Fallback usando duración
+            avatar.start_speaking(duration=speech.duration)
+    except Exception as e:
+        print(f"Error iniciando animación avatar: {e}")
+
+def _play_stream(stream: SpeechStream, avatar, stop_event: threading.Event) -> str:
+    """Reproduce los fragmentos en orden, encolando cada uno en cuanto está sintetizado.
+
+    La salida los encadena sin huecos y avisa al terminar cada uno, así que aquí
+    solo se espera al último. Devuelve el texto que no llegó a sintetizarse si
+    la síntesis falló a mitad (vacío si no).
+    """
+    output = _get_audio_output()
+    last: Playback | None = None
+    leftover = ""
+    try:
+        while not stop_event.is_set():
             try:
-                settings = _load_settings()
-                engine_name = settings.get("voice_engine", "gtts")
-                
-                speech_text = sanitized_text
-
-                if engine_name == "gtts":
-                    # Usar Google TTS (más natural)
-                    gender = settings.get("voice_gender", "female")
-                    
-                    # Generar audio con gTTS (siempre femenina base)
-                    tts = gTTS(text=speech_text or text, lang='es', slow=False, tld='com')
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                        temp_file = fp.name
-                        tts.save(temp_file)
-                    
-                    # Si es voz masculina, modificar el pitch
-                    if gender == "male":
-                        # Cargar audio con pydub
-                        sound = AudioSegment.from_mp3(temp_file)
-                        
-                        # Reducir pitch para voz más grave (masculina)
-                        octaves = -0.25  # Bajar aproximadamente 3 semitonos
-                        new_sample_rate = int(sound.frame_rate * (2.0 ** octaves))
-                        sound_pitched = sound._spawn(sound.raw_data, overrides={'frame_rate': new_sample_rate})
-                        sound_pitched = sound_pitched.set_frame_rate(sound.frame_rate)
-                        
-                        # Acelerar para mantener velocidad natural
-                        sound_pitched = sound_pitched.speedup(playback_speed=1.2)
-                        
-                        # Guardar audio modificado
-                        os.unlink(temp_file)
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                            temp_file = fp.name
-                            sound_pitched.export(temp_file, format='mp3')
-                    
-                    # Cargar audio final para análisis de envolvente
-                    try:
-                        final_sound = AudioSegment.from_mp3(temp_file)
-                    except Exception as e:
-                        final_sound = None
-                        print(f"No se pudo cargar audio para envolvente: {e}")
-
-                    # Construir envolvente de amplitud -> estados de boca
-                    envelope_states = []
-                    frame_interval_ms = 50  # más fluido (~20 fps)
-                    if final_sound:
-                        max_rms = 1
-                        rms_values = []
-                        for ms in range(0, len(final_sound), frame_interval_ms):
-                            chunk = final_sound[ms:ms+frame_interval_ms]
-                            rms = chunk.rms or 0
-                            rms_values.append(rms)
-                            if rms > max_rms:
-                                max_rms = rms
-                        # Suavizado: media móvil ventana 3
-                        smoothed = []
-                        for i in range(len(rms_values)):
-                            vals = [rms_values[i]]
-                            if i > 0:
-                                vals.append(rms_values[i-1])
-                            if i < len(rms_values)-1:
-                                vals.append(rms_values[i+1])
-                            smoothed.append(sum(vals)/len(vals))
-                        # Reajustar max con suavizado
-                        max_rms = max(smoothed) if smoothed else max_rms
-                        # Umbrales para 6 estados (0-5)
-                        t1 = max_rms * 0.10
-                        t2 = max_rms * 0.22
-                        t3 = max_rms * 0.40
-                        t4 = max_rms * 0.60
-                        t5 = max_rms * 0.80
-                        for v in smoothed:
-                            if v < t1:
-                                envelope_states.append(0)
-                            elif v < t2:
-                                envelope_states.append(1)
-                            elif v < t3:
-                                envelope_states.append(2)
-                            elif v < t4:
-                                envelope_states.append(3)
-                            elif v < t5:
-                                envelope_states.append(4)
-                            else:
-                                envelope_states.append(5)
-                    
-                    # Iniciar animación sincronizada justo antes de reproducir
-                    if avatar is not None and avatar.is_visible():
-                        try:
-                            if envelope_states:
-                                avatar.start_speaking_envelope(envelope_states, frame_interval_ms=frame_interval_ms)
-                            else:
-                                # Fallback usando duración
-                                dur = final_sound.duration_seconds if final_sound else None
-                                avatar.start_speaking(duration=dur)
-                        except Exception as e:
-                            print(f"Error iniciando animación avatar: {e}")
-
-                    # Reproducir con pygame (después de disparar animación)
-                    _init_pygame()
-                    pygame.mixer.music.load(temp_file)
-                    pygame.mixer.music.play()
-                    while pygame.mixer.music.get_busy():
-                        pygame.time.Clock().tick(20)
-                    
-                    # Limpiar archivo temporal
-                    try:
-                        os.unlink(temp_file)
-                    except:
-                        pass
+                item = stream.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            if item.error is not None:
+                print(f"Error sintetizando la voz: {item.error}")
+                leftover = stream.remaining_text(item.index)
+                break
+            speech: SpeechAudio = item.value
+            if stop_event.is_set():
+                break
+            last = output.play(speech)
+            stream.mark_playing(item.index, last.done)
+            if stream.first_sound is None:
+                _record_first_sound(stream)
+            _feed_avatar(avatar, speech, last, output)
+        if last is not None:
+            # stop_speaking() corta la salida y eso también despierta esta espera
+            last.wait()
+    finally:
+        stream.close()
+        if stop_event.is_set():
+            output.stop()
+    return leftover
+
+def _speak_now(speech_text: str, stop_event: threading.Event) -> None:
+    """Dice una frase ya saneada y espera a que termine (se llama desde el hilo de voz)."""
+    # Iniciar animación del avatar si está visible
+    avatar = None
+    try:
+        from avatar import get_avatar
+        avatar = get_avatar()
+        # No iniciar aún hasta tener el audio listo
+    except:
+        pass
+
+    with _tts_lock:
+        try:
+            settings = _load_settings()
+            engine_name = settings.get("voice_engine", DEFAULT_VOICE_ENGINE)
+
+            # Cualquier motor (Google TTS, pyttsx3, espeak-ng, Piper) genera un buffer de audio
+            cache_key, render = _speech_source(settings)
+            # Si el motor necesita red y no responde, cada fragmento sale de un motor local
+            configured = _get_tts_backend(settings)
+            fallback = _offline_source(settings)
+            # Frase a frase: la siguiente se sintetiza mientras suena la actual
+            stream = SpeechStream(split_for_speech(speech_text),
+                                  lambda chunk: _get_speech(chunk, cache_key, render, fallback,
+                                                            lambda: _online_allowed(settings)))
+            leftover = _play_stream(stream, avatar, stop_event)
+            if leftover and not stop_event.is_set():
+                # Lo que ni el motor ni su reserva pudieron sintetizar lo intenta el
+                # siguiente motor local, por la misma salida (y el mismo barge-in)
+                tried = [configured.name]
+                if fallback is not None:
+                    used = _offline_backend(settings)
+                    if used is not None:
+                        tried.append(used.name)
+                source = _offline_source(settings, tuple(tried))
+                if source is None:
+                    print("No hay voz offline disponible para el resto de la frase")
                 else:
-                    # Usar pyttsx3 (offline)
-                    engine = _init_pyttsx3_engine()
-                    engine.say(speech_text or text)
-                    engine.runAndWait()
-                    
-            except Exception as e:
-                print(f"Error al hablar: {e}")
-            finally:
-                # Detener animación del avatar
-                if avatar is not None and avatar.is_speaking:
-                    try:
-                        avatar.stop_speaking()
-                    except Exception:
-                        pass
-
-    # Ejecutar en hilo para no bloquear el scheduler
-    t = threading.Thread(target=_speak, args=(texto,), daemon=True)
-    t.start()
-
-def escuchar() -> str:
-    """Escucha por micrófono y devuelve el texto reconocido."""
-    recognizer = sr.Recognizer()
-    device_index = get_microphone_device()
+                    if engine_name == "gtts":
+                        print("gTTS no disponible, usando voz offline")
+                    stream = SpeechStream(split_for_speech(leftover),
+                                          lambda chunk: _get_speech(chunk, *source))
+                    _play_stream(stream, avatar, stop_event)
+
+        except Exception as e:
+            print(f"Error al hablar: {e}")
+        finally:
+            # Detener animación del avatar
+            if avatar is not None and avatar.is_speaking:
+                try:
+                    avatar.stop_speaking()
+                except Exception:
+                    pass
+
+def _interrupt_playback() -> None:
+    """Corta en el dispositivo la frase que está sonando."""
+    # Detener la reproducción del buffer
+    output = _audio_output
+    if output is not None:
+        output.stop()
+
+    # Detener pyttsx3 u otro motor que esté hablando directamente
+    for backend in backends.loaded_backends():
+        backend.stop()
+    if _audio_worker is not None:
+        _audio_worker.stop_backends()
+
+def _get_speech_service() -> SpeechService:
+    global _speech_service
+    with _speech_service_lock:
+        if _speech_service is None:
+            _speech_service = SpeechService(_speak_now, _interrupt_playback)
+        return _speech_service
+
+def hablar(texto: str, priority: int = PRIORITY_REPLY) -> Future[bool]:
+    """Encola el texto para decirlo con el motor configurado. Thread-safe.
+
+    Un único hilo habla por orden de prioridad (``PRIORITY_REMINDER`` antes que
+    ``PRIORITY_REPLY`` y esta antes que ``PRIORITY_CONFIRMATION``). El futuro se
+    resuelve a True al terminar de sonar, a False si se cortó, o queda cancelado
+    si no llegó a sonar.
+    """
+    sanitized_text = _sanitize_for_speech(texto) or "..."
+    return _get_speech_service().submit(sanitized_text, priority)
+
+def cancel_speech(priority: int | None = None) -> int:
+    """Descarta las frases pendientes (de esa prioridad, o todas) y corta la que suena."""
+    return _get_speech_service().cancel(priority)
+
+def get_speech_queue_stats() -> dict[str, int]:
+    """Frases dichas, cortadas, descartadas por repetidas o canceladas, y pendientes."""
+    return _get_speech_service().stats()
+
+def _recognize_google(recognizer, audio, language: str = "es-ES") -> str:
+    """``recognize_google`` con su petición por el pool HTTP compartido (conexión persistente y métricas).
+
+    La petición la monta ``speech_recognition``; solo se cambia su ``urlopen``.
+    Lanza ``sr.UnknownValueError`` y ``sr.RequestError`` como la librería.
+    """
+    pool = _configure_http(_load_settings())
+    module = sys.modules.get(getattr(type(recognizer).recognize_google, "__module__", ""))
+    if module is not None:
+        http_pool.route_urlopen(module, "recognize", pool)
+    return recognizer.recognize_google(audio, language=language)
+
+def _get_recognizer() -> sr.Recognizer:
+    """Reconocedor único: conserva el umbral de energía entre una escucha y la siguiente."""
+    global _recognizer
+    if _recognizer is None:
+        _recognizer = sr.Recognizer()
+        _recognizer.dynamic_energy_threshold = True
+    return _recognizer
+
+def _subscribe_capture(device_index: int | None, name: str,
+                       position: Optional[int] = None) -> capture.CaptureReader:
+    """Lector de la captura compartida del micrófono; si el configurado falla, el predeterminado.
+
+    ``position`` hace que empiece en audio ya capturado (ver ``CaptureService.subscribe``).
+    """
     try:
-        source = sr.Microphone(device_index=device_index) if device_index is not None else sr.Microphone()
+        return capture.get_capture_service(device_index).subscribe(name, position)
+    except RuntimeError as e:
+        if device_index is None:
+            raise
+        print(f"Fallo usando micrófono configurado ({device_index}). Reintentando automático: {e}")
+        return capture.get_capture_service(None).subscribe(name)
+
+class _CaptureStream:
+    """Lo que ``speech_recognition`` espera de ``source.stream``: ``read(frames) -> bytes``."""
+
+    def __init__(self, reader: capture.CaptureReader):
+        self._reader = reader
+
+    def read(self, frames: int) -> bytes:
+        # Vacío si el micrófono deja de dar audio: listen() lo trata como fin del stream
+        return self._reader.read_exact(frames * capture.SAMPLE_WIDTH * capture.CAPTURE_CHANNELS, timeout=1.0)
+
+
+class _SharedMicrophone(sr.AudioSource):
+    """Fuente de ``speech_recognition`` suscrita a la captura compartida del micrófono."""
+
+    def __init__(self, device_index: int | None):
+        self.device_index = device_index
+        self.service = capture.get_capture_service(device_index)
+        self.SAMPLE_RATE = self.service.rate
+        self.SAMPLE_WIDTH = capture.SAMPLE_WIDTH
+        self.CHUNK = self.service.block_frames
+        self.stream: Optional[_CaptureStream] = None
+        self._reader: Optional[capture.CaptureReader] = None
+
+    def __enter__(self):
+        self._reader = _subscribe_capture(self.device_index, "reconocedor")
+        self.service = self._reader.service
+        self.stream = _CaptureStream(self._reader)
+        return self
+
+    def __exit__(self, *exc):
+        if self._reader is not None:
+            self._reader.close()
+        self._reader = None
+        self.stream = None
+
+
+def _open_microphone(device_index: int | None):
+    if capture.available():
+        return _SharedMicrophone(device_index)
+    try:
+        return sr.Microphone(device_index=device_index) if device_index is not None else sr.Microphone()
     except Exception as e:
         print(f"Fallo usando micrófono configurado ({device_index}). Reintentando automático: {e}")
-        source = sr.Microphone()
-    with source as source:
+        return sr.Microphone()
+
+def _mic_key(device_index: int | None) -> str:
+    return "default" if device_index is None else str(device_index)
+
+def _stored_calibration(settings: dict[str, Any], device_index: int | None) -> Optional[dict[str, float]]:
+    calibration = (settings.get("mic_calibration") or {}).get(_mic_key(device_index))
+    if isinstance(calibration, dict) and calibration.get("energy_threshold"):
+        return calibration
+    return None
+
+def _store_calibration(device_index: int | None, energy_threshold: float) -> None:
+    settings = _load_settings()
+    calibrations = settings.get("mic_calibration") or {}
+    calibrations[_mic_key(device_index)] = {"energy_threshold": round(float(energy_threshold), 1),
+                                            "updated": time.time()}
+    settings["mic_calibration"] = calibrations
+    _save_settings(settings)
+
+def calibrate_microphone(duration: float = MIC_CALIBRATION_S) -> float | None:
+    """Mide el ruido ambiente del micrófono configurado y guarda su umbral de energía.
+
+    Devuelve el umbral, o ``None`` si el micrófono estaba ocupado o falló.
+    """
+    if not _mic_lock.acquire(blocking=False):
+        return None
+    try:
+        device_index = get_microphone_device()
+        recognizer = _get_recognizer()
+        with _open_microphone(device_index) as source:
+            recognizer.adjust_for_ambient_noise(source, duration=duration)
+        threshold = recognizer.energy_threshold
+    except Exception as e:
+        print(f"No se pudo calibrar el micrófono: {e}")
+        return None
+    finally:
+        _mic_lock.release()
+    _store_calibration(device_index, threshold)
+    return threshold
+
+def refresh_microphone_calibration(force: bool = False) -> bool:
+    """Recalibra en segundo plano si la calibración guardada falta o ha caducado.
+
+    Devuelve True si se lanzó la recalibración.
+    """
+    global _calibration_thread
+    if not force:
+        calibration = _stored_calibration(_load_settings(), get_microphone_device())
+        if calibration and time.time() - calibration.get("updated", 0) < MIC_CALIBRATION_MAX_AGE_S:
+            return False
+    if _calibration_thread is not None and _calibration_thread.is_alive():
+        return False
+    _calibration_thread = threading.Thread(target=calibrate_microphone, name="neno-calibracion", daemon=True)
+    _calibration_thread.start()
+    return True
+
+def _recognizer_options(settings: dict[str, Any]) -> recognizers.RecognizerOptions:
+    return recognizers.RecognizerOptions(language="es", model=settings.get("vosk_model"))
+
+def _speech_recognizer(name: str) -> recognizers.SpeechRecognizer:
+    """Motor local por nombre; con el proceso de audio activado, su versión remota."""
+    local = recognizers.get_recognizer(name)
+    worker = _get_worker()
+    return worker.recognizer(name) if worker is not None else local
+
+def _get_local_recognizer(settings: dict[str, Any]) -> Optional[recognizers.SpeechRecognizer]:
+    """Motor local elegido en ``recognition_engine`` si está instalado y tiene modelo."""
+    name = settings.get("recognition_engine", DEFAULT_RECOGNITION_ENGINE)
+    if name == "google":
+        return None
+    try:
+        local = _speech_recognizer(name)
+    except KeyError:
+        print(f"Motor de reconocimiento desconocido: {name}. Se usa el reconocimiento de Google.")
+        return None
+    return local if local.is_available(_recognizer_options(settings)) else None
+
+def set_recognition_engine(engine_name: str) -> None:
+    if engine_name != "google" and engine_name not in recognizers.recognizer_names():
+        raise ValueError(f"Motor de reconocimiento desconocido: {engine_name}")
+    settings = _load_settings()
+    settings["recognition_engine"] = engine_name
+    _save_settings(settings)
+    preload_recognizer()
+
+def get_recognition_engine() -> str:
+    return _load_settings().get("recognition_engine", DEFAULT_RECOGNITION_ENGINE)
+
+def preload_recognizer() -> bool:
+    """Carga en segundo plano el modelo del reconocedor local, si hay uno configurado.
+
+    Devuelve True si se lanzó la carga.
+    """
+    global _recognizer_preload_thread
+    settings = _load_settings()
+    local = _get_local_recognizer(settings)
+    if local is None:
+        return False
+    if _recognizer_preload_thread is not None and _recognizer_preload_thread.is_alive():
+        return False
+
+    def load():
+        try:
+            local.load(_recognizer_options(settings))
+        except Exception as e:
+            print(f"No se pudo cargar el modelo de reconocimiento '{local.name}': {e}")
+
+    _recognizer_preload_thread = threading.Thread(target=load, name="neno-modelo-voz", daemon=True)
+    _recognizer_preload_thread.start()
+    return True
+
+def _make_endpointer(settings: dict[str, Any], sample_rate: int,
+                     energy_threshold: Optional[float] = None) -> vad.Endpointer:
+    """Detector de final de frase según ``vad_mode`` y ``vad_hangover_ms`` de la configuración."""
+    threshold = energy_threshold / 32768.0 if energy_threshold else None
+    detector = vad.make_vad(settings.get("vad_mode", DEFAULT_VAD_MODE), sample_rate, threshold)
+    hangover_ms = int(settings.get("vad_hangover_ms", vad.DEFAULT_HANGOVER_MS))
+    return vad.Endpointer(detector, sample_rate, hangover_ms=hangover_ms)
+
+def _record_listen(endpointer: vad.Endpointer, recognition_s: float) -> None:
+    if not endpointer.ended or endpointer.endpoint_latency_ms is None:
+        return
+    with _listen_metrics_lock:
+        _listen_metrics["utterances"] += 1
+        _listen_metrics["last_endpoint_ms"] = endpointer.endpoint_latency_ms
+        _listen_metrics["total_endpoint_ms"] += endpointer.endpoint_latency_ms
+        _listen_metrics["last_speech_ms"] = endpointer.speech_ms
+        _listen_metrics["last_recognition_ms"] = recognition_s * 1000
+    if _TRACE_SPEECH:
+        print(f"[voz] fin de frase detectado {endpointer.endpoint_latency_ms:.0f} ms tras la última palabra;"
+              f" reconocimiento {recognition_s * 1000:.0f} ms")
+
+def get_listen_metrics() -> dict[str, float | int | None]:
+    """Latencia de la detección del final de frase (ms, última y media) y del reconocimiento."""
+    with _listen_metrics_lock:
+        metrics: dict[str, float | int | None] = dict(_listen_metrics)
+    count = int(metrics["utterances"] or 0)
+    metrics["avg_endpoint_ms"] = float(metrics.pop("total_endpoint_ms") or 0.0) / count if count else None
+    return metrics
+
+def _listen_streaming(local: recognizers.SpeechRecognizer, settings: dict[str, Any],
+                      on_partial: Optional[Callable[[str], None]], start_position: Optional[int] = None) -> str:
+    """Escucha pasando el audio al motor local bloque a bloque mientras se habla.
+
+    Termina cuando el detector de voz o el propio motor dan la frase por acabada,
+    cuando nadie habla en ``listen_timeout_s`` o al llegar a ``phrase_time_limit_s``.
+    """
+    timeout = settings.get("listen_timeout_s", DEFAULT_LISTEN_TIMEOUT_S)
+    phrase_time_limit = settings.get("phrase_time_limit_s", DEFAULT_PHRASE_TIME_LIMIT_S)
+    device_index = settings.get("mic_device_index")
+    calibration = _stored_calibration(settings, device_index)
+    shown = ""
+    with _mic_lock:
+        with _subscribe_capture(device_index, "reconocedor", start_position) as reader:
+            session = local.start(_recognizer_options(settings), reader.service.rate)
+            endpointer = _make_endpointer(settings, reader.service.rate,
+                                          calibration["energy_threshold"] if calibration else None)
+            print("Escuchando... habla ahora.")
+            started = time.monotonic()
+            speech_started: float | None = None
+            while True:
+                chunk = reader.read(STREAM_READ_BYTES, timeout=0.5)
+                now = time.monotonic()
+                if chunk:
+                    finished = session.accept(bytes(chunk))
+                    finished = endpointer.feed(chunk) or finished
+                    partial = session.partial()
+                    if (partial or endpointer.started) and speech_started is None:
+                        speech_started = now
+                    if on_partial is not None and partial != shown:
+                        shown = partial
+                        on_partial(partial)
+                    if finished:
+                        break
+                elif not reader.service.running:
+                    break
+                if speech_started is None and now - started > timeout:
+                    print("No se oyó nada.")
+                    break
+                if speech_started is not None and now - speech_started > phrase_time_limit:
+                    break
+    start = time.monotonic()
+    texto = session.result().strip()
+    _record_listen(endpointer, time.monotonic() - start)
+    return texto
+
+def _listen_endpointed(settings: dict[str, Any], device_index: int | None, energy_threshold: Optional[float],
+                       start_position: Optional[int] = None) -> tuple[Optional[sr.AudioData], vad.Endpointer]:
+    """Graba una frase de la captura compartida cortándola donde acaba la voz.
+
+    Devuelve el audio sin el silencio inicial ni el final (``None`` si nadie habló
+    en ``listen_timeout_s``) y el detector, que guarda la latencia y el umbral.
+    """
+    timeout = settings.get("listen_timeout_s", DEFAULT_LISTEN_TIMEOUT_S)
+    phrase_time_limit = settings.get("phrase_time_limit_s", DEFAULT_PHRASE_TIME_LIMIT_S)
+    with _subscribe_capture(device_index, "reconocedor", start_position) as reader:
+        rate = reader.service.rate
+        endpointer = _make_endpointer(settings, rate, energy_threshold)
         print("Escuchando... habla ahora.")
-        recognizer.adjust_for_ambient_noise(source, duration=1)
-        audio = recognizer.listen(source)
+        started = time.monotonic()
+        speech_started: float | None = None
+        while not endpointer.ended:
+            chunk = reader.read(STREAM_READ_BYTES, timeout=0.5)
+            now = time.monotonic()
+            if chunk:
+                endpointer.feed(chunk)
+                if endpointer.started and speech_started is None:
+                    speech_started = now
+            elif not reader.service.running:
+                break
+            if speech_started is None and now - started > timeout:
+                print("No se oyó nada.")
+                return None, endpointer
+            if speech_started is not None and now - speech_started > phrase_time_limit:
+                break
+    pcm = endpointer.audio()
+    return (sr.AudioData(pcm, rate, capture.SAMPLE_WIDTH) if pcm else None), endpointer
 
+def _listen_with_recognizer(recognizer: sr.Recognizer, settings: dict[str, Any], device_index: int | None,
+                            calibration: Optional[dict[str, float]]) -> Optional[sr.AudioData]:
+    """Escucha con ``recognizer.listen`` (cuando no hay captura compartida)."""
+    timeout = settings.get("listen_timeout_s", DEFAULT_LISTEN_TIMEOUT_S)
+    phrase_time_limit = settings.get("phrase_time_limit_s", DEFAULT_PHRASE_TIME_LIMIT_S)
+    # El silencio que cierra la frase: el mismo que usa el detector de voz
+    hangover_s = int(settings.get("vad_hangover_ms", vad.DEFAULT_HANGOVER_MS)) / 1000
+    recognizer.non_speaking_duration = min(recognizer.non_speaking_duration, hangover_s)
+    recognizer.pause_threshold = hangover_s
+    with _open_microphone(device_index) as source:
+        if calibration is not None:
+            recognizer.energy_threshold = float(calibration["energy_threshold"])
+        else:
+            recognizer.adjust_for_ambient_noise(source, duration=MIC_CALIBRATION_S)
+        print("Escuchando... habla ahora.")
+        try:
+            return recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        except sr.WaitTimeoutError:
+            print("No se oyó nada.")
+    return None
+
+def _recognize_local(local: recognizers.SpeechRecognizer, settings: dict[str, Any], audio) -> str:
+    """Transcribe con el motor local una frase ya grabada (si Google no responde)."""
+    rate = capture.CAPTURE_RATE
+    pcm = audio.get_raw_data(convert_rate=rate, convert_width=2)
+    if isinstance(local, RemoteRecognizer):
+        return local.recognize(_recognizer_options(settings), rate, pcm).strip()
+    session = local.start(_recognizer_options(settings), rate)
+    session.accept(pcm)
+    return session.result().strip()
+
+def escuchar(on_partial: Optional[Callable[[str], None]] = None, start_position: Optional[int] = None) -> str:
+    """Escucha por micrófono y devuelve el texto reconocido.
+
+    Un detector de voz sobre la captura compartida corta la frase tras
+    ``vad_hangover_ms`` de silencio y quita el silencio de los extremos antes de
+    reconocerla. Con un motor local (``recognition_engine``) el audio se reconoce
+    mientras se habla y ``on_partial`` recibe el texto provisional según va
+    cambiando. El umbral de ruido sale de la calibración guardada para el
+    micrófono. ``listen_timeout_s`` y ``phrase_time_limit_s`` en la configuración
+    limitan la espera y la duración de la orden. ``start_position`` (de la palabra
+    de activación) hace que la orden empiece en audio ya capturado.
+    """
+    settings = _load_settings()
+    local = _get_local_recognizer(settings)
+    if local is not None and capture.available():
+        try:
+            texto = _listen_streaming(local, settings, on_partial, start_position)
+        except Exception as e:
+            print(f"Error en el reconocimiento local ({local.name}): {e}. Se usa Google.")
+        else:
+            if texto:
+                print(f"Dijiste: {texto}")
+            return texto
+
+    device_index = settings.get("mic_device_index")
+    calibration = _stored_calibration(settings, device_index)
+    previous = float(calibration["energy_threshold"]) if calibration is not None else 0.0
+    recognizer = _get_recognizer()
+    endpointer: Optional[vad.Endpointer] = None
+    with _mic_lock:
+        if capture.available():
+            try:
+                audio, endpointer = _listen_endpointed(settings, device_index, previous or None, start_position)
+            except RuntimeError as e:
+                print(f"Error abriendo el micrófono: {e}")
+                return ""
+            detector = endpointer.vad
+            threshold = detector.threshold * 32768.0 if isinstance(detector, vad.EnergyVAD) else previous
+        else:
+            audio = _listen_with_recognizer(recognizer, settings, device_index, calibration)
+            threshold = recognizer.energy_threshold
+
+    # El umbral se ha ido ajustando al ruido mientras escuchaba: guardarlo si cambió
+    if threshold and abs(threshold - previous) > 0.05 * max(previous, 1.0):
+        _store_calibration(device_index, threshold)
+    else:
+        refresh_microphone_calibration()
+    if audio is None:
+        return ""
+
+    start = time.monotonic()
     try:
-        recognize_google: Optional[Callable[..., str]] = getattr(recognizer, "recognize_google", None)
-        if not callable(recognize_google):
-            return ""
-        texto = recognize_google(audio, language="es-ES")
-        print(f"Dijiste: {texto}")
-        return texto
+        texto = _recognize_google(recognizer, audio, language="es-ES")
     except sr.UnknownValueError:
         return ""
-    except sr.RequestError:
-        return ""
+    except sr.RequestError as e:
+        if local is None:
+            return ""
+        # Sin red: la frase ya grabada se transcribe con el motor local
+        print(f"Reconocimiento de Google no disponible ({e}). Se usa {local.name}.")
+        try:
+            texto = _recognize_local(local, settings, audio)
+        except Exception as e:
+            print(f"Error en el reconocimiento local ({local.name}): {e}")
+            return ""
+    if endpointer is not None:
+        _record_listen(endpointer, time.monotonic() - start)
+    if texto:
+        print(f"Dijiste: {texto}")
+    return texto
 
+def _is_speaking() -> bool:
+    output = _audio_output
+    return output is not None and output.current() is not None
 
-def stop_speaking():
-    """Detiene cualquier reproducción de voz en curso."""
-    # Detener reproducción gTTS/pygame
-    try:
-        if pygame.mixer.get_init():
-            pygame.mixer.music.stop()
-    except Exception:
-        pass
+def _wake_word_blocked() -> bool:
+    """La palabra de activación no escucha mientras se oye una orden o suena la voz."""
+    return _mic_lock.locked() or _is_speaking()
 
-    # Detener pyttsx3 si está activo
-    engine = _tts_engine
-    if engine is not None:
-        try:
-            engine.stop()
-        except Exception:
-            pass
+def start_wake_word(on_wake: Callable[[int], None]) -> bool:
+    """Empieza a escuchar "Neno" si ``"wake_word"`` está activado en la configuración.
+
+    ``on_wake`` recibe la posición de la captura donde empezó la frase; pasada a
+    ``escuchar(start_position=...)`` la orden se reconoce entera, "Neno" incluido.
+    Necesita Vosk y ``"vosk_model"``, aunque las órdenes se reconozcan con Google.
+    """
+    global _wake_listener
+    settings = _load_settings()
+    if not settings.get("wake_word"):
+        return False
+    options = _recognizer_options(settings)
+    local = _speech_recognizer("vosk")
+    if not capture.available() or not local.is_available(options):
+        print("La palabra de activación necesita pyaudio, Vosk y un modelo en 'vosk_model'.")
+        return False
+    device_index = settings.get("mic_device_index")
+    calibration = _stored_calibration(settings, device_index)
+    with _wake_lock:
+        if _wake_listener is not None and _wake_listener.running:
+            return True
+        service = capture.get_capture_service(device_index)
+        grammar = [wakeword.WAKE_WORD, "[unk]"]
+        _wake_listener = wakeword.WakeWordListener(
+            service, lambda: local.start(options, service.rate, grammar=grammar), on_wake,
+            is_blocked=_wake_word_blocked,
+            energy_threshold=calibration["energy_threshold"] / 32768.0 if calibration else None,
+        )
+        _wake_listener.start()
+    print("Palabra de activación activa: di 'Neno, ...' para dar una orden.")
+    return True
+
+def stop_wake_word() -> None:
+    global _wake_listener
+    with _wake_lock:
+        listener, _wake_listener = _wake_listener, None
+    if listener is not None:
+        listener.stop()
+
+def get_wake_word_stats() -> Optional[dict[str, float]]:
+    """Detecciones, tramos analizados y % de CPU del hilo de la palabra de activación."""
+    listener = _wake_listener
+    return listener.stats() if listener is not None else None
+
+def start_barge_in(on_barge_in: Callable[[int], None]) -> bool:
+    """Permite interrumpir la voz hablando, si ``"barge_in"`` está activado en la configuración.
+
+    Mientras suena el asistente se escucha el micrófono descontando el eco de lo
+    que está sonando; si el usuario habla, la locución se corta al momento y
+    ``on_barge_in`` recibe la posición de la captura donde empezó a hablar, para
+    pasarla a ``escuchar(start_position=...)``.
+    """
+    global _barge_in
+    settings = _load_settings()
+    if not settings.get("barge_in"):
+        return False
+    if not capture.available():
+        print("La interrupción por voz necesita pyaudio.")
+        return False
+    device_index = settings.get("mic_device_index")
+    calibration = _stored_calibration(settings, device_index)
+
+    def interrupt(position: int) -> None:
+        print("Interrupción por voz: se corta la locución.")
+        stop_speaking()
+        on_barge_in(position)
+
+    with _wake_lock:
+        if _barge_in is not None and _barge_in.running:
+            return True
+        output = _get_audio_output()
+        _barge_in = bargein.BargeInMonitor(
+            capture.get_capture_service(device_index), _is_speaking, output.recent_level, interrupt,
+            is_blocked=_mic_lock.locked,
+            energy_threshold=calibration["energy_threshold"] / 32768.0 if calibration else None,
+        )
+        _barge_in.start()
+    return True
+
+def stop_barge_in() -> None:
+    global _barge_in
+    with _wake_lock:
+        monitor, _barge_in = _barge_in, None
+    if monitor is not None:
+        monitor.stop()
+
+
+def stop_speaking():
+    """Detiene cualquier reproducción de voz en curso y descarta las frases pendientes."""
+    _get_speech_service().cancel()
 
     # Avisar al avatar para que detenga animación inmediatamente
     try: